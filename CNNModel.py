@@ -2,14 +2,30 @@ from pathlib import Path
 import json
 
 
-def main():
-    """Train CNN model for multiple soil types (+ optional non_soil_human class)."""
+def main(export_tflite=False, pipeline="generator", cache="memory", epochs=25, patience=5, resume=True):
+    """Train CNN model for multiple soil types (+ optional non_soil_human class).
+
+    pipeline: "generator" (ImageDataGenerator), "tfdata" (parallel decode,
+    cached decoded tensors, prefetch; see soil_data_pipeline.py) or "shards"
+    (pre-decoded uint8 memmaps under dataset/packed; see soil_shards.py).
+    cache is only used by "tfdata": "memory", a cache file prefix, or None.
+
+    Every epoch is checkpointed under dataset/checkpoints; with resume=True an
+    interrupted run continues from its last finished epoch. Training stops
+    early when val_loss has not improved for `patience` epochs, and the best
+    weights are kept. Per-epoch timing/RSS goes to dataset/training_log.jsonl.
+    """
 
     import numpy as np
     import matplotlib.pyplot as plt
     from tensorflow.keras import layers, models
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
     from tensorflow.keras.optimizers import Adam
     from tensorflow.keras.preprocessing.image import ImageDataGenerator
+    from soil_training_callbacks import (
+        BEST_CHECKPOINT_NAME, LAST_CHECKPOINT_NAME, EpochTelemetry, ResumeState,
+        load_resume_state, mark_completed,
+    )
 
     basepath = Path("dataset")
     train_dir = basepath / "train"
@@ -20,51 +36,103 @@ def main():
             "Dataset folders not found. Expected structure: dataset/train/<class> and dataset/test/<class>."
         )
 
-    train_datagen = ImageDataGenerator(
-        rescale=1.0 / 255,
-        shear_range=0.2,
-        zoom_range=0.2,
-        horizontal_flip=True,
-        rotation_range=15,
-    )
-    test_datagen = ImageDataGenerator(rescale=1.0 / 255)
-
-    training_set = train_datagen.flow_from_directory(
-        str(train_dir), target_size=(100, 100), batch_size=32, class_mode="categorical"
-    )
-    test_set = test_datagen.flow_from_directory(
-        str(test_dir), target_size=(100, 100), batch_size=32, class_mode="categorical"
-    )
-
-    class_count = training_set.num_classes
-    model = models.Sequential(
-        [
-            layers.Conv2D(32, (3, 3), activation="relu", input_shape=(100, 100, 3)),
-            layers.MaxPooling2D((2, 2)),
-            layers.Conv2D(64, (3, 3), activation="relu"),
-            layers.MaxPooling2D((2, 2)),
-            layers.Conv2D(128, (3, 3), activation="relu"),
-            layers.MaxPooling2D((2, 2)),
-            layers.Flatten(),
-            layers.Dense(256, activation="relu"),
-            layers.Dropout(0.4),
-            layers.Dense(class_count, activation="softmax"),
-        ]
-    )
-
-    model.compile(optimizer=Adam(learning_rate=0.001), loss="categorical_crossentropy", metrics=["accuracy"])
+    if pipeline == "shards":
+        from soil_shards import build_shard_dataset, pack
+
+        # Incremental: only new or changed images are decoded.
+        pack(basepath, basepath / "packed")
+        training_set, class_indices, train_samples = build_shard_dataset(basepath / "packed" / "train", augment=True)
+        test_set, _, test_samples = build_shard_dataset(basepath / "packed" / "test", shuffle=False)
+    elif pipeline == "tfdata":
+        from soil_data_pipeline import build_dataset
+
+        test_cache = cache if cache in (None, "memory") else f"{cache}_test"
+        training_set, class_indices, train_samples = build_dataset(train_dir, augment=True, cache=cache)
+        test_set, _, test_samples = build_dataset(test_dir, augment=False, cache=test_cache, shuffle=False)
+    else:
+        train_datagen = ImageDataGenerator(
+            rescale=1.0 / 255,
+            shear_range=0.2,
+            zoom_range=0.2,
+            horizontal_flip=True,
+            rotation_range=15,
+        )
+        test_datagen = ImageDataGenerator(rescale=1.0 / 255)
 
-    steps_per_epoch = int(np.ceil(training_set.samples / 32))
-    val_steps = int(np.ceil(test_set.samples / 32))
+        training_set = train_datagen.flow_from_directory(
+            str(train_dir), target_size=(100, 100), batch_size=32, class_mode="categorical"
+        )
+        test_set = test_datagen.flow_from_directory(
+            str(test_dir), target_size=(100, 100), batch_size=32, class_mode="categorical"
+        )
+        class_indices = training_set.class_indices
+        train_samples = training_set.samples
+        test_samples = test_set.samples
+
+    class_count = len(class_indices)
+    checkpoint_dir = basepath / "checkpoints"
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    last_checkpoint = checkpoint_dir / LAST_CHECKPOINT_NAME
+    best_checkpoint = checkpoint_dir / BEST_CHECKPOINT_NAME
+
+    state = load_resume_state(checkpoint_dir, class_indices) if resume else None
+    if state is not None:
+        # Continue an interrupted run: weights + optimizer state of the last finished epoch.
+        model = models.load_model(str(last_checkpoint))
+        initial_epoch = state["epoch"]
+        best_val_loss = state.get("best_val_loss")
+    else:
+        model = models.Sequential(
+            [
+                layers.Conv2D(32, (3, 3), activation="relu", input_shape=(100, 100, 3)),
+                layers.MaxPooling2D((2, 2)),
+                layers.Conv2D(64, (3, 3), activation="relu"),
+                layers.MaxPooling2D((2, 2)),
+                layers.Conv2D(128, (3, 3), activation="relu"),
+                layers.MaxPooling2D((2, 2)),
+                layers.Flatten(),
+                layers.Dense(256, activation="relu"),
+                layers.Dropout(0.4),
+                layers.Dense(class_count, activation="softmax"),
+            ]
+        )
+        model.compile(optimizer=Adam(learning_rate=0.001), loss="categorical_crossentropy", metrics=["accuracy"])
+        initial_epoch = 0
+        best_val_loss = None
+        if best_checkpoint.exists():
+            best_checkpoint.unlink()
+
+    steps_per_epoch = int(np.ceil(train_samples / 32))
+    val_steps = int(np.ceil(test_samples / 32))
+
+    callbacks = [
+        ModelCheckpoint(str(last_checkpoint), save_freq="epoch"),
+        ModelCheckpoint(
+            str(best_checkpoint),
+            monitor="val_loss",
+            save_best_only=True,
+            initial_value_threshold=best_val_loss,
+        ),
+        ResumeState(checkpoint_dir, class_indices, best_val_loss),
+        EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=True),
+        EpochTelemetry(basepath / "training_log.jsonl", train_samples),
+    ]
 
     history = model.fit(
         training_set,
         steps_per_epoch=steps_per_epoch,
-        epochs=25,
+        epochs=epochs,
+        initial_epoch=initial_epoch,
         validation_data=test_set,
         validation_steps=val_steps,
+        callbacks=callbacks,
     )
 
+    # Best val_loss across this and any resumed run.
+    if best_checkpoint.exists():
+        model.load_weights(str(best_checkpoint))
+    mark_completed(checkpoint_dir)
+
     basepath.mkdir(parents=True, exist_ok=True)
     model_path = basepath / "soil_model_cnn.h5"
     model.save(str(model_path))
@@ -90,10 +158,10 @@ def main():
     plt.legend(["Train", "Validation"], loc="upper left")
     plt.savefig(basepath / "loss.png", bbox_inches="tight")
 
-    class_map = {v: k for k, v in training_set.class_indices.items()}
+    class_map = {v: k for k, v in class_indices.items()}
     class_index_path = basepath / "class_indices.json"
     with open(class_index_path, "w", encoding="utf-8") as fp:
-        json.dump(training_set.class_indices, fp, indent=2)
+        json.dump(class_indices, fp, indent=2)
 
     has_non_soil = any("non_soil" in name.lower() or "human" in name.lower() for name in class_map.values())
 
@@ -101,10 +169,17 @@ def main():
         f"Training Accuracy: {train_score[1] * 100:.2f}%\n"
         f"Testing Accuracy: {test_score[1] * 100:.2f}%\n"
         f"Classes Learned ({class_count}): {', '.join(class_map.values())}\n"
+        f"Epochs Run: {initial_epoch + len(history.history.get('loss', []))}/{epochs}\n"
         f"Model Saved: {model_path}\n"
         f"Class Index Saved: {class_index_path}\n"
     )
 
+    if export_tflite:
+        from soil_tflite import export_tflite as export_quantized
+
+        for variant, path in export_quantized(model_path, train_dir).items():
+            msg += f"TFLite ({variant}) Saved: {path}\n"
+
     if not has_non_soil:
         msg += (
             "Warning: Add a non_soil_human class in dataset to improve rejection of human/non-soil images."
@@ -114,4 +189,22 @@ def main():
 
 
 if __name__ == "__main__":
-    print(main())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the soil CNN")
+    parser.add_argument("--tflite", action="store_true", help="also export float16/int8 TFLite models")
+    parser.add_argument("--pipeline", choices=["generator", "tfdata", "shards"], default="generator")
+    parser.add_argument("--cache", default="memory", help='tf.data cache: "memory", "" for none, or a file prefix')
+    parser.add_argument("--epochs", type=int, default=25)
+    parser.add_argument("--patience", type=int, default=5, help="early stopping patience on val_loss")
+    parser.add_argument("--no-resume", action="store_true", help="ignore checkpoints of an unfinished run")
+    args = parser.parse_args()
+
+    print(main(
+        export_tflite=args.tflite,
+        pipeline=args.pipeline,
+        cache=args.cache or None,
+        epochs=args.epochs,
+        patience=args.patience,
+        resume=not args.no_resume,
+    ))
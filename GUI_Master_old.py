@@ -7,9 +7,21 @@ import numpy as np
 import time
 import os
 import json
-from datetime import datetime
 import threading
 
+from image_cache import get_image_cache
+from crop_model_loader import model_version_label
+from inference_worker import InferenceWorker
+from prediction_client import DaemonError, DaemonUnavailable, daemon_available, soil_probabilities
+from prediction_history import get_history_writer
+from soil_model_registry import get_registry
+from soil_tflite import tflite_paths
+from soil_inference import (
+    DEFAULT_NON_SOIL_THRESHOLD, HEURISTIC_MAX_SIDE, HEURISTIC_MIN_FACE_SIZE,
+    evaluate_prediction, heuristic_non_soil_check, is_known_soil_class,
+    is_non_soil_class, load_cascade,
+)
+
 # Note: Ensure CNNModel.py is in the same directory
 # import CNNModel 
 
@@ -22,6 +34,8 @@ ACCENT_COLOR = "#27ae60"
 TEXT_COLOR = "#2c3e50"
 CARD_COLOR = "#ffffff"
 
+SOIL_BACKENDS = ("keras", "tflite")
+
 class CropPredictionApp:
     def __init__(self, root):
         self.root = root
@@ -33,13 +47,27 @@ class CropPredictionApp:
         self.fn = ""
         self.model_path = "dataset/soil_model_cnn.h5"
         self.class_index_path = "dataset/class_indices.json"
-        self.non_soil_threshold = 65.0
+        # "keras" or "tflite" (see soil_tflite.py export); SOIL_BACKEND sets the default,
+        # the sidebar selector switches it at runtime.
+        self.backend = os.environ.get("SOIL_BACKEND", "keras")
+        if self.backend not in SOIL_BACKENDS:
+            self.backend = "keras"
+        self.tflite_model_path = str(tflite_paths(self.model_path)["int8"])
+        self.non_soil_threshold = DEFAULT_NON_SOIL_THRESHOLD
+        self.heuristic_max_side = HEURISTIC_MAX_SIDE
+        self.min_face_size = HEURISTIC_MIN_FACE_SIZE
         self.slot_width = 340
         self.slot_height = 260
+        self.model_registry = get_registry()
+        self.image_cache = get_image_cache()
+        self.worker = InferenceWorker(root)
+        # prediction_daemon.py keeps the CNN warm; TensorFlow is only imported here without it.
+        self.use_daemon = daemon_available()
         
         # --- UI SETUP ---
         self.setup_sidebar()
         self.setup_main_area()
+        self._warm_up_model()
         
     # =========================================================
     # UI COMPONENTS
@@ -62,6 +90,13 @@ class CropPredictionApp:
         tk.Button(sidebar, text="CNN Prediction", command=self.test_model, **btn_style).pack(fill="x", padx=20, pady=5)
         tk.Button(sidebar, text="SVM Prediction", command=self.svm_predication, **btn_style).pack(fill="x", padx=20, pady=5)
         tk.Button(sidebar, text="AI Chatbot", command=self.chatbot, **btn_style).pack(fill="x", padx=20, pady=5)
+
+        tk.Label(sidebar, text="CNN Backend", font=("Arial", 11, "bold"),
+                 bg=SIDEBAR_COLOR, fg="white").pack(anchor="w", padx=20, pady=(20, 2))
+        self.backend_var = tk.StringVar(value=self.backend)
+        backend_menu = tk.OptionMenu(sidebar, self.backend_var, *SOIL_BACKENDS, command=self.set_backend)
+        backend_menu.config(font=("Arial", 11), bg="#34495e", fg="white", bd=0, highlightthickness=0)
+        backend_menu.pack(fill="x", padx=20, pady=5)
         
         tk.Button(sidebar, text="Exit", command=self.root.destroy, font=("Arial", 12), 
                   bg="#e74c3c", fg="white", bd=0, pady=10).pack(side="bottom", fill="x", padx=20, pady=30)
@@ -154,29 +189,30 @@ class CropPredictionApp:
         4: {"soil_mar": "वाळूची माती", "soil_en": "Sandy Soil", "temp": "10°C ते 19°C", "crops": ["कलिंगड", "टोमॅटो"], "soil_details": "निचरा जलद होतो...", "steps": ["मल्चिंग करा"], "crop_notes": {}}
     }
 
-    def build_report_text(self, image_path, class_id, confidence_pct):
-        rec = self.SOIL_RECO.get(class_id, None)
-        if rec is None: return "No recommendation found."
-        crops_str = ", ".join(rec["crops"])
-        steps_str = "\n".join([f"{i+1}. {s}" for i, s in enumerate(rec["steps"])])
-        now = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        return f"Report Generated: {now}\nSoil: {rec['soil_en']}\nConfidence: {confidence_pct:.2f}%\nCrops: {crops_str}\nSteps:\n{steps_str}"
-
-    def write_report_to_file(self, report_text, image_path):
-        try:
-            os.makedirs("reports", exist_ok=True)
-            base = os.path.splitext(os.path.basename(image_path))[0]
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_path = os.path.join("reports", f"{base}_report_{ts}.txt")
-            with open(report_path, "w", encoding="utf-8") as f: f.write(report_text)
-            return report_path
-        except: return None
+    def record_prediction(self, image_path, verdict, latency_ms):
+        """Append the soil prediction to the history store; returns its report id."""
+        rec = self.SOIL_RECO.get(verdict["class_id"])
+        if rec is None: return None
+        model_file = self.tflite_model_path if self.backend == "tflite" else self.model_path
+        return get_history_writer().record(
+            "soil",
+            {"image_path": os.path.abspath(image_path)},
+            {"class_id": verdict["class_id"], "class_name": verdict["class_name"],
+             "confidence": float(verdict["confidence"]), "soil_en": rec["soil_en"],
+             "crops": rec["crops"], "steps": rec["steps"]},
+            soil=rec["soil_en"],
+            model_version=model_version_label(model_file),
+            source="daemon" if self.use_daemon else self.backend,
+            latency_ms=latency_ms,
+        )
 
     def update_label(self, str_T):
         self.status_label.config(text=str_T)
 
-    def _show_non_soil_warning(self, confidence=None):
+    def _show_non_soil_warning(self, confidence=None, reason=""):
         conf_text = f" (confidence: {confidence:.2f}%)" if confidence is not None else ""
+        if reason:
+            conf_text += f" ({reason})"
         self.crop_label.config(
             text=(
                 "⚠️ Non-soil image detected.\n"
@@ -188,90 +224,32 @@ class CropPredictionApp:
 
     def _load_class_mapping(self):
         """Return index->class_name mapping saved during training."""
-        if not os.path.exists(self.class_index_path):
-            return {}
         try:
-            with open(self.class_index_path, "r", encoding="utf-8") as fp:
-                raw = json.load(fp)
-            return {int(v): k for k, v in raw.items()}
+            return self.model_registry.get_class_mapping(self.class_index_path)
         except Exception:
             return {}
 
     def _is_non_soil_class(self, class_name):
-        if not class_name:
-            return False
-
-        key = class_name.lower().replace("-", "_").replace(" ", "_")
-        non_soil_tokens = (
-            "non_soil", "nonsoil", "not_soil", "human", "person", "face", "body"
-        )
-        return any(token in key for token in non_soil_tokens)
+        return is_non_soil_class(class_name)
 
     def _is_known_soil_class(self, class_name):
         """Check whether predicted class label maps to one of the supported soil types."""
-        if not class_name:
-            return False
-
-        normalized = class_name.lower().replace("-", " ").replace("_", " ").strip()
-        known_aliases = {
-            "black soil", "black", "kali mati",
-            "alluvial soil", "alluvial", "gaalachi mati",
-            "laterite soil", "laterite",
-            "yellow soil", "yellow",
-            "sandy soil", "sandy",
-        }
-        return normalized in known_aliases
+        return is_known_soil_class(class_name)
 
     def _load_cascade(self, filename):
         """Load OpenCV haar cascade safely."""
-        try:
-            path = cv2.data.haarcascades + filename
-            cascade = cv2.CascadeClassifier(path)
-            return cascade if not cascade.empty() else None
-        except Exception:
-            return None
+        return load_cascade(filename)
 
     def _heuristic_non_soil_check(self, image_path):
         """Human-feature based non-soil detector to avoid soil-color false positives."""
-        img = cv2.imread(image_path)
-        if img is None:
-            return False, ""
-
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        # 1) Face detection (primary human indicator).
-        face_cascade = self._load_cascade("haarcascade_frontalface_default.xml")
-        if face_cascade is not None:
-            faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40))
-            if len(faces) > 0:
-                # 2) Validate face with eyes/smile when possible (reduces false positives).
-                eye_cascade = self._load_cascade("haarcascade_eye.xml")
-                smile_cascade = self._load_cascade("haarcascade_smile.xml")
-                for (x, y, w, h) in faces:
-                    roi = gray[y:y + h, x:x + w]
-                    eye_hits = 0
-                    smile_hits = 0
-                    if eye_cascade is not None:
-                        eyes = eye_cascade.detectMultiScale(roi, scaleFactor=1.1, minNeighbors=5, minSize=(12, 12))
-                        eye_hits = len(eyes)
-                    if smile_cascade is not None:
-                        smiles = smile_cascade.detectMultiScale(roi, scaleFactor=1.7, minNeighbors=20, minSize=(20, 20))
-                        smile_hits = len(smiles)
-
-                    # Strong human evidence.
-                    if eye_hits >= 1 or smile_hits >= 1:
-                        return True, "human facial features detected"
-
-                # If validation cascades are unavailable, still trust face detection.
-                if eye_cascade is None and smile_cascade is None:
-                    return True, "face-like object detected"
-
-        # 3) Keep only conservative low-texture rejection for obviously plain/non-soil images.
-        texture_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        if texture_var < 18.0:
-            return True, "very low texture image"
-
-        return False, ""
+        entry = self.image_cache.get(image_path)
+        # The texture cut-off holds at full resolution only; larger photos are re-read.
+        return heuristic_non_soil_check(
+            image_path,
+            max_side=self.heuristic_max_side,
+            min_face_size=self.min_face_size,
+            gray=entry.gray() if entry.full_resolution else None,
+        )
 
     def show_crop_info(self, class_id):
         rec = self.SOIL_RECO.get(class_id, None)
@@ -282,36 +260,56 @@ class CropPredictionApp:
         fileName = askopenfilename(initialdir='D:/', title='Select image', filetypes=[("all files", "*.*")])
         if fileName:
             self.fn = fileName
-            img = Image.open(self.fn).convert("RGB")
-            self._show_image_on_slot(self.lbl_orig, img)
-            self.crop_label.config(text="Image loaded. You can preprocess, train model, or run prediction.")
-            self.update_label("Image loaded successfully")
+            # A new image makes queued/running work for the previous one stale.
+            self.worker.cancel_pending()
+            self.update_label("Loading image...")
+            size = (self.slot_width, self.slot_height)
+            self.worker.submit(
+                lambda: self.image_cache.get(fileName).thumbnail(size),
+                on_done=self._show_loaded_image,
+                on_error=self._show_worker_error,
+            )
 
-    def convert_grey(self):
-        if not self.fn:
-            self.update_label("Please select image first")
-            return
-        img_cv = cv2.imread(self.fn)
-        gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-        gray_disp = cv2.resize(gray, (self.slot_width, self.slot_height))
+    def _show_loaded_image(self, thumb):
+        self._show_image_on_slot(self.lbl_orig, thumb)
+        self.crop_label.config(text="Image loaded. You can preprocess, train model, or run prediction.")
+        self.update_label("Image loaded successfully")
 
-        gray_img = Image.fromarray(gray_disp).convert("RGB")
-        self._show_image_on_slot(self.lbl_gray, gray_img)
+    def _show_worker_error(self, error):
+        self.update_label(f"Error: {error}")
 
+    def _preprocess_views(self, image_path):
+        gray = self.image_cache.get(image_path).gray()
+        gray_disp = cv2.resize(gray, (self.slot_width, self.slot_height))
         _, thresh = cv2.threshold(gray_disp, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        thresh_img = Image.fromarray(thresh).convert("RGB")
+        return Image.fromarray(gray_disp).convert("RGB"), Image.fromarray(thresh).convert("RGB")
+
+    def _show_preprocess_views(self, views):
+        gray_img, thresh_img = views
+        self._show_image_on_slot(self.lbl_gray, gray_img)
         self._show_image_on_slot(self.lbl_bin, thresh_img)
         self.update_label("Pre-processing completed")
 
+    def convert_grey(self):
+        if not self.fn:
+            self.update_label("Please select image first")
+            return
+        fn = self.fn
+        self.update_label("Pre-processing...")
+        self.worker.submit(
+            lambda: self._preprocess_views(fn),
+            on_done=self._show_preprocess_views,
+            on_error=self._show_worker_error,
+        )
+
     def _run_training_job(self):
         try:
             from CNNModel import main as train_main
             msg = train_main()
-            self.update_label("Training completed")
-            messagebox.showinfo("Training Done", msg)
+            self.worker.post_ui(self.update_label, "Training completed")
+            self.worker.post_ui(messagebox.showinfo, "Training Done", msg)
         except Exception as e:
-            self.update_label("Training failed")
-            messagebox.showerror("Training Error", str(e))
+            self.worker.post_ui(self.update_label, f"Training failed: {e}")
 
     def train_cnn_model(self):
         self.update_label("Training started... this may take time")
@@ -324,65 +322,98 @@ class CropPredictionApp:
         )
         threading.Thread(target=self._run_training_job, daemon=True).start()
 
+    def set_backend(self, backend):
+        if backend == "tflite" and not os.path.exists(self.tflite_model_path):
+            # Keep predicting with the backend that works.
+            self.backend_var.set(self.backend)
+            self.update_label(f"TFLite model not found: {self.tflite_model_path} (run soil_tflite.py export)")
+            return
+        self.backend = backend
+        self.update_label(f"CNN backend: {backend}")
+        self._warm_up_model()
+
+    def _get_soil_model(self):
+        if self.backend == "tflite":
+            return self.model_registry.get_model(self.tflite_model_path, backend="tflite")
+        model_file = self.model_path if os.path.exists(self.model_path) else "soil_model_cnn.h5"
+        return self.model_registry.get_model(model_file)
+
+    def _warm_up_model(self):
+        """Import TensorFlow and load the CNN in the background at startup."""
+        if self.use_daemon:
+            return
+        if os.path.exists(self.model_path) or self.backend == "tflite":
+            self.worker.submit(self._get_soil_model)
+
+    def _soil_probabilities(self, image_path):
+        """Softmax row for one image, from the daemon when it is running."""
+        if self.use_daemon:
+            try:
+                result = soil_probabilities([image_path])[0]
+                if "error" in result:
+                    raise RuntimeError(result["error"])
+                return np.asarray(result["probs"], dtype=np.float32)
+            except DaemonUnavailable:
+                self.use_daemon = False
+            except DaemonError:
+                pass  # this request failed on the daemon; answer it locally, keep the daemon
+        model = self._get_soil_model()
+        img_arr = self.image_cache.get(image_path).model_input()[np.newaxis]
+        return model.predict(img_arr)[0]
+
+    def _predict_soil(self, image_path):
+        """Worker-side half of test_model: predict, apply rules, record the prediction."""
+        start = time.perf_counter()
+        verdict = evaluate_prediction(
+            self._soil_probabilities(image_path),
+            self._load_class_mapping(),
+            image_path=image_path,
+            soil_class_ids=self.SOIL_RECO,
+            non_soil_threshold=self.non_soil_threshold,
+            heuristic_check=self._heuristic_non_soil_check,
+        )
+        verdict["report_id"] = None
+        if verdict["is_soil"]:
+            latency_ms = (time.perf_counter() - start) * 1000
+            verdict["report_id"] = self.record_prediction(image_path, verdict, latency_ms)
+        return verdict
+
+    def _show_prediction(self, verdict):
+        class_id = verdict["class_id"]
+        class_name = verdict["class_name"]
+        conf = verdict["confidence"]
+
+        if not verdict["is_soil"]:
+            self._show_non_soil_warning(confidence=conf, reason=verdict["reason"])
+            return
+
+        self.show_crop_info(class_id)
+        soil_name = self.SOIL_RECO[class_id]['soil_mar']
+        extra = f" | Class: {class_name}" if class_name else ""
+        saved = f" | Report ID: {verdict['report_id']}" if verdict["report_id"] else ""
+        self.update_label(f"Soil Identified: {soil_name} ({conf:.2f}%){extra}{saved}")
+
     def test_model(self):
         if self.fn == "":
             self.update_label("Please Select Image First!")
             return
-        
-        from tensorflow.keras.models import load_model
-        try:
-            model_file = self.model_path if os.path.exists(self.model_path) else "soil_model_cnn.h5"
-            model = load_model(model_file, compile=False)
-            img = Image.open(self.fn).resize((100, 100))
-            img_arr = np.array(img).reshape(1, 100, 100, 3).astype('float32') / 255.0
-            prediction = model.predict(img_arr)
-            class_id = int(np.argmax(prediction))
-            conf = float(np.max(prediction)) * 100.0
-            class_map = self._load_class_mapping()
-            class_name = class_map.get(class_id, "")
-
-            # Run heuristic guard only when model mapping is unavailable.
-            # This prevents false blocking on valid soil photos.
-            if not class_map:
-                is_non_soil, reason = self._heuristic_non_soil_check(self.fn)
-                if is_non_soil:
-                    self._show_non_soil_warning(confidence=conf)
-                    self.update_label(f"Prediction blocked: Non-soil image detected ({reason})")
-                    return
-
-            # Block prediction for explicit non-soil/human class labels.
-            if self._is_non_soil_class(class_name):
-                self._show_non_soil_warning(confidence=conf)
-                return
-
-            # If model mapping exists and class is not recognized as soil, treat as non-soil.
-            if class_name and not self._is_known_soil_class(class_name):
-                self._show_non_soil_warning(confidence=conf)
-                return
-
-            # Safety fallback for unsupported classes or weak confidence.
-            if class_id not in self.SOIL_RECO or conf < self.non_soil_threshold:
-                self._show_non_soil_warning(confidence=conf)
-                return
-
-            self.show_crop_info(class_id)
-            soil_name = self.SOIL_RECO[class_id]['soil_mar']
-            extra = f" | Class: {class_name}" if class_name else ""
-            self.update_label(f"Soil Identified: {soil_name} ({conf:.2f}%){extra}")
-            
-            report = self.build_report_text(self.fn, class_id, conf)
-            path = self.write_report_to_file(report, self.fn)
-            if path: messagebox.showinfo("Done", f"Report saved at {path}")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
 
+        fn = self.fn
+        self.update_label("Running CNN prediction...")
+        self.worker.submit(
+            lambda: self._predict_soil(fn),
+            on_done=self._show_prediction,
+            on_error=self._show_worker_error,
+        )
+
+    # Child windows run as their own processes; not waiting keeps this Tk loop responsive.
     def svm_predication(self):
-        from subprocess import call
-        call(["python", "check_predict.py"])
-        
+        from subprocess import Popen
+        Popen(["python", "check_predict.py"])
+
     def chatbot(self):
-        from subprocess import call
-        call(["python", "chatbot API key.py"])
+        from subprocess import Popen
+        Popen(["python", "chatbot API key.py"])
 
 if __name__ == "__main__":
     root = tk.Tk()
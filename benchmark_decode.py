@@ -0,0 +1,90 @@
+"""Open-to-model-input latency with and without JPEG draft-mode decode.
+
+Usage:
+    python benchmark_decode.py <image_dir> [--limit 50]
+
+Compares the original full decode + resize with the draft-mode path of
+soil_inference.load_model_input (batch CLI, daemon) and with the dashboard's
+image cache, which resizes its cached decoded copy instead of reading the
+file again. Checks that both 100x100 model inputs stay within
+DRAFT_MAX_ABS_DIFF / DRAFT_MAX_MEAN_ABS_DIFF (inputs are scaled to [0, 1]).
+Exits with status 1 when any image exceeds the thresholds.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from soil_batch_classify import iter_image_paths
+from soil_inference import DRAFT_MAX_ABS_DIFF, DRAFT_MAX_MEAN_ABS_DIFF, MODEL_INPUT_SIZE, load_model_input
+
+
+def _full_decode_input(path):
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB").resize(MODEL_INPUT_SIZE), dtype="float32") / 255.0
+
+
+def _cached_input(path):
+    from image_cache import ImageBufferCache
+    return ImageBufferCache().get(path).model_input()
+
+
+def _timed(fn, path):
+    start = time.perf_counter()
+    value = fn(path)
+    return value, (time.perf_counter() - start) * 1000.0
+
+
+def run_benchmark(image_dir, limit=50):
+    full_ms, draft_ms, cache_ms, failures = [], [], [], []
+    worst_max, worst_mean = 0.0, 0.0
+    for i, path in enumerate(iter_image_paths(image_dir)):
+        if i >= limit:
+            break
+        reference, t_full = _timed(_full_decode_input, path)
+        candidate, t_draft = _timed(load_model_input, path)
+        cached, t_cache = _timed(_cached_input, path)
+        full_ms.append(t_full)
+        draft_ms.append(t_draft)
+        cache_ms.append(t_cache)
+
+        for label, value in (("draft", candidate), ("cache", cached)):
+            diff = np.abs(reference - value)
+            worst_max = max(worst_max, float(diff.max()))
+            worst_mean = max(worst_mean, float(diff.mean()))
+            if diff.max() > DRAFT_MAX_ABS_DIFF or diff.mean() > DRAFT_MAX_MEAN_ABS_DIFF:
+                failures.append({"path": path, "path_kind": label,
+                                 "max_abs_diff": float(diff.max()), "mean_abs_diff": float(diff.mean())})
+
+    if not full_ms:
+        return {"images": 0, "failures": []}
+
+    return {
+        "images": len(full_ms),
+        "full_decode_ms_median": round(statistics.median(full_ms), 2),
+        "draft_decode_ms_median": round(statistics.median(draft_ms), 2),
+        "image_cache_ms_median": round(statistics.median(cache_ms), 2),
+        "speedup": round(sum(full_ms) / max(sum(draft_ms), 1e-9), 2),
+        "worst_max_abs_diff": round(worst_max, 4),
+        "worst_mean_abs_diff": round(worst_mean, 5),
+        "thresholds": {"max_abs_diff": DRAFT_MAX_ABS_DIFF, "mean_abs_diff": DRAFT_MAX_MEAN_ABS_DIFF},
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JPEG draft-mode decode")
+    parser.add_argument("image_dir")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    result = run_benchmark(args.image_dir, args.limit)
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
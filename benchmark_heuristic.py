@@ -0,0 +1,73 @@
+"""Per-image latency of the non-soil heuristic, before vs after.
+
+Usage:
+    python benchmark_heuristic.py <image_dir> [--max-side 640] [--limit 50]
+
+"before" re-parses the Haar cascades for every image and detects on the
+full-resolution photo (the original behaviour); "after" uses the cached
+cascades and the bounded-size copy. Verdict agreement is reported too.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from soil_batch_classify import iter_image_paths
+from soil_inference import HEURISTIC_MAX_SIDE, HEURISTIC_MIN_FACE_SIZE, heuristic_non_soil_check, load_cascade
+
+
+def _time_call(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def run_benchmark(image_dir, max_side=HEURISTIC_MAX_SIDE, min_face_size=HEURISTIC_MIN_FACE_SIZE, limit=50):
+    before_ms, after_ms, disagreements = [], [], []
+    for i, path in enumerate(iter_image_paths(image_dir)):
+        if i >= limit:
+            break
+
+        def legacy():
+            load_cascade.cache_clear()
+            return heuristic_non_soil_check(path, max_side=0, min_face_size=40)
+
+        old, old_ms = _time_call(legacy)
+        load_cascade("haarcascade_frontalface_default.xml")  # warm, as in a running app
+        new, new_ms = _time_call(
+            lambda: heuristic_non_soil_check(path, max_side=max_side, min_face_size=min_face_size)
+        )
+        before_ms.append(old_ms)
+        after_ms.append(new_ms)
+        if old[0] != new[0]:
+            disagreements.append({"path": path, "before": old[1], "after": new[1]})
+
+    if not before_ms:
+        return {"images": 0}
+
+    return {
+        "images": len(before_ms),
+        "max_side": max_side,
+        "min_face_size": min_face_size,
+        "before_ms_median": round(statistics.median(before_ms), 2),
+        "after_ms_median": round(statistics.median(after_ms), 2),
+        "before_ms_mean": round(statistics.mean(before_ms), 2),
+        "after_ms_mean": round(statistics.mean(after_ms), 2),
+        "speedup": round(sum(before_ms) / max(sum(after_ms), 1e-9), 2),
+        "verdict_agreement": round(1.0 - len(disagreements) / len(before_ms), 4),
+        "disagreements": disagreements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the non-soil heuristic")
+    parser.add_argument("image_dir")
+    parser.add_argument("--max-side", type=int, default=HEURISTIC_MAX_SIDE)
+    parser.add_argument("--min-face-size", type=int, default=HEURISTIC_MIN_FACE_SIZE)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.image_dir, args.max_side, args.min_face_size, args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,433 +1,93 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import joblib
-import os, json
-from urllib.request import urlopen, Request
-from urllib.error import URLError
-from urllib.parse import quote
-from datetime import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crop_model_loader import MODEL_PATH, CropModelLoader, model_version_label
+from crop_prediction_cache import PredictionCache
+from geocoding import TalukaGeocoder
+from prediction_client import DaemonError, DaemonUnavailable, daemon_available, predict_crops
+from prediction_history import get_history_writer, get_record, render_report
+from weather_client import WeatherClient, WeatherDataMissing
+from weather_snapshot import latest_weather
+from reference_data import (
+    DISTRICT_ENGLISH_MAP, DISTRICT_MARATHI_MAP, MAHARASHTRA_ANNUAL_RAINFALL_MM,
+    MAHARASHTRA_DISTRICTS, MAHARASHTRA_TALUKAS, SOIL_ENGLISH_MAP, SOIL_MARATHI_LIST,
+    STATE_ENGLISH_MAP, ensure_crop_map_json, load_crop_map, state_marathi_list,
+)
+
+# The GUI writes crop_marathi_map.json on first start so users can edit the translations.
+ensure_crop_map_json()
+CROP_MARATHI_MAP = load_crop_map()
 
 # =========================
 # MODEL LOAD
 # =========================
-MODEL_PATH = "model_outputs/crop_recommendation_model.pkl"
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception as e:
-    model = None
-    MODEL_LOAD_ERROR = str(e)
-else:
-    MODEL_LOAD_ERROR = ""
+# When prediction_daemon.py is running it serves predictions with its warm
+# model and nothing is loaded here (not even numpy). Otherwise the model is
+# loaded in the background (memory-mapped) so the window opens immediately;
+# predict_crop waits for it only if the first click comes before it is ready.
+use_daemon = daemon_available()
 
-# =========================
-# JSON FILE (Crop Map)
-# =========================
-CROP_MAP_JSON_PATH = "crop_marathi_map.json"
-
-DEFAULT_CROP_MARATHI_MAP = {
-    "amaranthus": "तांदुळजा",
-    "green banana": "कच्ची केळी",
-    "banana": "केळी",
-    "ladies finger": "भेंडी",
-    "bitter gourd": "कारले",
-    "bottle gourd": "दुधी भोपळा",
-    "brinjal": "वांगी",
-    "cabbage": "कोबी",
-    "carrot": "गाजर",
-    "cauliflower": "फुलकोबी",
-    "cluster beans": "गवार",
-    "cowpea": "चवळी",
-    "cucumber": "काकडी",
-    "drumstick": "शेवगा",
-    "ginger": "आले",
-    "green chilli": "हिरवी मिरची",
-    "garlic": "लसूण",
-    "onion": "कांदा",
-    "potato": "बटाटा",
-    "tomato": "टोमॅटो",
-    "pumpkin": "भोपळा",
-    "raddish": "मुळा",
-    "ridge gourd": "दोडका",
-    "sponge gourd": "घोसाळे",
-    "snakeguard": "पडवळ",
-    "tinda": "टिंडा",
-    "sweet potato": "रताळे",
-    "spinach": "पालक",
-    "methi leaves": "मेथी",
-    "coriander": "कोथिंबीर",
-    "peas": "वाटाणे",
-    "peas cod": "वाटाणा शेंग",
-    "beans": "शेंग",
-    "french beans": "फ्रेंच बीन्स",
-    "capsicum": "ढोबळी मिरची",
-
-    # Fruits
-    "apple": "सफरचंद",
-    "orange": "संत्रे",
-    "grapes": "द्राक्षे",
-    "papaya": "पपई",
-    "pomegranate": "डाळिंब",
-    "guava": "पेरू",
-    "lemon": "लिंबू",
-    "water melon": "टरबूज",
-    "sweet lime": "मोसंबी",
-    "pineapple": "अननस",
-    "sapota": "चिकू",
-    "mango": "आंबा",
-    "zizyphus": "बोर",
-
-    # Cereals & Pulses
-    "paddy": "भात",
-    "rice": "तांदूळ",
-    "wheat": "गहू",
-    "wheat atta": "गव्हाचे पीठ",
-    "maize": "मका",
-    "jowar": "ज्वारी",
-    "bajra": "बाजरी",
-    "ragi": "नाचणी",
-    "barley": "जव",
-    "lentil": "मसूर",
-    "masur dal": "मसूर डाळ",
-    "bengal gram": "हरभरा",
-    "black gram": "उडीद",
-    "green gram": "मूग",
-    "red gram": "तूर",
-    "chana dal": "चना डाळ",
-    "tur dal": "तूर डाळ",
-    "urd dal": "उडीद डाळ",
-
-    # Oil & Commercial Crops
-    "groundnut": "भुईमूग",
-    "soyabean": "सोयाबीन",
-    "mustard": "मोहरी",
-    "sesamum": "तीळ",
-    "cotton": "कापूस",
-    "jute": "ताग",
-    "castor seed": "एरंड",
-    "tobacco": "तंबाखू",
-
-    # Plantation
-    "coconut": "नारळ",
-    "copra": "खोबरे",
-    "arecanut": "सुपारी",
-    "cashewnuts": "काजू",
-    "rubber": "रबर",
-
-    # Others
-    "turmeric": "हळद",
-    "jaggery": "गूळ",
-    "sugar": "साखर",
-    "fish": "मासे",
-    "wood": "लाकूड",
-    "leafy vegetable": "पालेभाजी"
-}
-
-def ensure_crop_map_json():
-    """Create crop_marathi_map.json if not exists."""
-    if not os.path.exists(CROP_MAP_JSON_PATH):
-        with open(CROP_MAP_JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(DEFAULT_CROP_MARATHI_MAP, f, ensure_ascii=False, indent=2)
-
-def load_crop_map():
-    ensure_crop_map_json()
-    with open(CROP_MAP_JSON_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
-CROP_MARATHI_MAP = load_crop_map()
+# The numpy-backed modules are imported by these loaders, i.e. only once this
+# process predicts (or looks up normals) itself.
+def _load_compiled_forest(_path, mmap_mode="r"):
+    from crop_forest_compiled import load_compiled_forest
+    return load_compiled_forest(mmap_mode=mmap_mode)
 
-# =========================
-# State & Soil Lists / Maps
-# =========================
-state_marathi_list = [
-    "अंदमान आणि निकोबार","आंध्र प्रदेश","आसाम","छत्तीसगड","गोवा","गुजरात","हरियाणा",
-    "हिमाचल प्रदेश","जम्मू आणि काश्मीर","कर्नाटक","केरळ","मध्य प्रदेश","महाराष्ट्र",
-    "मणिपूर","मेघालय","नागालँड","ओडिशा","पाँडिचेरी","पंजाब","राजस्थान","तामिळनाडू",
-    "तेलंगणा","त्रिपुरा","उत्तर प्रदेश","उत्तराखंड","पश्चिम बंगाल"
-]
-
-STATE_ENGLISH_MAP = {
-    "अंदमान आणि निकोबार": "Andaman and Nicobar",
-    "आंध्र प्रदेश": "Andhra Pradesh",
-    "आसाम": "Assam",
-    "छत्तीसगड": "Chattisgarh",
-    "गोवा": "Goa",
-    "गुजरात": "Gujarat",
-    "हरियाणा": "Haryana",
-    "हिमाचल प्रदेश": "Himachal Pradesh",
-    "जम्मू आणि काश्मीर": "Jammu and Kashmir",
-    "कर्नाटक": "Karnataka",
-    "केरळ": "Kerala",
-    "मध्य प्रदेश": "Madhya Pradesh",
-    "महाराष्ट्र": "Maharashtra",
-    "मणिपूर": "Manipur",
-    "मेघालय": "Meghalaya",
-    "नागालँड": "Nagaland",
-    "ओडिशा": "Odisha",
-    "पाँडिचेरी": "Pondicherry",
-    "पंजाब": "Punjab",
-    "राजस्थान": "Rajasthan",
-    "तामिळनाडू": "Tamil Nadu",
-    "तेलंगणा": "Telangana",
-    "त्रिपुरा": "Tripura",
-    "उत्तर प्रदेश": "Uttar Pradesh",
-    "उत्तराखंड": "Uttrakhand",
-    "पश्चिम बंगाल": "West Bengal"
-}
-
-SOIL_MARATHI_LIST = [
-    "वालुकामय माती","लाल माती","लेटराइट माती","चिकणमाती","वाळवंटी माती",
-    "वालुकामय दोमट माती","गाळाची माती","वालुकामय चिकणमाती","काळी माती",
-    "रेगूर माती","इनसेप्टिसोल माती","दुमट माती","डेल्टा गाळाची माती","डोंगराळ माती"
-]
-
-SOIL_ENGLISH_MAP = {
-    "वालुकामय माती": "Sandy soil",
-    "लाल माती": "Red soil",
-    "लेटराइट माती": "Laterite soil",
-    "चिकणमाती": "Clayey soils",
-    "वाळवंटी माती": "Desert soil",
-    "वालुकामय दोमट माती": "Sandy loam",
-    "गाळाची माती": "Alluvial soil",
-    "वालुकामय चिकणमाती": "Sandy Clay loam",
-    "काळी माती": "Black soil",
-    "रेगूर माती": "Regur soil",
-    "इनसेप्टिसोल माती": "Inceptisols",
-    "दुमट माती": "Loamy soil",
-    "डेल्टा गाळाची माती": "Delta alluvium",
-    "डोंगराळ माती": "Mountain soil"
-}
-
-# महाराष्ट्रातील सर्व जिल्हे (तालुके API मधून)
-MAHARASHTRA_DISTRICTS = [
-    "Ahmednagar", "Akola", "Amravati", "Beed", "Bhandara", "Buldhana", "Chandrapur",
-    "Chhatrapati Sambhajinagar", "Dhule", "Gadchiroli", "Gondia", "Hingoli", "Jalgaon",
-    "Jalna", "Kolhapur", "Latur", "Mumbai City", "Mumbai Suburban", "Nagpur", "Nanded",
-    "Nandurbar", "Nashik", "Osmanabad", "Palghar", "Parbhani", "Pune", "Raigad",
-    "Ratnagiri", "Sangli", "Satara", "Sindhudurg", "Solapur", "Thane", "Wardha",
-    "Washim", "Yavatmal"
-]
-
-DISTRICT_ENGLISH_MAP = {
-    "अहमदनगर": "Ahmednagar", "अकोला": "Akola", "अमरावती": "Amravati", "बीड": "Beed",
-    "भंडारा": "Bhandara", "बुलढाणा": "Buldhana", "चंद्रपूर": "Chandrapur",
-    "छत्रपती संभाजीनगर": "Chhatrapati Sambhajinagar", "धुळे": "Dhule", "गडचिरोली": "Gadchiroli",
-    "गोंदिया": "Gondia", "हिंगोली": "Hingoli", "जळगाव": "Jalgaon", "जालना": "Jalna",
-    "कोल्हापूर": "Kolhapur", "लातूर": "Latur", "मुंबई शहर": "Mumbai City",
-    "मुंबई उपनगर": "Mumbai Suburban", "नागपूर": "Nagpur", "नांदेड": "Nanded",
-    "नंदुरबार": "Nandurbar", "नाशिक": "Nashik", "उस्मानाबाद": "Osmanabad", "पालघर": "Palghar",
-    "परभणी": "Parbhani", "पुणे": "Pune", "रायगड": "Raigad", "रत्नागिरी": "Ratnagiri",
-    "सांगली": "Sangli", "सातारा": "Satara", "सिंधुदुर्ग": "Sindhudurg", "सोलापूर": "Solapur",
-    "ठाणे": "Thane", "वर्धा": "Wardha", "वाशीम": "Washim", "यवतमाळ": "Yavatmal"
-}
-
-DISTRICT_MARATHI_MAP = {v: k for k, v in DISTRICT_ENGLISH_MAP.items()}
-
-# Offline fallback taluka map (works without external taluka API)
-MAHARASHTRA_TALUKAS = {
-    "Ahmednagar": ["Akole", "Jamkhed", "Karjat", "Kopargaon", "Nagar", "Nevasa", "Parner", "Pathardi", "Rahata", "Rahuri", "Sangamner", "Shevgaon", "Shrigonda", "Shrirampur"],
-    "Akola": ["Akola", "Akot", "Balapur", "Barshitakli", "Murtizapur", "Patur", "Telhara"],
-    "Amravati": ["Achalpur", "Amravati", "Anjangaon Surji", "Bhatkuli", "Chandur Bazar", "Chandur Railway", "Daryapur", "Dhamangaon Railway", "Morshi", "Nandgaon Khandeshwar", "Teosa", "Warud"],
-    "Beed": ["Ambejogai", "Ashti", "Beed", "Dharur", "Georai", "Kaij", "Majalgaon", "Parli", "Patoda", "Shirur Kasar", "Wadwani"],
-    "Bhandara": ["Bhandara", "Lakhandur", "Lakhani", "Mohadi", "Pauni", "Sakoli", "Tumsar"],
-    "Buldhana": ["Buldhana", "Chikhli", "Deulgaon Raja", "Jalgaon Jamod", "Khamgaon", "Lonar", "Malkapur", "Mehkar", "Motala", "Nandura", "Sangrampur", "Shegaon", "Sindkhed Raja"],
-    "Chandrapur": ["Ballarpur", "Bhadravati", "Brahmapuri", "Chandrapur", "Chimur", "Gondpipri", "Jiwati", "Korpana", "Mul", "Nagbhid", "Pombhurna", "Rajura", "Sawali", "Sindewahi", "Warora"],
-    "Chhatrapati Sambhajinagar": ["Aurangabad", "Gangapur", "Kannad", "Khuldabad", "Paithan", "Phulambri", "Sillod", "Soegaon", "Vaijapur"],
-    "Dhule": ["Dhule", "Sakri", "Shirpur", "Sindkhede"],
-    "Gadchiroli": ["Aheri", "Armori", "Bhamragad", "Chamorshi", "Dhanora", "Etapalli", "Gadchiroli", "Korchi", "Kurkheda", "Mulchera", "Sironcha"],
-    "Gondia": ["Amgaon", "Arjuni Morgaon", "Deori", "Gondia", "Goregaon", "Sadak Arjuni", "Salekasa", "Tirora"],
-    "Hingoli": ["Aundha Nagnath", "Basmath", "Hingoli", "Kalamnuri", "Sengaon"],
-    "Jalgaon": ["Amalner", "Bhadgaon", "Bhusawal", "Bodwad", "Chalisgaon", "Chopda", "Dharangaon", "Erandol", "Jalgaon", "Jamner", "Muktainagar", "Pachora", "Parola", "Raver", "Yawal"],
-    "Jalna": ["Ambad", "Badnapur", "Bhokardan", "Ghansawangi", "Jafferabad", "Jalna", "Mantha", "Partur"],
-    "Kolhapur": ["Ajra", "Bavda", "Bhudargad", "Chandgad", "Gadhinglaj", "Hatkanangale", "Kagal", "Karvir", "Panhala", "Radhanagari", "Shahuwadi", "Shirol"],
-    "Latur": ["Ahmadpur", "Ausa", "Chakur", "Deoni", "Jalkot", "Latur", "Nilanga", "Renapur", "Shirur Anantpal", "Udgir"],
-    "Mumbai City": ["Mumbai"],
-    "Mumbai Suburban": ["Andheri", "Borivali", "Kurla"],
-    "Nagpur": ["Bhiwapur", "Hingna", "Kalameshwar", "Kamptee", "Katol", "Kuhi", "Mauda", "Nagpur Rural", "Narkhed", "Parseoni", "Ramtek", "Saoner", "Umred"],
-    "Nanded": ["Ardhapur", "Bhokar", "Biloli", "Deglur", "Dharmabad", "Hadgaon", "Himayatnagar", "Kandhar", "Kinwat", "Loha", "Mahur", "Mudkhed", "Mukhed", "Naigaon", "Nanded", "Umri"],
-    "Nandurbar": ["Akkalkuwa", "Akrani", "Nandurbar", "Nawapur", "Shahada", "Taloda"],
-    "Nashik": ["Baglan", "Chandwad", "Deola", "Dindori", "Igatpuri", "Kalwan", "Malegaon", "Nandgaon", "Nashik", "Niphad", "Peth", "Sinnar", "Surgana", "Trimbakeshwar", "Yeola"],
-    "Osmanabad": ["Bhoom", "Kalamb", "Lohara", "Osmanabad", "Paranda", "Tuljapur", "Umarga", "Washi"],
-    "Palghar": ["Dahanu", "Jawhar", "Mokhada", "Palghar", "Talasari", "Vasai", "Vikramgad", "Wada"],
-    "Parbhani": ["Gangakhed", "Jintur", "Manwath", "Palam", "Parbhani", "Pathri", "Purna", "Sailu", "Sonpeth"],
-    "Pune": ["Ambegaon", "Baramati", "Bhor", "Daund", "Haveli", "Indapur", "Junnar", "Khed", "Mawal", "Mulshi", "Purandar", "Shirur", "Velhe"],
-    "Raigad": ["Alibag", "Karjat", "Khalapur", "Mahad", "Mangaon", "Mhasla", "Murud", "Panvel", "Pen", "Poladpur", "Roha", "Shrivardhan", "Sudhagad", "Tala", "Uran"],
-    "Ratnagiri": ["Chiplun", "Dapoli", "Guhagar", "Khed", "Lanja", "Mandangad", "Rajapur", "Ratnagiri", "Sangameshwar"],
-    "Sangli": ["Atpadi", "Jat", "Kadegaon", "Kavathemahankal", "Khanapur", "Miraj", "Palus", "Shirala", "Tasgaon", "Walwa"],
-    "Satara": ["Jaoli", "Karad", "Khandala", "Khatav", "Koregaon", "Mahabaleshwar", "Man", "Patan", "Phaltan", "Satara", "Wai"],
-    "Sindhudurg": ["Devgad", "Dodamarg", "Kankavli", "Kudal", "Malvan", "Sawantwadi", "Vaibhavwadi", "Vengurla"],
-    "Solapur": ["Akkalkot", "Barshi", "Karmala", "Madha", "Malshiras", "Mangalvedhe", "Mohol", "North Solapur", "Pandharpur", "Sangola", "South Solapur"],
-    "Thane": ["Ambarnath", "Bhiwandi", "Kalyan", "Murbad", "Shahapur", "Thane"],
-    "Wardha": ["Arvi", "Ashti", "Deoli", "Hinganghat", "Karanja", "Samudrapur", "Seloo", "Wardha"],
-    "Washim": ["Karanja", "Malegaon", "Mangrulpir", "Manora", "Risod", "Washim"],
-    "Yavatmal": ["Arni", "Babulgaon", "Darwha", "Digras", "Ghatanji", "Kalamb", "Kelapur", "Mahagaon", "Maregaon", "Ner", "Pusad", "Ralegaon", "Umarkhed", "Wani", "Yavatmal", "Zari Jamani"]
-}
-
-
-# वार्षिक सरासरी पर्जन्यमान (mm) - जिल्हानुसार अंदाजित मूल्ये
-MAHARASHTRA_ANNUAL_RAINFALL_MM = {
-    "Ahmednagar": 575, "Akola": 900, "Amravati": 950, "Beed": 700, "Bhandara": 1300,
-    "Buldhana": 850, "Chandrapur": 1200, "Chhatrapati Sambhajinagar": 730, "Dhule": 680,
-    "Gadchiroli": 1450, "Gondia": 1350, "Hingoli": 820, "Jalgaon": 720, "Jalna": 700,
-    "Kolhapur": 1750, "Latur": 780, "Mumbai City": 2400, "Mumbai Suburban": 2300,
-    "Nagpur": 1100, "Nanded": 930, "Nandurbar": 900, "Nashik": 1000, "Osmanabad": 760,
-    "Palghar": 2200, "Parbhani": 820, "Pune": 850, "Raigad": 3200, "Ratnagiri": 3200,
-    "Sangli": 650, "Satara": 1050, "Sindhudurg": 3000, "Solapur": 560, "Thane": 2100,
-    "Wardha": 1050, "Washim": 880, "Yavatmal": 980
-}
 
-# =========================
-# Soil Details + Steps (Report)
-# =========================
-SOIL_GUIDE = {
-    "Sandy soil": {
-        "details": "पाणी लवकर निचरा होते, पोषकद्रव्य धरून ठेवण्याची क्षमता कमी. सेंद्रिय पदार्थ आणि मल्चिंग गरजेचे.",
-        "steps": [
-            "कंपोस्ट/शेणखत भरपूर मिसळा (ओलावा टिकवण्यासाठी).",
-            "ड्रिप/वारंवार हलके सिंचन करा.",
-            "खते विभागून द्या (split application).",
-            "मल्चिंग करा (तण कमी + ओलावा टिकतो)."
-        ]
-    },
-    "Black soil": {
-        "details": "चिकणमाती जास्त; पाणी धरून ठेवते पण पाणी साचू शकते. निचरा महत्त्वाचा.",
-        "steps": [
-            "निचरा चांगला ठेवा (पाणी साचू देऊ नका).",
-            "सेंद्रिय खत मिसळून माती भुसभुशीत करा.",
-            "पेरणीपूर्वी माती परीक्षण करून pH/NPK तपासा."
-        ]
-    },
-    "Alluvial soil": {
-        "details": "सुपीक माती; पाणी धरणे/निचरा मध्यम. संतुलित NPK व्यवस्थापन केल्यास उत्पादन वाढते.",
-        "steps": [
-            "माती परीक्षण करा आणि NPK शिफारशीनुसार द्या.",
-            "सिंचन नियोजन: अति सिंचन टाळा.",
-            "तण/कीड नियंत्रण नियमित करा."
-        ]
-    },
-    "Red soil": {
-        "details": "सेंद्रिय पदार्थ कमी असू शकतो; सेंद्रिय खत आणि संतुलित खत व्यवस्थापन आवश्यक.",
-        "steps": [
-            "कंपोस्ट/वर्मी-कंपोस्ट वाढवा.",
-            "नत्र (N) व्यवस्थापन split doses मध्ये करा.",
-            "ओलावा टिकवण्यासाठी मल्चिंग करा."
-        ]
-    },
-    "Laterite soil": {
-        "details": "आम्लीय (acidic) असू शकते; पोषकद्रव्य कमी. सेंद्रिय पदार्थ + गरजेनुसार चुना (तज्ज्ञ सल्ल्याने).",
-        "steps": [
-            "pH तपासा; खूप आम्लीय असेल तर liming (तज्ज्ञ सल्ल्याने).",
-            "कंपोस्ट/वर्मी-कंपोस्ट वापरा.",
-            "सूक्ष्मअन्नद्रव्य गरजेप्रमाणे द्या."
-        ]
-    }
-}
-
-# Crop specific quick tips
-CROP_GUIDE = {
-    "tomato": [
-        "रोपे लावताना योग्य अंतर ठेवा; स्टेकिंग/सपोर्ट द्या.",
-        "फुलोऱ्यावर बुरशी/किडीचे निरीक्षण करा.",
-        "पाणी नियमित द्या पण पाणी साचू देऊ नका."
-    ],
-    "potato": [
-        "सरी-वरंबा पद्धत उपयुक्त; माती चढवणे (earthing up) करा.",
-        "जास्त पाणी टाळा; रोग (ब्लाइट) निरीक्षण करा."
-    ],
-    "paddy": [
-        "पाण्याचे नियोजन करा; रोप लावणी/थेट पेरणी योग्य पद्धतीने करा.",
-        "तण नियंत्रण सुरुवातीच्या टप्प्यात महत्वाचे."
-    ],
-    "wheat": [
-        "वेळेवर पेरणी करा; टॉप ड्रेसिंग योग्य वेळी द्या.",
-        "अति पाणी टाळा; मध्यम सिंचन ठेवा."
-    ],
-    "soyabean": [
-        "पाणी साचू देऊ नका; बीजप्रक्रिया (Rhizobium/PSB) फायदेशीर.",
-        "सुरुवातीचे 30-45 दिवस तणमुक्त ठेवा."
-    ],
-    "cotton": [
-        "सुरुवातीच्या अवस्थेत तण नियंत्रण आणि कीड निरीक्षण (बोलवर्म/मावा) करा.",
-        "संतुलित खत व्यवस्थापन ठेवा."
-    ]
-}
+def _load_crop_cube(_path, mmap_mode="r"):
+    from crop_cube import load_crop_cube
+    return load_crop_cube(mmap_mode=mmap_mode)
+
+
+def _load_climatology(_path, mmap_mode="r"):
+    from climatology import load_climatology
+    return load_climatology(mmap_mode=mmap_mode)
+
+
+crop_model = CropModelLoader(MODEL_PATH)
+# Flat-array export of the same forest (crop_forest_compiled.py); used when present
+# and up to date, otherwise predict_crop falls back to the Pipeline.
+compiled_crop_model = CropModelLoader(None, loader=_load_compiled_forest)
+# Precomputed top-k table for Maharashtra (crop_cube.py); None when not built or stale.
+# It only answers when the readings, rounded like the cache key, are grid values.
+recommendation_cube = CropModelLoader(None, loader=_load_crop_cube)
+# Offline monthly normals (climatology.py import); None if not imported.
+climatology_grid = CropModelLoader(None, loader=_load_climatology)
 
-# =========================
-# REPORT BUILD + SAVE
-# =========================
-def build_report(data_dict, crop_en, crop_mr):
-    state_mr = state.get()
-    district_mr = district.get()
-    taluka_mr = taluka.get()
-    soil_mr = soil_type.get()
-    state_en = STATE_ENGLISH_MAP.get(state_mr, state_mr)
-    district_en = DISTRICT_ENGLISH_MAP.get(district_mr, district_mr)
-    soil_en = SOIL_ENGLISH_MAP.get(soil_mr, soil_mr)
-
-    soil_info = SOIL_GUIDE.get(soil_en, {
-        "details": "या मातीसाठी सामान्य शेती पद्धती लागू करा.",
-        "steps": ["माती परीक्षण करा.", "सेंद्रिय खत वाढवा.", "सिंचन/निचरा योग्य ठेवा."]
-    })
-
-    crop_steps = CROP_GUIDE.get(crop_en, [
-        "माती परीक्षण करून स्थानिक शिफारशीनुसार खत व्यवस्थापन करा.",
-        "योग्य बियाणे/रोपे निवडा.",
-        "सिंचन, तण नियंत्रण, कीड/रोग निरीक्षण नियमित करा."
-    ])
-
-    now = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-
-    soil_steps_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(soil_info["steps"])])
-    crop_steps_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(crop_steps)])
-
-    report = f"""
-===================== CROP RECOMMENDATION REPORT =====================
-Generated On: {now}
-
-INPUTS:
-- State (Marathi): {state_mr}
-- State (English): {state_en}
-- District (Marathi): {district_mr}
-- District (English): {district_en}
-- Taluka: {taluka_mr}
-- Soil Type (Marathi): {soil_mr}
-- Soil Type (English): {soil_en}
-
-- N (Nitrogen): {data_dict['N_SOIL'][0]}
-- P (Phosphorus): {data_dict['P_SOIL'][0]}
-- K (Potassium): {data_dict['K_SOIL'][0]}
-- Temperature (°C): {data_dict['TEMPERATURE'][0]}
-- Humidity (%): {data_dict['HUMIDITY'][0]}
-- pH: {data_dict['ph'][0]}
-- Rainfall (mm): {data_dict['RAINFALL'][0]}
-
-RECOMMENDED CROP:
-- English: {crop_en}
-- Marathi: {crop_mr}
-
-SOIL DETAILS:
-{soil_info['details']}
-
-STEP-BY-STEP (Soil Work Plan):
-{soil_steps_txt}
-
-STEP-BY-STEP (Crop Work Plan):
-{crop_steps_txt}
-
-NOTES:
-- हा रिपोर्ट general guidance आहे.
-- अचूक बियाणे प्रमाण, खत डोस, आणि फवारणीसाठी स्थानिक कृषी विभाग/तज्ज्ञ सल्ला घ्या.
-======================================================================
-""".strip()
-    return report
-
-def save_report(report_text, crop_en):
-    os.makedirs("reports", exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join("reports", f"{crop_en}_report_{ts}.txt")
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(report_text)
-    return file_path
+
+def start_local_models():
+    for loader in (crop_model, compiled_crop_model, recommendation_cube, climatology_grid):
+        loader.start_background()
+
+
+if not use_daemon:
+    start_local_models()
+# Repeat requests (same state/soil, near-identical readings) skip the forest;
+# cleared automatically when the model file changes.
+prediction_cache = PredictionCache(model_path=MODEL_PATH)
+
+# Every prediction is appended to reports/prediction_history.sqlite by a
+# background writer; the text report is rendered from the stored row on demand.
+history = get_history_writer()
+
+def show_report(record_id):
+    """Render a stored prediction as the text report in a read-only window."""
+    history.flush(timeout=2.0)
+    record = get_record(record_id)
+    if record is None:
+        messagebox.showerror("Report", f"Report {record_id} not found.")
+        return
+    win = tk.Toplevel(root)
+    win.title(f"Report {record_id}")
+    win.geometry("760x600")
+    text = tk.Text(win, wrap="word", font=("Nirmala UI", 11))
+    text.insert("1.0", render_report(record))
+    text.config(state="disabled")
+    text.pack(fill="both", expand=True)
 
 # =========================
 # GUI SETUP
@@ -502,63 +162,186 @@ def update_talukas(*_):
         taluka_cb["values"] = talukas
         taluka.set(talukas[0])
         fetch_rainfall(silent=True)
+        prefetch_weather()
     else:
         taluka_cb["values"] = ["तालुका मिळाला नाही"]
         taluka.set("तालुका मिळाला नाही")
 
 
+geocoder = TalukaGeocoder()
+
+
 def geocode_taluka(taluka_name, district_en):
-    q = quote(f"{taluka_name}, {district_en}, Maharashtra, India")
-    url = f"https://nominatim.openstreetmap.org/search?q={q}&format=json&limit=1"
-    req = Request(url, headers={"User-Agent": "BE_PROJECT/1.0"})
-    with urlopen(req, timeout=15) as response:
-        payload = json.loads(response.read().decode("utf-8"))
-    if not payload:
-        raise ValueError("Taluka location not found")
-    return float(payload[0]["lat"]), float(payload[0]["lon"])
+    # Bundled taluka_coords.json / SQLite cache first; Nominatim only for unknown talukas.
+    return geocoder.lookup(taluka_name, district_en)
 
 
-def get_selected_location_coords():
+def get_selected_location():
     if state.get() != "महाराष्ट्र":
         raise ValueError("सध्या auto-fill फक्त महाराष्ट्रासाठी उपलब्ध आहे.")
 
     district_en = DISTRICT_ENGLISH_MAP.get(district.get())
     if not district_en or taluka.get().endswith("नाही"):
         raise ValueError("कृपया वैध जिल्हा आणि तालुका निवडा.")
+    return district_en, taluka.get()
+
 
-    lat, lon = geocode_taluka(taluka.get(), district_en)
+def get_selected_location_coords():
+    district_en, taluka_name = get_selected_location()
+    lat, lon = geocode_taluka(taluka_name, district_en)
     return district_en, lat, lon
 
 
+# =========================
+# Weather (background)
+# =========================
+# Geocoding + open-meteo run off the Tk thread; results are polled with root.after.
+weather_client = WeatherClient()
+weather_request = {"selection": None, "future": None, "silent": True}
+WEATHER_POLL_MS = 100
+
+
+def climatology_for(district_en, taluka_name, load=True):
+    """Monthly normals for the taluka; load=False only answers once the grid is loaded."""
+    if not load and not climatology_grid.loaded:
+        return None
+    try:
+        grid = climatology_grid.get()
+    except Exception:
+        return None
+    if grid is None:
+        return None
+    try:
+        lat, lon = geocoder.lookup(taluka_name, district_en, offline=True)
+    except ValueError:
+        return None
+    return grid.lookup(lat, lon)
+
+
+# Last value each field was auto-filled with. A field is only auto-filled when it
+# is empty (or 0) or still holds our previous fill, so typed readings survive a
+# taluka change; the explicit fill buttons always overwrite.
+auto_filled = {}
+
+
+def autofill(var, value, force=False):
+    try:
+        current = var.get()
+    except tk.TclError:
+        current = None
+    if force or current in (None, 0.0) or current == auto_filled.get(str(var)):
+        var.set(value)
+        auto_filled[str(var)] = var.get()
+        return True
+    return False
+
+
+def fill_from_climatology(district_en, taluka_name):
+    """Instant month-aware defaults; live weather overwrites them when it arrives.
+
+    Skipped while the daemon serves predictions and the grid is not loaded yet,
+    so this process does not import numpy just for a placeholder.
+    """
+    normals = climatology_for(district_en, taluka_name, load=False)
+    if not normals:
+        return
+    for var, name in ((temperature, "temperature"), (humidity, "humidity")):
+        if normals[name] == normals[name]:  # not NaN
+            autofill(var, normals[name])
+
+
+def prefetch_weather(silent=True):
+    """Start fetching weather for the selected taluka (no-op if the selection is incomplete).
+
+    One poll loop per request; silent=False (the fill button) also upgrades a
+    request that is already running, so its errors are shown and its values
+    overwrite the form.
+    """
+    try:
+        district_en, taluka_name = get_selected_location()
+    except ValueError:
+        return None
+    selection = (district_en, taluka_name)
+    future = weather_request["future"]
+    if weather_request["selection"] == selection and future is not None and not future.done():
+        weather_request["silent"] = weather_request["silent"] and silent
+        return future
+    if weather_request["selection"] != selection:
+        fill_from_climatology(district_en, taluka_name)
+    # Finished requests are simply resubmitted: WeatherClient answers from its TTL cache.
+    weather_request["selection"] = selection
+    weather_request["silent"] = silent
+    weather_request["future"] = weather_client.prefetch(lambda: geocode_taluka(taluka_name, district_en))
+    root.after(WEATHER_POLL_MS, apply_weather, selection)
+    return weather_request["future"]
+
+
+def apply_weather(selection):
+    future = weather_request["future"]
+    if weather_request["selection"] != selection:
+        return  # taluka changed; a newer request owns the form
+    if not future.done():
+        root.after(WEATHER_POLL_MS, apply_weather, selection)
+        return
+    silent = weather_request["silent"]
+    stale_note = ""
+    try:
+        weather = future.result()
+    except Exception as e:
+        # Offline: newest bulk snapshot (weather_snapshot.py refresh), else monthly normals.
+        # Neither is live, so the label says where the values came from.
+        weather = latest_weather(*selection)
+        if weather is not None:
+            stale_note = f" — जुना डेटा (स्नॅपशॉट {str(weather['fetched_at'])[:16]} UTC)"
+        else:
+            weather = climatology_for(*selection)
+            stale_note = " — मासिक सरासरी (थेट हवामान उपलब्ध नाही)"
+        if weather is None:
+            if silent:
+                return
+            if isinstance(e, WeatherDataMissing):
+                messagebox.showwarning("Weather Missing", "या तालुक्यासाठी सध्याचे तापमान उपलब्ध नाही. कृपया स्वतः भरा.")
+            elif isinstance(e, ValueError):
+                messagebox.showwarning("Location Missing", str(e))
+            else:
+                messagebox.showerror("API Error", "तापमान मिळवताना त्रुटी आली. इंटरनेट/निवड तपासा आणि पुन्हा प्रयत्न करा.")
+            return
+
+    filled = autofill(temperature, float(weather["temperature"]), force=not silent)
+    if weather.get("humidity") is not None:
+        filled = autofill(humidity, float(weather["humidity"]), force=not silent) or filled
+    if not filled:
+        return  # the user typed both readings; leave the form alone
+    result_label.config(
+        text=f"{selection[1]} साठी तापमान {weather['temperature']}°C, आर्द्रता {weather['humidity']}% "
+             f"(पाऊस: {weather.get('precipitation', '-')} mm) भरले{stale_note}",
+        bg="#fff8e1" if stale_note else "#f1f8e9",
+        fg="#1b5e20"
+    )
+
+
 def fetch_temperature():
     try:
-        _, lat, lon = get_selected_location_coords()
-        url = (
-            "https://api.open-meteo.com/v1/forecast"
-            f"?latitude={lat}&longitude={lon}&current=temperature_2m"
-        )
-        req = Request(url, headers={"User-Agent": "BE_PROJECT/1.0"})
-        with urlopen(req, timeout=10) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        current_temp = payload.get("current", {}).get("temperature_2m")
-        if current_temp is None:
-            raise ValueError("Temperature not found")
-        temperature.set(float(current_temp))
-        result_label.config(text=f"{taluka.get()} साठी तापमान भरले: {current_temp}°C", bg="#f1f8e9", fg="#1b5e20")
+        get_selected_location()
     except ValueError as e:
         messagebox.showwarning("Location Missing", str(e))
-    except (URLError, TimeoutError):
-        messagebox.showerror("API Error", "तापमान मिळवताना त्रुटी आली. इंटरनेट/निवड तपासा आणि पुन्हा प्रयत्न करा.")
+        return
+    if prefetch_weather(silent=False) is not None:
+        result_label.config(text=f"{taluka.get()} साठी हवामान मिळवत आहे...", bg="#f1f8e9", fg="#1b5e20")
 
 
 def fetch_rainfall(silent=False):
     try:
-        district_en, _, _ = get_selected_location_coords()
+        district_en, taluka_name = get_selected_location()
         annual_rainfall = MAHARASHTRA_ANNUAL_RAINFALL_MM.get(district_en)
+        if annual_rainfall is None:
+            normals = climatology_for(district_en, taluka_name)
+            annual_rainfall = normals["annual_rainfall"] if normals else None
         if annual_rainfall is None:
             raise ValueError("Annual rainfall not found")
 
-        rainfall.set(float(annual_rainfall))
+        if not autofill(rainfall, float(annual_rainfall), force=not silent):
+            return
         result_label.config(
             text=f"{taluka.get()} ({district.get()}) साठी वार्षिक सरासरी पर्जन्यमान: {annual_rainfall} mm",
             bg="#f1f8e9",
@@ -571,11 +354,76 @@ def fetch_rainfall(silent=False):
 # =========================
 # Predict function
 # =========================
-def predict_crop():
-    if model is None:
-        messagebox.showerror("Model Error", f"Model load failed:\n{MODEL_LOAD_ERROR}")
-        return
+def get_crop_predictor():
+    """Compiled flat-array forest when available, else the sklearn Pipeline."""
+    try:
+        compiled = compiled_crop_model.get()
+    except Exception:
+        compiled = None
+    if compiled is not None:
+        return compiled.predict
+
+    model = crop_model.get()
+
+    def predict_with_pipeline(data):
+        import pandas as pd
+        return model.predict(pd.DataFrame(data))
+    return predict_with_pipeline
 
+
+def lookup_cube(data):
+    """Top crop from the precomputed cube, or None unless the inputs sit on one of its grid points."""
+    if use_daemon:
+        return None  # the daemon answers; the cube is only loaded for local prediction
+    try:
+        cube = recommendation_cube.get()
+    except Exception:
+        return None
+    if cube is None:
+        return None
+    top = cube.lookup(
+        data["STATE"][0],
+        DISTRICT_ENGLISH_MAP.get(district.get()),
+        data["SOIL_TYPE"][0],
+        {k: v[0] for k, v in data.items()},
+    )
+    return top[0][0] if top else None
+
+
+def predict_with_daemon(data):
+    """(crop, model version) from prediction_daemon.py, or None if it is not reachable or rejected the request."""
+    global use_daemon
+    if not use_daemon:
+        return None
+    try:
+        crops, version = predict_crops([{k: v[0] for k, v in data.items()}], with_version=True)
+        return crops[0], version
+    except DaemonUnavailable:
+        # Gone for good: switch to the local model and start loading it.
+        use_daemon = False
+        start_local_models()
+        return None
+    except DaemonError:
+        return None  # this request only; keep using the daemon
+
+
+# Daemon calls and first-use model loading can take seconds, so they run on a
+# worker thread and the result is polled with root.after.
+prediction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crop-predict")
+prediction_request = {"future": None}
+PREDICT_POLL_MS = 50
+
+
+def predict_slow_path(data):
+    """(crop, source, model version) from the daemon, else the local model; runs off the Tk thread."""
+    answer = predict_with_daemon(data)
+    if answer is not None:
+        return answer[0], "daemon", answer[1]
+    predictor = get_crop_predictor()
+    return str(predictor(data)[0]).strip().lower(), "model", model_version_label(MODEL_PATH)
+
+
+def predict_crop():
     try:
         state_value = STATE_ENGLISH_MAP.get(state.get())
         soil_value = SOIL_ENGLISH_MAP.get(soil_type.get())
@@ -597,10 +445,47 @@ def predict_crop():
         messagebox.showerror("Error", "कृपया सर्व value योग्य प्रकारे भरा (numbers) आणि राज्य/जिल्हा/तालुका/माती निवडा.")
         return
 
-    df = pd.DataFrame(data)
+    if prediction_request["future"] is not None:
+        return  # the previous click is still being answered
+
+    # Predict English crop: precomputed cube, then the cache of quantized inputs
+    # (both instant), then the daemon or the local model in the background
+    start = time.perf_counter()
+    source = "cube"
+    crop_en = lookup_cube(data)
+    if crop_en is None:
+        source = "cache"
+        crop_en = prediction_cache.get(data)
+    if crop_en is not None:
+        show_prediction(data, crop_en, source, start)
+        return
+
+    result_label.config(text="शिफारस शोधत आहे...", bg="#f1f8e9", fg="#1b5e20")
+    prediction_request["future"] = prediction_executor.submit(predict_slow_path, data)
+    root.after(PREDICT_POLL_MS, finish_prediction, data, start)
 
-    # Predict English crop
-    crop_en = str(model.predict(df)[0]).strip().lower()
+
+def finish_prediction(data, start):
+    future = prediction_request["future"]
+    if not future.done():
+        root.after(PREDICT_POLL_MS, finish_prediction, data, start)
+        return
+    prediction_request["future"] = None
+    try:
+        crop_en, source, model_version = future.result()
+    except Exception as e:
+        result_label.config(text="शिफारसीसाठी वरची माहिती भरा.", bg="#f1f8e9", fg="#1b5e20")
+        messagebox.showerror("Model Error", f"Model load failed:\n{crop_model.error or e}")
+        return
+    prediction_cache.put(data, crop_en)
+    show_prediction(data, crop_en, source, start, model_version)
+
+
+def show_prediction(data, crop_en, source, start, model_version=None):
+    """model_version: label of the model that answered (None: this process's model file)."""
+    latency_ms = (time.perf_counter() - start) * 1000
+    state_value = data["STATE"][0]
+    soil_value = data["SOIL_TYPE"][0]
 
     # Marathi crop (from JSON)
     crop_mr = CROP_MARATHI_MAP.get(crop_en, crop_en)
@@ -612,11 +497,24 @@ def predict_crop():
         fg="white"
     )
 
-    # Auto-generate report
-    report_text = build_report(data, crop_en, crop_mr)
-    report_path = save_report(report_text, crop_en)
+    # Record the prediction; the report is rendered from it when asked for
+    district_en = DISTRICT_ENGLISH_MAP.get(district.get(), district.get())
+    inputs = {
+        "state_mr": state.get(), "state_en": state_value,
+        "district_mr": district.get(), "district_en": district_en,
+        "taluka": taluka.get(),
+        "soil_mr": soil_type.get(), "soil_en": soil_value,
+        **{k: v[0] for k, v in data.items() if k not in ("STATE", "SOIL_TYPE")},
+    }
+    record_id = history.record(
+        "crop", inputs, {"crop_en": crop_en, "crop_mr": crop_mr},
+        state=state_value, district=district_en, taluka=taluka.get(), soil=soil_value, crop=crop_en,
+        model_version=model_version_label(MODEL_PATH) if model_version is None else model_version,
+        source=source, latency_ms=latency_ms,
+    )
 
-    messagebox.showinfo("Report Generated", f"TXT Report Saved:\n{report_path}\n\n(फोल्डर: reports/)")
+    if messagebox.askyesno("Report Saved", f"Report ID: {record_id}\n\nरिपोर्ट आता पहायचा आहे का?"):
+        show_report(record_id)
 
 # =========================
 # Frame
@@ -674,7 +572,12 @@ ttk.Button(
 
 state_cb.bind("<<ComboboxSelected>>", update_districts)
 district_cb.bind("<<ComboboxSelected>>", update_talukas)
-taluka_cb.bind("<<ComboboxSelected>>", lambda _e: fetch_rainfall(silent=True))
+def on_taluka_selected(_event):
+    fetch_rainfall(silent=True)
+    prefetch_weather()
+
+
+taluka_cb.bind("<<ComboboxSelected>>", on_taluka_selected)
 update_districts()
 
 # Button
@@ -695,7 +598,7 @@ result_label = tk.Label(
 )
 result_label.pack(fill="x", padx=14)
 
-if model is None:
+if not os.path.exists(MODEL_PATH):
     result_label.config(
         text="⚠️ मॉडेल लोड झाले नाही. कृपया model_outputs फोल्डर तपासा.",
         fg="#b71c1c"
@@ -0,0 +1,180 @@
+"""Offline monthly climatology: temperature, humidity and rainfall by coordinate.
+
+`import` turns a regular lat/lon grid of monthly means into
+model_outputs/climatology/grid.npy (float32, lat x lon x 12 x variable)
+plus meta.json with the grid axes. Lookups memory-map the array and
+compute the cell index arithmetically, so a query is a few microseconds
+and needs no network.
+
+Accepted inputs:
+    .csv  long format with columns lat, lon, month (1-12), temperature, humidity, rainfall
+    .nc   NetCDF (needs xarray), e.g. --var temperature=tmp --var humidity=hurs --var rainfall=pre;
+          12 monthly steps on a "month" or "time" dimension
+
+Usage:
+    python climatology.py import cru_maharashtra.nc --var temperature=tmp --var humidity=hurs --var rainfall=pre
+    python climatology.py lookup 18.52 73.85 [--month 6]
+"""
+import argparse
+import json
+import os
+from datetime import date
+
+import numpy as np
+
+CLIMATOLOGY_DIR = "model_outputs/climatology"
+VARIABLES = ("temperature", "humidity", "rainfall")  # degC, %, mm/month
+# Maharashtra with a margin: (lat_min, lat_max, lon_min, lon_max)
+DEFAULT_BBOX = (15.0, 23.0, 72.0, 81.5)
+SEARCH_RADIUS_CELLS = 2  # for coastal points that land in an empty (sea) cell
+
+
+class Climatology:
+    def __init__(self, meta, grid):
+        self.meta = meta
+        self.grid = grid
+        self.lat0, self.dlat, self.nlat = meta["lat0"], meta["dlat"], meta["nlat"]
+        self.lon0, self.dlon, self.nlon = meta["lon0"], meta["dlon"], meta["nlon"]
+
+    def _cell(self, lat, lon):
+        i = int(round((lat - self.lat0) / self.dlat))
+        j = int(round((lon - self.lon0) / self.dlon))
+        if not (0 <= i < self.nlat and 0 <= j < self.nlon):
+            return None
+        if not np.isnan(self.grid[i, j, 0, 0]):
+            return i, j
+        best = None
+        for di in range(-SEARCH_RADIUS_CELLS, SEARCH_RADIUS_CELLS + 1):
+            for dj in range(-SEARCH_RADIUS_CELLS, SEARCH_RADIUS_CELLS + 1):
+                a, b = i + di, j + dj
+                if 0 <= a < self.nlat and 0 <= b < self.nlon and not np.isnan(self.grid[a, b, 0, 0]):
+                    d = di * di + dj * dj
+                    if best is None or d < best[0]:
+                        best = (d, a, b)
+        return best[1:] if best else None
+
+    def lookup(self, lat, lon, month=None):
+        """{"temperature", "humidity", "rainfall" (month), "annual_rainfall"} or None outside the grid."""
+        cell = self._cell(float(lat), float(lon))
+        if cell is None:
+            return None
+        month = month or date.today().month
+        monthly = self.grid[cell[0], cell[1]]
+        values = {name: round(float(monthly[month - 1, k]), 2) for k, name in enumerate(VARIABLES)}
+        values["annual_rainfall"] = round(float(np.nansum(monthly[:, VARIABLES.index("rainfall")])), 1)
+        return values
+
+
+def load_climatology(directory=CLIMATOLOGY_DIR, mmap_mode="r"):
+    """Memory-mapped climatology, or None if it has not been imported."""
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as fp:
+        meta = json.load(fp)
+    return Climatology(meta, np.load(os.path.join(directory, "grid.npy"), mmap_mode=mmap_mode))
+
+
+# =========================
+# Import
+# =========================
+def _axis(values):
+    values = np.unique(np.round(np.asarray(values, dtype=np.float64), 6))
+    step = float(np.median(np.diff(values))) if len(values) > 1 else 1.0
+    return float(values[0]), step, int(round((values[-1] - values[0]) / step)) + 1
+
+
+def _from_csv(path):
+    import pandas as pd
+    df = pd.read_csv(path)
+    missing = [c for c in ("lat", "lon", "month", *VARIABLES) if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in {path}: {', '.join(missing)}")
+    lat0, dlat, nlat = _axis(df["lat"])
+    lon0, dlon, nlon = _axis(df["lon"])
+    grid = np.full((nlat, nlon, 12, len(VARIABLES)), np.nan, dtype=np.float32)
+    i = np.rint((df["lat"].to_numpy() - lat0) / dlat).astype(int)
+    j = np.rint((df["lon"].to_numpy() - lon0) / dlon).astype(int)
+    m = df["month"].to_numpy().astype(int) - 1
+    for k, name in enumerate(VARIABLES):
+        grid[i, j, m, k] = df[name].to_numpy(dtype=np.float32)
+    return (lat0, dlat, lon0, dlon), grid
+
+
+def _from_netcdf(path, variables):
+    import xarray as xr
+    ds = xr.open_dataset(path)
+    lat_name = next(n for n in ("lat", "latitude", "y") if n in ds.coords)
+    lon_name = next(n for n in ("lon", "longitude", "x") if n in ds.coords)
+    ds = ds.sortby([lat_name, lon_name])
+    lats, lons = ds[lat_name].values, ds[lon_name].values
+    lat0, dlat, _ = _axis(lats)
+    lon0, dlon, _ = _axis(lons)
+    layers = []
+    for name in VARIABLES:
+        da = ds[variables[name]]
+        time_dim = next(d for d in da.dims if d not in (lat_name, lon_name))
+        if da.sizes[time_dim] != 12:
+            da = da.groupby(f"{time_dim}.month").mean()
+            time_dim = "month"
+        layers.append(da.transpose(lat_name, lon_name, time_dim).values.astype(np.float32))
+    return (lat0, dlat, lon0, dlon), np.stack(layers, axis=-1)
+
+
+def import_climatology(path, directory=CLIMATOLOGY_DIR, variables=None, bbox=DEFAULT_BBOX):
+    variables = {**{name: name for name in VARIABLES}, **(variables or {})}
+    if path.lower().endswith((".nc", ".nc4", ".netcdf")):
+        (lat0, dlat, lon0, dlon), grid = _from_netcdf(path, variables)
+    else:
+        (lat0, dlat, lon0, dlon), grid = _from_csv(path)
+
+    if bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = bbox
+        i0 = max(0, int(np.floor((lat_min - lat0) / dlat)))
+        i1 = min(grid.shape[0], int(np.ceil((lat_max - lat0) / dlat)) + 1)
+        j0 = max(0, int(np.floor((lon_min - lon0) / dlon)))
+        j1 = min(grid.shape[1], int(np.ceil((lon_max - lon0) / dlon)) + 1)
+        grid = grid[i0:i1, j0:j1]
+        lat0, lon0 = lat0 + i0 * dlat, lon0 + j0 * dlon
+
+    os.makedirs(directory, exist_ok=True)
+    out = np.lib.format.open_memmap(os.path.join(directory, "grid.npy"), mode="w+",
+                                    dtype=np.float32, shape=grid.shape)
+    out[:] = grid
+    out.flush()
+    meta = {
+        "source": os.path.basename(path),
+        "variables": list(VARIABLES),
+        "units": {"temperature": "degC", "humidity": "%", "rainfall": "mm/month"},
+        "lat0": lat0, "dlat": dlat, "nlat": int(grid.shape[0]),
+        "lon0": lon0, "dlon": dlon, "nlon": int(grid.shape[1]),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as fp:
+        json.dump(meta, fp, indent=2)
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline monthly climatology grid")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("path", help=".csv (long format) or .nc")
+    imp.add_argument("--var", action="append", default=[], help="e.g. temperature=tmp (NetCDF variable names)")
+    imp.add_argument("--no-crop", action="store_true", help="keep the full grid instead of the Maharashtra box")
+    look = sub.add_parser("lookup")
+    look.add_argument("lat", type=float)
+    look.add_argument("lon", type=float)
+    look.add_argument("--month", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        variables = dict(item.split("=", 1) for item in args.var)
+        meta = import_climatology(args.path, variables=variables, bbox=None if args.no_crop else DEFAULT_BBOX)
+        print(json.dumps(meta, indent=2))
+    else:
+        clim = load_climatology()
+        print(clim.lookup(args.lat, args.lon, args.month) if clim else "No climatology imported yet.")
+
+
+if __name__ == "__main__":
+    main()
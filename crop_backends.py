@@ -0,0 +1,149 @@
+"""Interchangeable classifiers for the crop recommendation Pipeline.
+
+Every backend shares the same preprocessing (one-hot STATE/SOIL_TYPE +
+numeric passthrough) and is saved as the same joblib `.pkl`, so
+check_predict.py and crop_batch_score.py load any of them unchanged. Only
+tree ensembles (random_forest, extra_trees) can also be exported by
+crop_forest_compiled.py.
+
+Usage:
+    python crop_backends.py compare [--backends random_forest hist_gb ...] [--accuracy-floor 0.90]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from crop_dataset import CLEANED_PATH, DATA_CSV, NUMERIC_COLUMNS, load_crop_dataset
+
+CATEGORICAL_FEATURES = ["STATE", "SOIL_TYPE"]
+FEATURES = CATEGORICAL_FEATURES + NUMERIC_COLUMNS
+BATCH_LATENCY_ROWS = 10_000
+
+
+def build_preprocessor():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+    # Dense output: HistGradientBoosting does not accept sparse input.
+    return ColumnTransformer([
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
+        ("num", "passthrough", NUMERIC_COLUMNS),
+    ], sparse_threshold=0)
+
+
+def _random_forest(**params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**{"n_estimators": 300, "random_state": 42, "n_jobs": -1, **params})
+
+
+def _extra_trees(**params):
+    from sklearn.ensemble import ExtraTreesClassifier
+    return ExtraTreesClassifier(**{"n_estimators": 300, "random_state": 42, "n_jobs": -1, **params})
+
+
+def _hist_gb(**params):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    # No early stopping: its internal stratified validation split raises when a crop
+    # has a single training row, which MIN_CROP_COUNT=2 plus the 80/20 split allows.
+    return HistGradientBoostingClassifier(**{"max_iter": 300, "early_stopping": False, "random_state": 42, **params})
+
+
+def _logreg(**params):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    # Scaling lives inside the classifier step so the shared preprocessor stays identical.
+    return Pipeline([
+        ("scale", StandardScaler()),
+        ("logreg", LogisticRegression(**{"max_iter": 2000, **params})),
+    ])
+
+
+BACKENDS = {
+    "random_forest": _random_forest,
+    "extra_trees": _extra_trees,
+    "hist_gb": _hist_gb,
+    "logreg": _logreg,
+}
+COMPILABLE_BACKENDS = frozenset({"random_forest", "extra_trees"})
+BACKEND_LABELS = {
+    "random_forest": "Random Forest",
+    "extra_trees": "Extra Trees",
+    "hist_gb": "Hist Gradient Boosting",
+    "logreg": "Logistic Regression",
+}
+
+
+def build_crop_pipeline(backend="random_forest", **params):
+    """Pipeline(preprocessor -> classifier) for the given backend name."""
+    from sklearn.pipeline import Pipeline
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown crop model backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return Pipeline([
+        ("preprocessor", build_preprocessor()),
+        ("classifier", BACKENDS[backend](**params)),
+    ])
+
+
+def measure_latency(model, X, repeat=200, batch_rows=BATCH_LATENCY_ROWS, seed=0):
+    """Single-row predict latency (ms) and batch latency for batch_rows rows (ms)."""
+    single = X.iloc[:1]
+    batch = X.sample(n=batch_rows, replace=len(X) < batch_rows, random_state=seed)
+
+    model.predict(single)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(single)
+    single_ms = (time.perf_counter() - start) * 1000.0 / repeat
+
+    model.predict(batch)
+    batch_repeat = 5
+    start = time.perf_counter()
+    for _ in range(batch_repeat):
+        model.predict(batch)
+    batch_ms = (time.perf_counter() - start) * 1000.0 / batch_repeat
+    return {"single_row_ms": round(single_ms, 3), f"batch_{batch_rows}_rows_ms": round(batch_ms, 2)}
+
+
+def compare(backends=None, accuracy_floor=None, csv_path=DATA_CSV, cache_path=CLEANED_PATH, seed=42):
+    """Train each backend on one stratified split; returns (results, fastest backend meeting the floor)."""
+    from sklearn.model_selection import train_test_split
+
+    df = load_crop_dataset(csv_path, cache_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURES], df["CROP"].astype(str), test_size=0.2, random_state=seed, stratify=df["CROP"]
+    )
+
+    results = []
+    for backend in backends or list(BACKENDS):
+        model = build_crop_pipeline(backend)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        accuracy = float(np.mean(model.predict(X_test) == y_test.to_numpy()))
+        results.append({"backend": backend, "accuracy": round(accuracy, 4),
+                        "fit_seconds": round(fit_seconds, 2), **measure_latency(model, X_test)})
+        print(json.dumps(results[-1]))
+
+    eligible = [r for r in results if accuracy_floor is None or r["accuracy"] >= accuracy_floor]
+    best = min(eligible, key=lambda r: r["single_row_ms"])["backend"] if eligible else None
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crop model backends")
+    parser.add_argument("command", choices=["compare"])
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=None)
+    parser.add_argument("--accuracy-floor", type=float, default=None)
+    parser.add_argument("--csv", default=DATA_CSV)
+    args = parser.parse_args()
+
+    results, best = compare(args.backends, args.accuracy_floor, args.csv)
+    with open("model_outputs/backend_comparison.json", "w", encoding="utf-8") as fp:
+        json.dump({"accuracy_floor": args.accuracy_floor, "fastest_meeting_floor": best, "results": results}, fp, indent=2)
+    print(f"\nFastest backend meeting the accuracy floor: {best or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Headless bulk scoring of soil-test records with the crop recommendation model.
+
+Usage:
+    python crop_batch_score.py records.csv --output recommendations.csv [--top-k 3]
+    python crop_batch_score.py records.parquet --output out.parquet --workers 4
+
+Input needs the model columns STATE, SOIL_TYPE, N_SOIL, P_SOIL, K_SOIL,
+TEMPERATURE, HUMIDITY, ph, RAINFALL (other columns are passed through).
+With --fill-weather, rows that have DISTRICT and TALUKA columns get missing
+TEMPERATURE/HUMIDITY from the newest weather_snapshot.py snapshot.
+Records are read and written chunk by chunk, so memory stays bounded by
+chunk size x in-flight chunks regardless of the file size.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from crop_forest_compiled import COMPILED_DIR, load_compiled_forest
+from crop_model_loader import MODEL_PATH
+from reference_data import load_crop_map
+from weather_snapshot import fill_weather
+
+REQUIRED_COLUMNS = ["STATE", "SOIL_TYPE", "N_SOIL", "P_SOIL", "K_SOIL", "TEMPERATURE", "HUMIDITY", "ph", "RAINFALL"]
+CHUNK_SIZE = 50_000
+CROP_MARATHI_MAP = load_crop_map()
+
+_scorer = None
+
+
+# =========================
+# Model
+# =========================
+class _Scorer:
+    """Vectorised predict_proba via the compiled forest when fresh, else the Pipeline."""
+
+    def __init__(self, model_path=MODEL_PATH, compiled_dir=COMPILED_DIR, use_compiled=True):
+        self.compiled = load_compiled_forest(compiled_dir, source_path=model_path) if use_compiled else None
+        if self.compiled is not None:
+            self.classes = self.compiled.classes
+        else:
+            import joblib
+            self.pipeline = joblib.load(model_path, mmap_mode="r")
+            self.classes = self.pipeline.classes_
+
+    def predict_proba(self, df):
+        if self.compiled is not None:
+            return self.compiled.predict_proba(df)
+        return self.pipeline.predict_proba(df[REQUIRED_COLUMNS])
+
+
+def _init_worker(model_path, compiled_dir, use_compiled):
+    global _scorer
+    _scorer = _Scorer(model_path, compiled_dir, use_compiled)
+
+
+def score_chunk(df, top_k=3, scorer=None):
+    """Return df with crop, crop_marathi and top-k crop/probability columns appended."""
+    scorer = scorer or _scorer
+    out = df.copy()
+    valid = df[REQUIRED_COLUMNS].notna().all(axis=1).to_numpy()
+
+    crops = np.full(len(df), "", dtype=object)
+    top_crops = np.full((len(df), top_k), "", dtype=object)
+    top_probs = np.full((len(df), top_k), np.nan, dtype=np.float32)
+    if valid.any():
+        proba = scorer.predict_proba(df.loc[valid].reset_index(drop=True))
+        k = min(top_k, proba.shape[1])
+        order = np.argsort(-proba, axis=1, kind="stable")[:, :k]
+        labels = np.asarray([str(c).strip().lower() for c in scorer.classes], dtype=object)
+        top_crops[valid, :k] = labels[order]
+        top_probs[valid, :k] = np.take_along_axis(proba, order, axis=1)
+        crops[valid] = top_crops[valid, 0]
+
+    out["crop"] = crops
+    out["crop_marathi"] = [CROP_MARATHI_MAP.get(c, c) if c else "" for c in crops]
+    for i in range(top_k):
+        out[f"top{i + 1}_crop"] = top_crops[:, i]
+        out[f"top{i + 1}_prob"] = np.round(top_probs[:, i], 4)
+    return out
+
+
+def _score_in_worker(df, top_k):
+    return score_chunk(df, top_k)
+
+
+# =========================
+# Streaming I/O
+# =========================
+def iter_chunks(path, chunk_size=CHUNK_SIZE):
+    if path.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={"STATE": str, "SOIL_TYPE": str})
+
+
+class _ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.lower().endswith((".parquet", ".pq"))
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False, encoding="utf-8")
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path, output_path, top_k=3, chunk_size=CHUNK_SIZE, workers=1,
+               model_path=MODEL_PATH, compiled_dir=COMPILED_DIR, use_compiled=True, weather=False):
+    """Score input_path into output_path; returns a summary dict."""
+    start = time.perf_counter()
+    rows = 0
+    writer = _ChunkWriter(output_path)
+
+    def check(df):
+        if weather:
+            df = fill_weather(df)
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns in {input_path}: {', '.join(missing)}")
+        return df
+
+    try:
+        if workers <= 1:
+            _init_worker(model_path, compiled_dir, use_compiled)
+            for df in iter_chunks(input_path, chunk_size):
+                writer.write(score_chunk(check(df), top_k))
+                rows += len(df)
+        else:
+            # Keep at most 2 chunks per worker in flight; results are written in input order.
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, compiled_dir, use_compiled)) as pool:
+                pending = deque()
+                for df in iter_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(_score_in_worker, check(df), top_k))
+                    rows += len(df)
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(elapsed, 2),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else None, "output": output_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk crop recommendation scoring")
+    parser.add_argument("input", help=".csv or .parquet")
+    parser.add_argument("--output", default=None, help=".csv or .parquet (default: <input>_scored.csv)")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--no-compiled", action="store_true", help="always use the sklearn Pipeline")
+    parser.add_argument("--fill-weather", action="store_true", help="fill TEMPERATURE/HUMIDITY from the weather snapshot")
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scored.csv"
+    summary = score_file(args.input, output, top_k=args.top_k, chunk_size=args.chunk_size,
+                         workers=args.workers, model_path=args.model, use_compiled=not args.no_compiled,
+                         weather=args.fill_weather)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
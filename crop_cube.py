@@ -0,0 +1,230 @@
+"""Precomputed top-k crop recommendations for Maharashtra.
+
+The crop model is evaluated offline over every district (its annual
+rainfall from MAHARASHTRA_ANNUAL_RAINFALL_MM; districts with the same
+rainfall share a slice) x every soil in SOIL_ENGLISH_MAP x a grid of
+N/P/K/pH/temperature/humidity values. Grid values are round numbers at the
+prediction cache's precision (DEFAULT_PRECISION), e.g. N = 0, 20, 40, ...
+The top-k crop indexes and probabilities are stored as .npy files that
+are memory-mapped at lookup time.
+
+A lookup rounds every reading to DEFAULT_PRECISION, exactly like the
+prediction cache key, and answers only when all of them land on grid
+values and the rainfall is the district's value. A hit is therefore the
+model's own top-k for the rounded inputs (probabilities stored as
+float16). Anything else (another state, readings between grid values)
+returns None and predict_crop uses the live model.
+
+Usage:
+    python crop_cube.py build [--top-k 3] [--grid N_SOIL=0:20:8 ph=5.0:0.5:7 ...] [--workers 4]
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from crop_model_loader import MODEL_PATH
+from crop_prediction_cache import DEFAULT_PRECISION
+from reference_data import MAHARASHTRA_ANNUAL_RAINFALL_MM, MAHARASHTRA_DISTRICTS, SOIL_ENGLISH_MAP
+
+CUBE_DIR = "model_outputs/crop_cube"
+CUBE_STATE = "Maharashtra"
+# (first value, step, count); low and step must be exact at DEFAULT_PRECISION.
+CUBE_DIMS = {
+    "N_SOIL": (0, 20, 8),            # 0 .. 140
+    "P_SOIL": (5, 20, 8),            # 5 .. 145
+    "K_SOIL": (5, 40, 6),            # 5 .. 205
+    "ph": (4.5, 1.0, 5),             # 4.5 .. 8.5
+    "TEMPERATURE": (15.0, 5.0, 5),   # 15 .. 35
+    "HUMIDITY": (30, 15, 5),         # 30 .. 90
+}
+
+
+def round_reading(name, value):
+    """value rounded as in the prediction cache key (DEFAULT_PRECISION digits)."""
+    digits = DEFAULT_PRECISION.get(name, 0)
+    return float(f"{float(value):.{digits}f}")
+
+
+def _grid_index(dim, value):
+    """Position of value on the dimension's grid, or None if it is not a grid value."""
+    scale = 10 ** dim["digits"]
+    offset = round(value * scale) - round(dim["low"] * scale)
+    i, rest = divmod(offset, round(dim["step"] * scale))
+    return i if rest == 0 and 0 <= i < dim["count"] else None
+
+
+def _grid_dims(dims):
+    out = {}
+    for name, (low, step, count) in dims.items():
+        digits = DEFAULT_PRECISION.get(name, 0)
+        if round_reading(name, low) != low or round_reading(name, step) != step or step <= 0:
+            raise ValueError(f"{name}: low {low} and step {step} must be exact to {digits} decimal place(s)")
+        values = [round_reading(name, low + i * step) for i in range(count)]
+        out[name] = {"low": low, "step": step, "count": count, "digits": digits, "values": values}
+    return out
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+class CropCube:
+    def __init__(self, meta, top_class, top_prob):
+        self.meta = meta
+        self.classes = meta["classes"]
+        self.top_class = top_class
+        self.top_prob = top_prob
+        self.soil_index = {s: i for i, s in enumerate(meta["soils"])}
+        self.rainfall = meta["rainfall"]
+        self.district_rain = meta["district_rain_index"]
+        self.dims = list(meta["dims"].items())
+
+    def lookup(self, state, district, soil, values):
+        """values: mapping with the CUBE_DIMS columns and RAINFALL.
+
+        Returns [(crop, probability), ...] best first, or None unless the
+        rounded readings are a grid point of the cube.
+        """
+        if state != self.meta["state"] or soil not in self.soil_index or district not in self.district_rain:
+            return None
+        rain_idx = self.district_rain[district]
+        if round_reading("RAINFALL", values["RAINFALL"]) != self.rainfall[rain_idx]:
+            return None
+        index = [rain_idx, self.soil_index[soil]]
+        for name, dim in self.dims:
+            i = _grid_index(dim, round_reading(name, values[name]))
+            if i is None:
+                return None
+            index.append(i)
+        index = tuple(index)
+        return [(self.classes[c], float(p)) for c, p in zip(self.top_class[index], self.top_prob[index])]
+
+
+def load_crop_cube(directory=CUBE_DIR, source_path=MODEL_PATH, mmap_mode="r"):
+    """Load the cube; None if missing or built from an older model file."""
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as fp:
+        meta = json.load(fp)
+    if source_path and os.path.exists(source_path) and meta.get("source_signature") != _file_signature(source_path):
+        return None
+    if any("values" not in dim for dim in meta["dims"].values()):
+        return None  # built with the old binned layout; rebuild
+    top_class = np.load(os.path.join(directory, "top_class.npy"), mmap_mode=mmap_mode)
+    top_prob = np.load(os.path.join(directory, "top_prob.npy"), mmap_mode=mmap_mode)
+    return CropCube(meta, top_class, top_prob)
+
+
+# =========================
+# Build
+# =========================
+_proba_fn = None
+
+
+def _init_worker(model_path):
+    global _proba_fn
+    import joblib
+    from crop_forest_compiled import compile_pipeline
+    pipeline = joblib.load(model_path, mmap_mode="r")
+    try:
+        _proba_fn = compile_pipeline(pipeline).predict_proba
+    except TypeError:  # not a tree ensemble: use the Pipeline itself
+        import pandas as pd
+        _proba_fn = lambda columns: pipeline.predict_proba(pd.DataFrame(columns))
+
+
+def _grid_columns(dims):
+    points = list(itertools.product(*(d["values"] for d in dims.values())))
+    return {name: [p[j] for p in points] for j, name in enumerate(dims)}
+
+
+def _evaluate_slice(rainfall, soil, grid, top_k):
+    n = len(next(iter(grid.values())))
+    columns = {"STATE": [CUBE_STATE] * n, "SOIL_TYPE": [soil] * n, "RAINFALL": [rainfall] * n, **grid}
+    proba = _proba_fn(columns)
+    order = np.argsort(-proba, axis=1, kind="stable")[:, :top_k]
+    return order, np.take_along_axis(proba, order, axis=1)
+
+
+def build(model_path=MODEL_PATH, directory=CUBE_DIR, dims=None, top_k=3, workers=1):
+    dims = _grid_dims(dims or CUBE_DIMS)
+    # Evaluated at the rounded district rainfall, the value a lookup compares against.
+    district_mm = {d: round_reading("RAINFALL", MAHARASHTRA_ANNUAL_RAINFALL_MM[d]) for d in MAHARASHTRA_DISTRICTS
+                   if d in MAHARASHTRA_ANNUAL_RAINFALL_MM}
+    rainfall = sorted(set(district_mm.values()))
+    district_rain = {d: rainfall.index(mm) for d, mm in district_mm.items()}
+    soils = list(SOIL_ENGLISH_MAP.values())
+    grid = _grid_columns(dims)
+
+    import joblib
+    classes = [str(c).strip().lower() for c in joblib.load(model_path, mmap_mode="r").classes_]
+    top_k = min(top_k, len(classes))
+    grid_shape = tuple(d["count"] for d in dims.values())
+    shape = (len(rainfall), len(soils)) + grid_shape + (top_k,)
+
+    os.makedirs(directory, exist_ok=True)
+    class_dtype = np.uint8 if len(classes) <= 256 else np.uint16
+    top_class = np.lib.format.open_memmap(os.path.join(directory, "top_class.npy"), mode="w+",
+                                          dtype=class_dtype, shape=shape)
+    top_prob = np.lib.format.open_memmap(os.path.join(directory, "top_prob.npy"), mode="w+",
+                                         dtype=np.float16, shape=shape)
+
+    start = time.perf_counter()
+    slices = list(itertools.product(range(len(rainfall)), range(len(soils))))
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker, initargs=(model_path,)) as pool:
+        futures = [pool.submit(_evaluate_slice, rainfall[r], soils[s], grid, top_k) for r, s in slices]
+        for (r, s), future in zip(slices, futures):
+            order, proba = future.result()
+            top_class[r, s] = order.reshape(grid_shape + (top_k,))
+            top_prob[r, s] = proba.reshape(grid_shape + (top_k,))
+    top_class.flush()
+    top_prob.flush()
+
+    meta = {
+        "state": CUBE_STATE,
+        "classes": classes,
+        "soils": soils,
+        "rainfall": rainfall,
+        "district_rain_index": district_rain,
+        "dims": dims,
+        "top_k": top_k,
+        "cells": int(np.prod(shape[:-1])),
+        "source_signature": _file_signature(model_path),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as fp:
+        json.dump(meta, fp, ensure_ascii=False, indent=2)
+    return {"cells": meta["cells"], "seconds": round(time.perf_counter() - start, 1), "directory": directory,
+            "size_mb": round((top_class.nbytes + top_prob.nbytes) / 2**20, 1)}
+
+
+def _parse_grid(items):
+    dims = dict(CUBE_DIMS)
+    for item in items or []:
+        name, spec = item.split("=")
+        if name not in dims:
+            raise SystemExit(f"Unknown cube dimension: {name} (choose from {', '.join(dims)})")
+        low, step, count = spec.split(":")
+        dims[name] = (float(low), float(step), int(count))
+    return dims
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed crop recommendation cube")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--grid", nargs="*", help="first:step:count per column, e.g. N_SOIL=0:20:8 ph=5.0:0.5:7")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(build(args.model, dims=_parse_grid(args.grid), top_k=args.top_k, workers=args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
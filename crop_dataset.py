@@ -0,0 +1,179 @@
+"""Memory-lean loading of the crop recommendation dataset.
+
+The CSV is parsed in chunks with compact dtypes (category for STATE,
+SOIL_TYPE and CROP, float32 for the readings); rows with missing values are
+dropped and crop counts are accumulated chunk by chunk, so the raw
+float64/object frame never exists in memory. The cleaned result is cached
+as Parquet next to a small sidecar file (CSV signature plus per-crop counts
+before the rare-crop filter); later runs read the Parquet unless the CSV
+(or the cleaning settings) changed.
+
+Usage:
+    python crop_dataset.py [--csv crop_data.csv] [--rebuild]
+"""
+import argparse
+import json
+import os
+from collections import Counter
+
+import pandas as pd
+
+DATA_CSV = "crop_data.csv"
+CLEANED_PATH = "model_outputs/cleaned_crop_data.parquet"
+CHUNK_SIZE = 100_000
+MIN_CROP_COUNT = 2
+
+CATEGORICAL_COLUMNS = ["STATE", "SOIL_TYPE", "CROP"]
+NUMERIC_COLUMNS = ["N_SOIL", "P_SOIL", "K_SOIL", "TEMPERATURE", "HUMIDITY", "ph", "RAINFALL"]
+DTYPES = {**{c: "category" for c in CATEGORICAL_COLUMNS}, **{c: "float32" for c in NUMERIC_COLUMNS}}
+
+
+def _signature(csv_path, min_count):
+    st = os.stat(csv_path)
+    return {"source": os.path.abspath(csv_path), "mtime_ns": st.st_mtime_ns, "size": st.st_size,
+            "min_crop_count": min_count}
+
+
+def _signature_path(cache_path):
+    return f"{cache_path}.json"
+
+
+def _read_sidecar(cache_path):
+    path = _signature_path(cache_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def _write_cache(df, crop_counts, csv_path, cache_path, min_count):
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        df.to_parquet(cache_path, index=False)
+        with open(_signature_path(cache_path), "w", encoding="utf-8") as fp:
+            json.dump({"signature": _signature(csv_path, min_count),
+                       "crop_counts": {str(k): int(v) for k, v in crop_counts.items()}}, fp, indent=2)
+    except ImportError as e:
+        print(f"Parquet cache skipped ({e}); install pyarrow to enable it.")
+
+
+def _concat_categorical(chunks):
+    """pd.concat keeps category dtype only when categories match, so align them first."""
+    for column in CATEGORICAL_COLUMNS:
+        categories = sorted(set().union(*(chunk[column].cat.categories for chunk in chunks)))
+        dtype = pd.CategoricalDtype(categories)
+        for chunk in chunks:
+            chunk[column] = chunk[column].astype(dtype)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_clean_csv(csv_path=DATA_CSV, chunk_size=CHUNK_SIZE, min_count=MIN_CROP_COUNT, with_counts=False):
+    """Chunked read + dropna + removal of crops with fewer than min_count rows.
+
+    with_counts=True also returns the per-crop counts of complete rows
+    before the rare-crop filter.
+    """
+    chunks, crop_counts = [], Counter()
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=DTYPES):
+        chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        counts = chunk["CROP"].value_counts()
+        crop_counts.update(counts[counts > 0].to_dict())
+        chunks.append(chunk)
+    if not chunks:
+        raise ValueError(f"No complete rows in {csv_path}")
+
+    df = _concat_categorical(chunks)
+    del chunks
+    valid_crops = [crop for crop, n in crop_counts.items() if n >= min_count]
+    df = df[df["CROP"].isin(valid_crops)].reset_index(drop=True)
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].cat.remove_unused_categories()
+    return (df, crop_counts) if with_counts else df
+
+
+def load_crop_dataset(csv_path=DATA_CSV, cache_path=CLEANED_PATH, chunk_size=CHUNK_SIZE,
+                      min_count=MIN_CROP_COUNT, rebuild=False):
+    """Cleaned dataset, from the Parquet cache when it matches the CSV."""
+    sidecar = _read_sidecar(cache_path)
+    if (not rebuild and sidecar and os.path.exists(cache_path)
+            and sidecar.get("signature") == _signature(csv_path, min_count)):
+        return pd.read_parquet(cache_path)
+
+    df, crop_counts = read_clean_csv(csv_path, chunk_size, min_count, with_counts=True)
+    _write_cache(df, crop_counts, csv_path, cache_path, min_count)
+    return df
+
+
+def _read_crop_rows(csv_path, crops, chunk_size=CHUNK_SIZE):
+    """Complete CSV rows of the given crops, in file order."""
+    parts = [chunk[chunk["CROP"].isin(crops)]
+             for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=DTYPES)]
+    parts = [part.dropna() for part in parts if len(part)]
+    return pd.concat(parts, ignore_index=True).astype(DTYPES) if parts else None
+
+
+def append_rows(new_rows, csv_path=DATA_CSV, cache_path=CLEANED_PATH, min_count=MIN_CROP_COUNT):
+    """Append labelled rows to the CSV and the cleaned cache without re-parsing the CSV.
+
+    The rare-crop filter is applied to the unfiltered per-crop totals, so the
+    cache keeps the same rows a full rebuild would. When a crop reaches
+    min_count only now, its earlier CSV rows (dropped until then) are read
+    back and added too.
+
+    Returns (cleaned dataset, number of rows added). Added rows are placed
+    at the end, so earlier row positions stay valid.
+    """
+    missing = [c for c in DTYPES if c not in new_rows.columns]
+    if missing:
+        raise ValueError(f"New rows are missing columns: {', '.join(missing)}")
+    sidecar = _read_sidecar(cache_path)
+    if sidecar and os.path.exists(cache_path) and sidecar.get("signature") == _signature(csv_path, min_count):
+        df = pd.read_parquet(cache_path)
+        crop_counts = Counter(sidecar["crop_counts"])
+    else:
+        df, counts = read_clean_csv(csv_path, min_count=min_count, with_counts=True)
+        crop_counts = Counter({str(k): int(v) for k, v in counts.items()})
+
+    new = new_rows[list(DTYPES)].dropna().astype(DTYPES)
+    new_counts = {str(k): int(v) for k, v in new["CROP"].value_counts().items() if v > 0}
+    revived = [crop for crop, n in new_counts.items() if 0 < crop_counts[crop] < min_count <= crop_counts[crop] + n]
+    earlier = _read_crop_rows(csv_path, revived) if revived else None
+    crop_counts.update(new_counts)
+
+    with open(csv_path, "r", encoding="utf-8") as fp:
+        header = fp.readline().strip().split(",")
+    needs_newline = False
+    with open(csv_path, "rb") as fp:
+        if fp.seek(0, os.SEEK_END):
+            fp.seek(-1, os.SEEK_END)
+            needs_newline = fp.read(1) != b"\n"
+    with open(csv_path, "a", encoding="utf-8", newline="") as fp:
+        if needs_newline:
+            fp.write("\n")
+        new_rows.reindex(columns=header).to_csv(fp, header=False, index=False)
+
+    new = new[new["CROP"].astype(str).map(lambda crop: crop_counts[crop] >= min_count)]
+    added = [part.reset_index(drop=True) for part in (earlier, new) if part is not None and len(part)]
+    if added:
+        df = _concat_categorical([df, *added])
+    _write_cache(df, crop_counts, csv_path, cache_path, min_count)
+    return df, sum(len(part) for part in added)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cleaned crop dataset cache")
+    parser.add_argument("--csv", default=DATA_CSV)
+    parser.add_argument("--cache", default=CLEANED_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    df = load_crop_dataset(args.csv, args.cache, args.chunk_size, rebuild=args.rebuild)
+    print(f"Rows: {len(df)}, crop classes: {df['CROP'].nunique()}, "
+          f"memory: {df.memory_usage(deep=True).sum() / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
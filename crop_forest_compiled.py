@@ -0,0 +1,262 @@
+"""Flat-array inference for the crop recommendation forest.
+
+The trained Pipeline (ColumnTransformer[OneHotEncoder + passthrough] ->
+RandomForest/ExtraTrees) is exported into contiguous numpy arrays: one set
+of node arrays for all trees plus precomputed one-hot column indexes for
+STATE and SOIL_TYPE. Prediction takes plain columns (no pandas) and walks
+all trees at once.
+
+Outputs match `model.predict` / `model.predict_proba`: the same float32
+feature comparisons and per-tree normalisation, accumulated tree by tree
+(differences are limited to float summation order, ~1e-15).
+
+Usage:
+    python crop_forest_compiled.py export      # write model_outputs/crop_forest_compiled/
+    python crop_forest_compiled.py bench [--rows 2000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from crop_model_loader import MODEL_PATH
+
+COMPILED_DIR = "model_outputs/crop_forest_compiled"
+_ARRAYS = ("feature", "threshold", "left", "right", "leaf_value", "roots")
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+class CompiledForest:
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.classes = np.asarray(meta["classes"], dtype=object)
+        self.categorical = [(c["column"], c["offset"], {v: i for i, v in enumerate(c["categories"])})
+                            for c in meta["categorical"]]
+        self.numeric_columns = meta["numeric_columns"]
+        self.numeric_offset = meta["numeric_offset"]
+        self.n_features = meta["n_features"]
+        self.max_depth = meta["max_depth"]
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+
+    # -------------------------
+    # Input encoding
+    # -------------------------
+    def encode(self, columns):
+        """Columns mapping (e.g. the predict_crop `data` dict) -> float32 feature matrix."""
+        n = len(columns[self.numeric_columns[0]])
+        X = np.zeros((n, self.n_features), dtype=np.float32)
+        rows = np.arange(n)
+        for column, offset, index in self.categorical:
+            idx = np.fromiter((index.get(v, -1) for v in columns[column]), dtype=np.int64, count=n)
+            known = idx >= 0  # unknown categories stay all-zero (handle_unknown="ignore")
+            X[rows[known], offset + idx[known]] = 1.0
+        for j, column in enumerate(self.numeric_columns):
+            X[:, self.numeric_offset + j] = np.asarray(columns[column], dtype=np.float32)
+        return X
+
+    # -------------------------
+    # Prediction
+    # -------------------------
+    def leaves(self, X):
+        """Leaf node index per (row, tree)."""
+        X = np.asarray(X, dtype=np.float32)
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        nodes = np.repeat(self.roots[None, :], n, axis=0)
+        # Leaves point to themselves, so a fixed number of steps is safe.
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba_encoded(self, X):
+        nodes = self.leaves(X)
+        proba = np.zeros((nodes.shape[0], len(self.classes)), dtype=np.float64)
+        for t in range(nodes.shape[1]):
+            proba += self.leaf_value[nodes[:, t]]
+        proba /= nodes.shape[1]
+        return proba
+
+    def predict_proba(self, columns):
+        return self.predict_proba_encoded(self.encode(columns))
+
+    def predict(self, columns):
+        return self.classes.take(np.argmax(self.predict_proba(columns), axis=1))
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def save(self, directory=COMPILED_DIR):
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as fp:
+            json.dump(self.meta, fp, ensure_ascii=False, indent=2)
+        return directory
+
+
+def compile_pipeline(pipeline, source_path=None):
+    """Export a fitted crop Pipeline into a CompiledForest."""
+    preprocessor = pipeline.named_steps["preprocessor"]
+    forest = pipeline.named_steps["classifier"]
+    if not hasattr(forest, "estimators_") or not hasattr(forest.estimators_[0], "tree_"):
+        raise TypeError(f"Only tree ensembles can be compiled, got {type(forest).__name__}")
+    if getattr(forest, "n_outputs_", 1) != 1:
+        raise TypeError("Multi-output forests are not supported")
+
+    categorical, numeric_columns = [], []
+    offset, numeric_offset = 0, None
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder" and transformer == "drop":
+            continue
+        # Newer sklearn stores "passthrough" as an identity FunctionTransformer.
+        if isinstance(transformer, str) and transformer == "passthrough" or (
+            type(transformer).__name__ == "FunctionTransformer" and transformer.func is None
+        ):
+            numeric_offset = offset
+            numeric_columns = list(columns)
+            offset += len(columns)
+        elif type(transformer).__name__ == "OneHotEncoder":
+            if transformer.drop is not None:
+                raise TypeError("OneHotEncoder(drop=...) is not supported")
+            for column, cats in zip(columns, transformer.categories_):
+                categorical.append({"column": column, "offset": offset, "categories": [c.item() if hasattr(c, "item") else c for c in cats]})
+                offset += len(cats)
+        else:
+            raise TypeError(f"Unsupported transformer in preprocessor: {name}")
+
+    n_classes = len(forest.classes_)
+    feature, threshold, left, right, leaf_value, roots = [], [], [], [], [], []
+    base, max_depth = 0, 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(n, dtype=np.int32) + base
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+        left.append(np.where(is_leaf, node_ids, tree.children_left + base).astype(np.int32))
+        right.append(np.where(is_leaf, node_ids, tree.children_right + base).astype(np.int32))
+        # Same normalisation as DecisionTreeClassifier.predict_proba.
+        value = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, None]
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_value.append(value / normalizer)
+        roots.append(base)
+        base += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    meta = {
+        "classes": [c.item() if hasattr(c, "item") else c for c in forest.classes_],
+        "categorical": categorical,
+        "numeric_columns": numeric_columns,
+        "numeric_offset": numeric_offset if numeric_offset is not None else offset,
+        "n_features": offset,
+        "n_trees": len(forest.estimators_),
+        "max_depth": int(max_depth),
+        "source_signature": _file_signature(source_path) if source_path else None,
+    }
+    arrays = {
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "leaf_value": np.concatenate(leaf_value),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    return CompiledForest(meta, arrays)
+
+
+def load_compiled_forest(directory=COMPILED_DIR, source_path=MODEL_PATH, mmap_mode="r"):
+    """Load a compiled forest; None if missing or older than the .pkl it came from."""
+    meta_path = os.path.join(directory, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as fp:
+        meta = json.load(fp)
+    if source_path and os.path.exists(source_path) and meta.get("source_signature") != _file_signature(source_path):
+        return None
+    arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+    return CompiledForest(meta, arrays)
+
+
+def export(model_path=MODEL_PATH, directory=COMPILED_DIR):
+    import joblib
+    compiled = compile_pipeline(joblib.load(model_path), source_path=model_path)
+    return compiled.save(directory)
+
+
+# =========================
+# Microbenchmark
+# =========================
+def _sample_columns(compiled, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for column, _, index in compiled.categorical:
+        cats = list(index)
+        columns[column] = [cats[i] for i in rng.integers(0, len(cats), rows)]
+    ranges = {"N_SOIL": (0, 140), "P_SOIL": (5, 145), "K_SOIL": (5, 205), "TEMPERATURE": (8, 44),
+              "HUMIDITY": (14, 100), "ph": (3.5, 9.9), "RAINFALL": (20, 3000)}
+    for column in compiled.numeric_columns:
+        lo, hi = ranges.get(column, (0, 100))
+        columns[column] = np.round(rng.uniform(lo, hi, rows), 2).tolist()
+    return columns
+
+
+def benchmark(model_path=MODEL_PATH, rows=2000, repeat=200):
+    import joblib
+    import pandas as pd
+
+    pipeline = joblib.load(model_path)
+    compiled = compile_pipeline(pipeline, source_path=model_path)
+    columns = _sample_columns(compiled, rows)
+    df = pd.DataFrame(columns)
+
+    ref_proba = pipeline.predict_proba(df)
+    new_proba = compiled.predict_proba(columns)
+    labels_equal = bool(np.array_equal(pipeline.predict(df), compiled.predict(columns)))
+
+    single = {k: [v[0]] for k, v in columns.items()}
+
+    def per_call_ms(fn, n=repeat):
+        fn()
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) * 1000.0 / n
+
+    batch_repeat = max(1, repeat // 20)
+    return {
+        "rows_checked": rows,
+        "labels_identical": labels_equal,
+        "max_abs_proba_diff": float(np.max(np.abs(ref_proba - new_proba))),
+        "single_row_ms_pipeline": round(per_call_ms(lambda: pipeline.predict(pd.DataFrame(single))), 3),
+        "single_row_ms_compiled": round(per_call_ms(lambda: compiled.predict(single)), 3),
+        f"batch_{rows}_rows_ms_pipeline": round(per_call_ms(lambda: pipeline.predict_proba(df), batch_repeat), 3),
+        f"batch_{rows}_rows_ms_compiled": round(per_call_ms(lambda: compiled.predict_proba(columns), batch_repeat), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled flat-array crop forest")
+    parser.add_argument("command", choices=["export", "bench"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Compiled forest saved: {export(args.model)}")
+    else:
+        print(json.dumps(benchmark(args.model, args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
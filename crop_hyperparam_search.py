@@ -0,0 +1,187 @@
+"""Hyperparameter search for the crop forest: accuracy vs size vs latency.
+
+For every (max_depth, min_samples_leaf, max_features) combination and CV
+fold a worker process fits the preprocessor once and grows one forest with
+warm_start through the requested tree counts (e.g. 40 -> 80 -> 150 -> 300),
+scoring the fold after each step instead of refitting from scratch.
+
+Per-row predict latency is measured afterwards in the main process, one
+configuration at a time, on the fold-0 forest truncated to each tree count
+(warm_start keeps the first n trees identical), so timings are not skewed
+by the parallel fits.
+
+Usage:
+    python crop_hyperparam_search.py [--trees 40 80 150 300] [--folds 5] [--workers 4]
+
+Writes model_outputs/hyperparam_search.csv and hyperparam_search.png.
+"""
+import argparse
+import copy
+import itertools
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from crop_backends import FEATURES, build_preprocessor
+from crop_dataset import CLEANED_PATH, DATA_CSV, load_crop_dataset
+
+RESULTS_CSV = "model_outputs/hyperparam_search.csv"
+RESULTS_PLOT = "model_outputs/hyperparam_search.png"
+
+DEFAULT_GRID = {
+    "n_estimators": [40, 80, 150, 300],
+    "max_depth": [None, 20, 12],
+    "min_samples_leaf": [1, 2, 5],
+    "max_features": ["sqrt", 0.5],
+}
+
+_data = None
+
+
+def _init_worker(X, y):
+    global _data
+    _data = (X, y)
+
+
+def _forest_nodes(forest, n_trees):
+    return int(sum(est.tree_.node_count for est in forest.estimators_[:n_trees]))
+
+
+def _truncate(forest, n_trees):
+    small = copy.copy(forest)
+    small.estimators_ = forest.estimators_[:n_trees]
+    small.n_estimators = n_trees
+    return small
+
+
+# =========================
+# Worker: one config x one fold
+# =========================
+def _fit_fold(params, tree_counts, train_idx, test_idx, return_model, seed):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = _data
+    preprocessor = build_preprocessor()
+    X_train = preprocessor.fit_transform(X.iloc[train_idx])
+    X_test = preprocessor.transform(X.iloc[test_idx])
+    y_train, y_test = y[train_idx], y[test_idx]
+
+    forest = RandomForestClassifier(warm_start=True, random_state=seed, n_jobs=1, **params)
+    rows = []
+    for n_trees in sorted(tree_counts):
+        forest.set_params(n_estimators=n_trees)
+        start = time.perf_counter()
+        forest.fit(X_train, y_train)  # adds only the missing trees
+        fit_seconds = time.perf_counter() - start
+        rows.append({
+            "n_estimators": n_trees,
+            "accuracy": float(np.mean(forest.predict(X_test) == y_test)),
+            "nodes": _forest_nodes(forest, n_trees),
+            "fit_seconds": fit_seconds,
+        })
+    model = (preprocessor, forest, X.iloc[test_idx[:1]]) if return_model else None
+    return params, rows, model
+
+
+# =========================
+# Search
+# =========================
+def _per_row_latency_ms(preprocessor, forest, row, repeat):
+    forest.predict(preprocessor.transform(row))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        forest.predict(preprocessor.transform(row))
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def search(grid=None, folds=5, workers=None, repeat=200, seed=42,
+           csv_path=DATA_CSV, cache_path=CLEANED_PATH):
+    """Run the CV search; returns a DataFrame with one row per configuration."""
+    import pandas as pd
+    from sklearn.model_selection import StratifiedKFold
+
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    df = load_crop_dataset(csv_path, cache_path)
+    X = df[FEATURES]
+    y = df["CROP"].astype(str).to_numpy()
+
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y))
+    combos = [dict(zip(("max_depth", "min_samples_leaf", "max_features"), values))
+              for values in itertools.product(grid["max_depth"], grid["min_samples_leaf"], grid["max_features"])]
+
+    fold_rows, models = [], {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(X, y)) as pool:
+        futures = [(config, pool.submit(_fit_fold, params, grid["n_estimators"], train_idx, test_idx, fold == 0, seed))
+                   for config, params in enumerate(combos) for fold, (train_idx, test_idx) in enumerate(splits)]
+        for config, future in futures:
+            _, rows, model = future.result()
+            if model is not None:
+                models[config] = model
+            fold_rows.extend({"config": config, **row} for row in rows)
+
+    results = (pd.DataFrame(fold_rows)
+               .groupby(["config", "n_estimators"], as_index=False)
+               .agg(accuracy=("accuracy", "mean"), accuracy_std=("accuracy", "std"),
+                    nodes=("nodes", "mean"), fit_seconds=("fit_seconds", "mean")))
+
+    # Latency + size on the fold-0 forest, serially in this process.
+    latency, size_kb = [], []
+    for config, n_trees in zip(results["config"], results["n_estimators"]):
+        preprocessor, forest, row = models[config]
+        small = _truncate(forest, int(n_trees))
+        latency.append(_per_row_latency_ms(preprocessor, small, row, repeat))
+        size_kb.append(len(pickle.dumps(small, protocol=pickle.HIGHEST_PROTOCOL)) / 1024.0)
+    for position, name in enumerate(("max_depth", "min_samples_leaf", "max_features")):
+        results.insert(position, name, [str(combos[c][name]) for c in results["config"]])
+    results = results.drop(columns="config")
+    results["predict_ms_per_row"] = np.round(latency, 3)
+    results["model_size_kb"] = np.round(size_kb, 1)
+    return results.sort_values(["accuracy", "predict_ms_per_row"], ascending=[False, True]).reset_index(drop=True)
+
+
+def plot(results, path=RESULTS_PLOT):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(9, 6))
+    sizes = 20 + 280 * results["model_size_kb"] / results["model_size_kb"].max()
+    points = ax.scatter(results["predict_ms_per_row"], results["accuracy"], s=sizes,
+                        c=results["n_estimators"], cmap="viridis", alpha=0.7)
+    fig.colorbar(points, ax=ax, label="n_estimators")
+    ax.set_xlabel("Predict latency per row (ms)")
+    ax.set_ylabel("CV accuracy")
+    ax.set_title("Crop forest: accuracy vs latency (marker size = model size)")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crop forest hyperparameter search")
+    parser.add_argument("--trees", type=int, nargs="+", default=DEFAULT_GRID["n_estimators"])
+    parser.add_argument("--max-depth", type=lambda v: None if v == "None" else int(v), nargs="+",
+                        default=DEFAULT_GRID["max_depth"])
+    parser.add_argument("--min-samples-leaf", type=int, nargs="+", default=DEFAULT_GRID["min_samples_leaf"])
+    parser.add_argument("--max-features", type=lambda v: v if v in ("sqrt", "log2") else float(v), nargs="+",
+                        default=DEFAULT_GRID["max_features"])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--csv", default=DATA_CSV)
+    args = parser.parse_args()
+
+    grid = {"n_estimators": args.trees, "max_depth": args.max_depth,
+            "min_samples_leaf": args.min_samples_leaf, "max_features": args.max_features}
+    results = search(grid, folds=args.folds, workers=args.workers, csv_path=args.csv)
+    os.makedirs(os.path.dirname(RESULTS_CSV), exist_ok=True)
+    results.to_csv(RESULTS_CSV, index=False)
+    plot(results)
+    print(results.to_string(index=False))
+    print(f"\nSaved: {RESULTS_CSV}, {RESULTS_PLOT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Incremental update of the crop model from newly collected rows.
+
+    python crop_incremental.py update new_rows.csv [--extra-trees 50]
+    python crop_incremental.py versions
+
+`update` appends the rows to crop_data.csv and the cleaned Parquet cache
+(no full CSV parse), then grows the saved forest by --extra-trees trees
+fitted with warm_start on the new rows plus a small per-crop replay sample
+of earlier rows. The replay sample keeps every known crop present, so the
+forest's classes_ and the existing trees stay valid. The fitted one-hot
+encoder is reused unchanged.
+
+A full retrain (on the cached dataset) is done instead when the new rows
+bring a STATE, SOIL_TYPE or CROP the model has never seen, or when the
+saved model is not a warm-startable forest.
+
+Every saved model is recorded in model_outputs/model_versions.json with
+the cleaned-dataset row ranges it was trained on.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from crop_backends import FEATURES, build_crop_pipeline
+from crop_dataset import CLEANED_PATH, DATA_CSV, append_rows, load_crop_dataset
+from crop_forest_compiled import compile_pipeline
+from crop_model_loader import MODEL_PATH, VERSIONS_PATH, load_versions, save_crop_model
+
+EXTRA_TREES = 50
+REPLAY_PER_CROP = 20
+CLASSIFIER_BACKENDS = {
+    "RandomForestClassifier": "random_forest",
+    "ExtraTreesClassifier": "extra_trees",
+    "HistGradientBoostingClassifier": "hist_gb",
+    "Pipeline": "logreg",
+}
+
+
+# =========================
+# Version tracking
+# =========================
+def record_model_version(kind, row_ranges, dataset_rows, model, model_path=MODEL_PATH, path=VERSIONS_PATH, **extra):
+    """Append an entry for the model just saved at model_path.
+
+    row_ranges: [[start, end), ...] positions in the cleaned dataset the
+    model has seen (new rows are always appended, so positions are stable
+    until the cache is rebuilt from the CSV).
+    """
+    versions = load_versions(path)
+    classifier = model.named_steps["classifier"]
+    st = os.stat(model_path)
+    versions.append({
+        "version": len(versions) + 1,
+        "kind": kind,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "classifier": type(classifier).__name__,
+        "n_estimators": len(getattr(classifier, "estimators_", [])) or None,
+        "dataset_rows": int(dataset_rows),
+        "rows_seen": [[int(a), int(b)] for a, b in row_ranges],
+        "model_signature": [st.st_mtime_ns, st.st_size],
+        **extra,
+    })
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(versions, fp, indent=2)
+    os.replace(tmp, path)
+    return versions[-1]
+
+
+def index_ranges(positions):
+    """Sorted row positions -> [[start, end), ...] runs."""
+    ranges = []
+    for pos in np.unique(np.asarray(positions, dtype=np.int64)):
+        if ranges and pos == ranges[-1][1]:
+            ranges[-1][1] = int(pos) + 1
+        else:
+            ranges.append([int(pos), int(pos) + 1])
+    return ranges
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+# =========================
+# Update
+# =========================
+def _new_categories(model, new):
+    encoder = model.named_steps["preprocessor"].named_transformers_["cat"]
+    found = {}
+    for column, known in zip(encoder.feature_names_in_, encoder.categories_):
+        unseen = set(new[column].astype(str)) - set(map(str, known))
+        if unseen:
+            found[column] = sorted(unseen)
+    unseen_crops = set(new["CROP"].astype(str)) - set(map(str, model.classes_))
+    if unseen_crops:
+        found["CROP"] = sorted(unseen_crops)
+    return found
+
+
+def _save(model, model_path, compile_forest):
+    save_crop_model(model, model_path)
+    if compile_forest:
+        compile_pipeline(model, source_path=model_path).save()
+
+
+def full_retrain(df, model_path=MODEL_PATH, backend="random_forest", reason=""):
+    model = build_crop_pipeline(backend)
+    model.fit(df[FEATURES], df["CROP"].astype(str))
+    _save(model, model_path, compile_forest=backend in ("random_forest", "extra_trees"))
+    return record_model_version("full", [[0, len(df)]], len(df), model, model_path, reason=reason)
+
+
+def update(new_rows_path, extra_trees=EXTRA_TREES, replay_per_crop=REPLAY_PER_CROP,
+           csv_path=DATA_CSV, cache_path=CLEANED_PATH, model_path=MODEL_PATH, seed=None):
+    import joblib
+    import pandas as pd
+
+    new_rows = pd.read_csv(new_rows_path, dtype={"STATE": str, "SOIL_TYPE": str, "CROP": str})
+    model = joblib.load(model_path)
+    previous_rows = len(load_crop_dataset(csv_path, cache_path))
+    df, kept = append_rows(new_rows, csv_path, cache_path)
+    if kept == 0:
+        return {"kind": "none", "reason": "no usable new rows"}
+    new = df.iloc[previous_rows:]
+
+    classifier = model.named_steps["classifier"]
+    unseen = _new_categories(model, new)
+    if unseen or not hasattr(classifier, "warm_start") or not hasattr(classifier, "estimators_"):
+        reason = f"new categories {unseen}" if unseen else f"{type(classifier).__name__} cannot warm-start"
+        print(f"Full retrain: {reason}")
+        backend = CLASSIFIER_BACKENDS.get(type(classifier).__name__, "random_forest")
+        return full_retrain(df, model_path, backend, reason=reason)
+
+    # New rows + a few earlier rows per crop so every class is present in the fit.
+    rng = np.random.default_rng(seed)
+    old_crops = df["CROP"].iloc[:previous_rows].to_numpy()
+    replay = np.concatenate([
+        rng.choice(idx, size=min(replay_per_crop, len(idx)), replace=False)
+        for idx in (np.flatnonzero(old_crops == crop) for crop in classifier.classes_) if len(idx)
+    ])
+    rows = np.concatenate([np.arange(previous_rows, len(df)), replay])
+    X = model.named_steps["preprocessor"].transform(df[FEATURES].iloc[rows])
+    y = df["CROP"].astype(str).to_numpy()[rows]
+
+    classes_before = np.asarray(classifier.classes_).copy()
+    trees_before = len(classifier.estimators_)
+    classifier.set_params(warm_start=True, n_estimators=trees_before + extra_trees)
+    start = time.perf_counter()
+    classifier.fit(X, y)
+    fit_seconds = time.perf_counter() - start
+    classifier.set_params(warm_start=False)
+    if not np.array_equal(classifier.classes_, classes_before):
+        raise RuntimeError("Class set changed during incremental fit; run a full retrain instead")
+
+    _save(model, model_path, compile_forest=True)
+    previous = load_versions()
+    seen = previous[-1]["rows_seen"] if previous else [[0, previous_rows]]
+    return record_model_version(
+        "incremental", _merge_ranges(seen + [[previous_rows, len(df)]] + index_ranges(replay)), len(df), model, model_path,
+        new_rows=int(kept), replay_rows=int(len(replay)), trees_added=extra_trees, fit_seconds=round(fit_seconds, 2),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental crop model update")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("update")
+    up.add_argument("new_rows", help="CSV with the crop_data.csv columns")
+    up.add_argument("--extra-trees", type=int, default=EXTRA_TREES)
+    up.add_argument("--replay-per-crop", type=int, default=REPLAY_PER_CROP)
+    up.add_argument("--csv", default=DATA_CSV)
+    up.add_argument("--model", default=MODEL_PATH)
+    sub.add_parser("versions")
+    args = parser.parse_args()
+
+    if args.command == "versions":
+        print(json.dumps(load_versions(), indent=2))
+        return
+    result = update(args.new_rows, args.extra_trees, args.replay_per_crop, csv_path=args.csv, model_path=args.model)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+
+MODEL_PATH = "model_outputs/crop_recommendation_model.pkl"
+VERSIONS_PATH = "model_outputs/model_versions.json"
+
+
+def save_crop_model(model, path=MODEL_PATH):
+    """Dump the crop Pipeline so it can be opened with joblib mmap_mode.
+
+    Uncompressed, so numpy arrays are stored raw and can be memory-mapped.
+    Written to a temp file and renamed: processes that still map the old
+    file keep reading the old inode instead of a half-written one.
+    """
+    import joblib
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    joblib.dump(model, tmp, compress=0)
+    os.replace(tmp, path)
+    return path
+
+
+def load_versions(path=VERSIONS_PATH):
+    """Model version log written by training.py / crop_incremental.py ([] if none)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def model_version_label(model_path=MODEL_PATH, versions_path=VERSIONS_PATH):
+    """'v<N>' when the model file matches the newest logged version, else its mtime/size."""
+    if not os.path.exists(model_path):
+        return ""
+    st = os.stat(model_path)
+    versions = load_versions(versions_path)
+    if versions and versions[-1].get("model_signature") == [st.st_mtime_ns, st.st_size]:
+        return f"v{versions[-1]['version']}"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class CropModelLoader:
+    """Load the crop model on first use (or in a background thread) with mmap_mode.
+
+    `loader(path, mmap_mode=...)` replaces joblib.load for other model formats.
+    """
+
+    def __init__(self, path=MODEL_PATH, mmap_mode="r", loader=None):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.loader = loader
+        self._model = None
+        self._error = ""
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def error(self):
+        return self._error
+
+    def _load(self):
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            try:
+                if self.loader is not None:
+                    self._model = self.loader(self.path, mmap_mode=self.mmap_mode)
+                else:
+                    import joblib
+                    self._model = joblib.load(self.path, mmap_mode=self.mmap_mode)
+                self._error = ""
+            except Exception as e:
+                self._error = str(e)
+                raise
+            return self._model
+
+    def start_background(self):
+        """Begin loading without blocking the caller (e.g. while the Tk window opens)."""
+        if self._thread is None and self._model is None:
+            def run():
+                try:
+                    self._load()
+                except Exception:
+                    pass
+            self._thread = threading.Thread(target=run, name="crop-model-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self):
+        """Return the model, loading it now if the background load has not finished."""
+        if self._model is not None:
+            return self._model
+        return self._load()
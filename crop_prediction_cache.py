@@ -0,0 +1,201 @@
+"""Persistent memo of crop predictions keyed by quantized inputs.
+
+Usage:
+    python crop_prediction_cache.py stats
+    python crop_prediction_cache.py clear
+"""
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import time
+
+from crop_model_loader import MODEL_PATH
+
+CACHE_DB_PATH = "model_outputs/prediction_cache.sqlite"
+
+# Decimal places kept per numeric input when building the key; inputs that
+# round to the same values share one cached prediction.
+DEFAULT_PRECISION = {
+    "N_SOIL": 0,
+    "P_SOIL": 0,
+    "K_SOIL": 0,
+    "TEMPERATURE": 1,
+    "HUMIDITY": 0,
+    "ph": 1,
+    "RAINFALL": 0,
+}
+
+
+def _model_fingerprint(model_path):
+    if not os.path.exists(model_path):
+        return ""
+    st = os.stat(model_path)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class PredictionCache:
+    """LRU (+ optional TTL) cache in a small SQLite file.
+
+    All entries are dropped automatically when the model file's mtime/size
+    changes. get() only reads: hit/miss counts and last-used times are kept in
+    memory and written with the next put() or on close().
+    """
+
+    def __init__(self, db_path=CACHE_DB_PATH, model_path=MODEL_PATH, precision=None,
+                 max_entries=10_000, ttl_seconds=None):
+        self.model_path = model_path
+        self.precision = dict(DEFAULT_PRECISION if precision is None else precision)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=10.0)
+        # WAL: lookups never wait for another process that is writing.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, crop TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_last_used ON predictions(last_used)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+        self._fingerprint = None
+        self._pending = {"hits": 0, "misses": 0}
+        self._pending_used = {}
+        self._check_model()
+        atexit.register(self.close)
+
+    # -------------------------
+    # Invalidation
+    # -------------------------
+    def _meta(self, name, default=""):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, name, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    def _model_changed(self):
+        return _model_fingerprint(self.model_path) != self._fingerprint
+
+    def _check_model(self):
+        fingerprint = _model_fingerprint(self.model_path)
+        if fingerprint == self._fingerprint:
+            return
+        if self._meta("model_fingerprint") != fingerprint:
+            self.conn.execute("DELETE FROM predictions")
+            self._set_meta("model_fingerprint", fingerprint)
+            self._set_meta("invalidations", int(self._meta("invalidations", "0")) + 1)
+            self.conn.commit()
+        self._fingerprint = fingerprint
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def make_key(self, data):
+        """data: predict_crop's column dict (one-element lists) or a flat mapping."""
+        def scalar(v):
+            return v[0] if isinstance(v, (list, tuple)) else v
+
+        parts = [str(scalar(data["STATE"])), str(scalar(data["SOIL_TYPE"]))]
+        for column in sorted(self.precision):
+            value = float(scalar(data[column]))
+            digits = self.precision[column]
+            parts.append(f"{column}={value:.{digits}f}" if digits is not None else f"{column}={value!r}")
+        return "|".join(parts)
+
+    def _write_pending(self):
+        """Add the in-memory counters and last-used times to the open transaction."""
+        if self._pending_used:
+            self.conn.executemany("UPDATE predictions SET last_used = ? WHERE key = ?",
+                                  [(used, key) for key, used in self._pending_used.items()])
+            self._pending_used.clear()
+        for name, count in self._pending.items():
+            if count:
+                self._set_meta(name, int(self._meta(name, "0")) + count)
+                self._pending[name] = 0
+
+    def get(self, data):
+        if self._model_changed():
+            # Entries belong to the previous model; the next put() drops them.
+            self._pending["misses"] += 1
+            return None
+        key = self.make_key(data)
+        row = self.conn.execute("SELECT crop, created_at FROM predictions WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+            self._pending["misses"] += 1
+            return None
+        self._pending_used[key] = now
+        self._pending["hits"] += 1
+        return row[0]
+
+    def put(self, data, crop):
+        self._check_model()
+        self._write_pending()
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO predictions (key, crop, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (self.make_key(data), crop, now, now),
+        )
+        # Least recently used entries go first once the cache is over budget.
+        self.conn.execute(
+            "DELETE FROM predictions WHERE key IN ("
+            "SELECT key FROM predictions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.conn.commit()
+
+    def stats(self):
+        self.flush()
+        hits = int(self._meta("hits", "0"))
+        misses = int(self._meta("misses", "0"))
+        total = hits + misses
+        return {
+            "entries": self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0],
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+            "invalidations": int(self._meta("invalidations", "0")),
+            "precision": self.precision,
+        }
+
+    def flush(self):
+        """Write the counters and last-used times collected by get()."""
+        self._write_pending()
+        self.conn.commit()
+
+    def clear(self):
+        self._pending = {"hits": 0, "misses": 0}
+        self._pending_used.clear()
+        self.conn.execute("DELETE FROM predictions")
+        self.conn.execute("DELETE FROM meta WHERE name IN ('hits', 'misses')")
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass  # counters only; never block shutdown on a locked database
+        self.conn.close()
+        self.conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crop prediction cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--db", default=CACHE_DB_PATH)
+    args = parser.parse_args()
+
+    cache = PredictionCache(args.db)
+    if args.command == "clear":
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
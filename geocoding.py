@@ -0,0 +1,142 @@
+"""Taluka coordinates: bundled table -> SQLite cache -> Nominatim.
+
+Usage:
+    python geocoding.py build [--nominatim-url URL] [--delay 1.0]   # writes taluka_coords.json
+    python geocoding.py lookup Haveli Pune
+
+`build` resolves every taluka in MAHARASHTRA_TALUKAS once (1 request/s,
+per the Nominatim usage policy; already cached entries are not requested
+again, so an interrupted build resumes). After that, lookups for known
+talukas never leave the machine. Set NOMINATIM_URL (or --nominatim-url)
+to point at a local stand-in server.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from reference_data import MAHARASHTRA_TALUKAS
+
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+TALUKA_COORDS_PATH = "taluka_coords.json"
+GEOCODE_CACHE_PATH = "model_outputs/geocode_cache.sqlite"
+USER_AGENT = "BE_PROJECT/1.0"
+
+
+def nominatim_geocode(taluka_name, district_en, base_url=NOMINATIM_URL, timeout=15):
+    q = quote(f"{taluka_name}, {district_en}, Maharashtra, India")
+    req = Request(f"{base_url}?q={q}&format=json&limit=1", headers={"User-Agent": USER_AGENT})
+    with urlopen(req, timeout=timeout) as response:
+        payload = json.loads(response.read().decode("utf-8"))
+    if not payload:
+        raise ValueError("Taluka location not found")
+    return float(payload[0]["lat"]), float(payload[0]["lon"])
+
+
+class GeocodeCache:
+    """(taluka, district) -> (lat, lon) in SQLite; safe to share between threads."""
+
+    def __init__(self, db_path=GEOCODE_CACHE_PATH):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "taluka TEXT NOT NULL, district TEXT NOT NULL, lat REAL NOT NULL, lon REAL NOT NULL, "
+            "fetched_at REAL NOT NULL, PRIMARY KEY (taluka, district))"
+        )
+        self.conn.commit()
+
+    def get(self, taluka_name, district_en):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT lat, lon FROM geocode WHERE taluka = ? AND district = ?", (taluka_name, district_en)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, taluka_name, district_en, lat, lon):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocode (taluka, district, lat, lon, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (taluka_name, district_en, float(lat), float(lon), time.time()),
+            )
+            self.conn.commit()
+
+
+def load_taluka_coords(path=TALUKA_COORDS_PATH):
+    """{(district, taluka): (lat, lon)} from the bundled file ({} if not built yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    return {(district, taluka): (lat, lon)
+            for district, talukas in data.items() for taluka, (lat, lon) in talukas.items()}
+
+
+class TalukaGeocoder:
+    def __init__(self, coords_path=TALUKA_COORDS_PATH, cache_path=GEOCODE_CACHE_PATH, base_url=NOMINATIM_URL):
+        self.coords = load_taluka_coords(coords_path)
+        self.cache = GeocodeCache(cache_path)
+        self.base_url = base_url
+
+    def lookup(self, taluka_name, district_en, offline=False):
+        """(lat, lon); Nominatim is only called for talukas missing from the table and cache."""
+        coords = self.coords.get((district_en, taluka_name)) or self.cache.get(taluka_name, district_en)
+        if coords is not None:
+            return coords
+        if offline:
+            raise ValueError("Taluka location not available offline")
+        lat, lon = nominatim_geocode(taluka_name, district_en, self.base_url)
+        self.cache.put(taluka_name, district_en, lat, lon)
+        return lat, lon
+
+
+def build_coords_file(path=TALUKA_COORDS_PATH, cache_path=GEOCODE_CACHE_PATH, base_url=NOMINATIM_URL, delay=1.0):
+    geocoder = TalukaGeocoder(coords_path=path, cache_path=cache_path, base_url=base_url)
+    table, missing = {}, []
+    for district_en, talukas in MAHARASHTRA_TALUKAS.items():
+        for taluka_name in talukas:
+            cached = geocoder.coords.get((district_en, taluka_name)) or geocoder.cache.get(taluka_name, district_en)
+            try:
+                lat, lon = cached or geocoder.lookup(taluka_name, district_en)
+            except Exception as e:
+                missing.append(f"{taluka_name}, {district_en}: {e}")
+                continue
+            finally:
+                if cached is None:
+                    time.sleep(delay)
+            table.setdefault(district_en, {})[taluka_name] = [round(lat, 6), round(lon, 6)]
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(table, fp, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+    return {"resolved": sum(len(t) for t in table.values()), "missing": missing, "path": path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Taluka coordinate table / geocode cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--output", default=TALUKA_COORDS_PATH)
+    build.add_argument("--nominatim-url", default=NOMINATIM_URL)
+    build.add_argument("--delay", type=float, default=1.0, help="seconds between Nominatim requests")
+    lookup = sub.add_parser("lookup")
+    lookup.add_argument("taluka")
+    lookup.add_argument("district")
+    lookup.add_argument("--nominatim-url", default=NOMINATIM_URL)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(json.dumps(build_coords_file(args.output, base_url=args.nominatim_url, delay=args.delay),
+                         ensure_ascii=False, indent=2))
+    else:
+        print(TalukaGeocoder(base_url=args.nominatim_url).lookup(args.taluka, args.district))
+
+
+if __name__ == "__main__":
+    main()
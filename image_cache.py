@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from soil_inference import draft_reduce, preprocess_image
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Longest side kept for cached photos; the heuristic input, model input and
+# slot thumbnails are all derived from this copy.
+DEFAULT_MAX_DECODE_SIDE = 1280
+
+
+# =========================================================
+# ONE DECODED PHOTO
+# =========================================================
+class DecodedImage:
+    """RGB pixels of one photo plus views derived from them on demand."""
+
+    def __init__(self, path, rgb, source_size=None):
+        self.path = path
+        self.rgb = rgb
+        self.source_size = source_size  # (w, h) of the photo file
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def _derive(self, key, build):
+        with self._lock:
+            value = self._derived.get(key)
+            if value is None:
+                value = build()
+                self._derived[key] = value
+            return value
+
+    @property
+    def full_resolution(self):
+        """True when rgb holds every pixel of the photo (nothing was downscaled)."""
+        return self.source_size is None or tuple(self.source_size) == (self.rgb.shape[1], self.rgb.shape[0])
+
+    @property
+    def nbytes(self):
+        return self.rgb.nbytes + sum(np.asarray(v).nbytes for v in self._derived.values())
+
+    def pil(self):
+        return Image.fromarray(self.rgb)
+
+    def gray(self):
+        return self._derive("gray", lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    def model_input(self):
+        # Same final resize as load_model_input, applied to the cached pixels
+        # instead of a second decode of the file.
+        return self._derive("model_input", lambda: preprocess_image(self.pil()))
+
+    def thumbnail(self, size):
+        """Display copy that fits inside size=(w, h), aspect ratio kept."""
+        def build():
+            img = self.pil()
+            img.thumbnail(size, Image.LANCZOS)
+            return np.asarray(img)
+        return Image.fromarray(self._derive(("thumbnail", tuple(size)), build))
+
+
+def _decode_rgb(path, max_side=DEFAULT_MAX_DECODE_SIDE):
+    """Decode straight to roughly max_side (JPEG draft mode), then finish the resize.
+
+    Returns (rgb, (w, h) of the file).
+    """
+    with Image.open(path) as img:
+        source_size = img.size
+        if max_side:
+            w, h = img.size
+            scale = max_side / float(max(w, h))
+            if scale < 1.0:
+                draft_reduce(img, (w * scale, h * scale))
+        img = img.convert("RGB")
+        if max_side and max(img.size) > max_side:
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+        return np.asarray(img), source_size
+
+
+# =========================================================
+# LRU CACHE
+# =========================================================
+class ImageBufferCache:
+    """Decoded photos keyed by (path, mtime, size), evicted LRU past a byte budget."""
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BUDGET, max_decode_side=DEFAULT_MAX_DECODE_SIDE):
+        self.max_bytes = max_bytes
+        self.max_decode_side = max_decode_side
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size
+
+    def get(self, path):
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = DecodedImage(key[0], *_decode_rgb(path, self.max_decode_side))
+        with self._lock:
+            # Drop stale versions of the same file before inserting.
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[stale]
+            self._entries[key] = entry
+            self._trim()
+        return entry
+
+    def _trim(self):
+        # Derived views grow entries after insertion, so re-measure each time.
+        total = sum(e.nbytes for e in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+            self.evictions += 1
+
+    def trim(self):
+        with self._lock:
+            self._trim()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_CACHE = ImageBufferCache()
+
+
+def get_image_cache():
+    return _CACHE
@@ -0,0 +1,70 @@
+import queue
+import threading
+import traceback
+
+
+class InferenceWorker:
+    """Background thread for decode/preprocess/predict jobs of a Tk window.
+
+    Jobs run off the Tk main thread; their callbacks are queued and executed
+    by a `root.after` poll loop, so widgets are only touched from the main
+    thread. `cancel_pending()` starts a new generation: queued jobs from older
+    generations are skipped and results of jobs already running are dropped.
+    """
+
+    def __init__(self, root, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    @property
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def cancel_pending(self):
+        with self._lock:
+            self._generation += 1
+
+    def submit(self, job, on_done=None, on_error=None):
+        """Run job() on the worker; on_done(result) / on_error(exc) run on the Tk thread."""
+        self._requests.put((self.generation, job, on_done, on_error))
+
+    def post_ui(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread from any thread (never cancelled)."""
+        self._results.put((None, callback, args))
+
+    def _run(self):
+        while True:
+            generation, job, on_done, on_error = self._requests.get()
+            if generation != self.generation:
+                continue
+            try:
+                result = job()
+            except Exception as e:
+                if on_error is not None:
+                    self._results.put((generation, on_error, (e,)))
+            else:
+                if on_done is not None:
+                    self._results.put((generation, on_done, (result,)))
+
+    def _poll(self):
+        current = self.generation
+        while True:
+            try:
+                generation, callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation is not None and generation != current:
+                continue
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+        self.root.after(self.poll_ms, self._poll)
@@ -0,0 +1,71 @@
+"""Thin client for prediction_daemon.py (standard library only).
+
+Callers try the daemon first and fall back to loading the models in their
+own process when DaemonUnavailable is raised (nothing is listening).
+DaemonError means the daemon answered with an error for this request
+only; the caller should handle that request locally but keep using the
+daemon.
+"""
+import json
+import os
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+DAEMON_HOST = os.environ.get("PREDICTION_DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.environ.get("PREDICTION_DAEMON_PORT", "8765"))
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class DaemonError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _url(path):
+    return f"http://{DAEMON_HOST}:{DAEMON_PORT}{path}"
+
+
+def _call(path, payload=None, timeout=10.0):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = Request(_url(path), data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except HTTPError as e:
+        try:
+            message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+        except Exception:
+            message = str(e)
+        raise DaemonError(message, e.code) from e
+    except ValueError as e:
+        raise DaemonError(f"invalid response: {e}") from e
+    except (URLError, OSError) as e:
+        raise DaemonUnavailable(str(e)) from e
+
+
+def daemon_available(timeout=0.3):
+    try:
+        return bool(_call("/health", timeout=timeout).get("ok"))
+    except (DaemonUnavailable, DaemonError):
+        return False
+
+
+def predict_crops(rows, timeout=10.0, with_version=False):
+    """rows: list of dicts with the crop model columns -> list of crop names (lowercase).
+
+    with_version=True returns (crops, model version label of the daemon's model).
+    """
+    response = _call("/crop", {"rows": rows}, timeout=timeout)
+    if with_version:
+        return response["crops"], response.get("model_version", "")
+    return response["crops"]
+
+
+def soil_probabilities(image_paths, timeout=30.0):
+    """Softmax rows for each image; items are {"probs": [...]} or {"error": "..."}."""
+    paths = [os.path.abspath(p) for p in image_paths]
+    return _call("/soil", {"paths": paths}, timeout=timeout)["results"]
@@ -0,0 +1,278 @@
+"""Long-running local prediction service for the crop forest and the soil CNN.
+
+Both models are loaded once (and reloaded when their files change); the
+GUIs call it over localhost HTTP through prediction_client.py instead of
+importing pandas/sklearn/TensorFlow themselves. Requests that arrive
+within a few milliseconds of each other are answered with one batched
+predict call.
+
+Usage:
+    python prediction_daemon.py [--port 8765] [--soil-backend keras|tflite] [--no-soil]
+
+Endpoints:
+    GET  /health                        -> {"ok": true, "stats": {...}}
+    POST /crop {"rows": [{...}, ...]}   -> {"crops": [...], "model_version": "v3"}
+    POST /soil {"paths": [...]}         -> {"results": [{"probs": [...]}|{"error": "..."}]}
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from crop_backends import CATEGORICAL_FEATURES, FEATURES
+from crop_forest_compiled import COMPILED_DIR, load_compiled_forest
+from crop_model_loader import MODEL_PATH, model_version_label
+from prediction_client import DAEMON_HOST, DAEMON_PORT
+from soil_inference import load_model_input
+from soil_model_registry import get_registry
+from soil_tflite import tflite_paths
+
+SOIL_MODEL_PATH = "dataset/soil_model_cnn.h5"
+SOIL_TFLITE_PATH = str(tflite_paths(SOIL_MODEL_PATH)["int8"])
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+
+
+# =========================
+# Micro-batching
+# =========================
+class MicroBatcher:
+    """Collect items from concurrent callers and run fn(items) -> results once per batch.
+
+    A batch closes when it holds max_batch items or max_wait_ms after its
+    first item arrived.
+    """
+
+    def __init__(self, fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, name="batcher"):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def submit(self, items):
+        slot = {"items": list(items), "done": threading.Event(), "results": None, "error": None}
+        self._queue.put(slot)
+        slot["done"].wait()
+        if slot["error"] is not None:
+            raise slot["error"]
+        return slot["results"]
+
+    def _run(self):
+        while True:
+            slots = [self._queue.get()]
+            count = len(slots[0]["items"])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    slot = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                slots.append(slot)
+                count += len(slot["items"])
+
+            items = [item for slot in slots for item in slot["items"]]
+            try:
+                results = self.fn(items)
+                offset = 0
+                for slot in slots:
+                    slot["results"] = results[offset:offset + len(slot["items"])]
+                    offset += len(slot["items"])
+            except Exception as e:
+                if len(slots) == 1:
+                    slots[0]["error"] = e
+                else:
+                    # Don't let one caller's failure fail everyone merged into the batch.
+                    for slot in slots:
+                        try:
+                            slot["results"] = self.fn(slot["items"])
+                        except Exception as slot_error:
+                            slot["error"] = slot_error
+            self.batches += 1
+            self.items += len(items)
+            for slot in slots:
+                slot["done"].set()
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "mean_batch": round(self.items / self.batches, 2) if self.batches else None}
+
+
+# =========================
+# Models
+# =========================
+class CropService:
+    """Compiled forest when fresh, else the Pipeline; reloaded when the .pkl changes."""
+
+    def __init__(self, model_path=MODEL_PATH, compiled_dir=COMPILED_DIR):
+        self.model_path = model_path
+        self.compiled_dir = compiled_dir
+        self._signature = None
+        self._predict = None
+        self.version = ""
+        self._load()
+
+    def _load(self):
+        st = os.stat(self.model_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        compiled = load_compiled_forest(self.compiled_dir, source_path=self.model_path)
+        if compiled is not None:
+            self._predict = compiled.predict
+        else:
+            import joblib
+            import pandas as pd
+            model = joblib.load(self.model_path, mmap_mode="r")
+            self._predict = lambda columns: model.predict(pd.DataFrame(columns))
+        self._signature = signature
+        self.version = model_version_label(self.model_path)
+
+    def predict(self, rows):
+        self._load()
+        columns = {c: [row[c] for row in rows] for c in FEATURES}
+        return [str(c).strip().lower() for c in self._predict(columns)]
+
+
+class SoilService:
+    def __init__(self, model_path=SOIL_MODEL_PATH, backend="keras"):
+        self.model_path = model_path
+        self.backend = backend
+        self.registry = get_registry()
+        self.registry.get_model(model_path, backend=backend)
+
+    def predict(self, paths):
+        results = [None] * len(paths)
+        inputs, positions = [], []
+        for i, path in enumerate(paths):
+            try:
+                inputs.append(load_model_input(path))
+                positions.append(i)
+            except Exception as e:
+                results[i] = {"error": f"{type(e).__name__}: {e}"}
+        if inputs:
+            model = self.registry.get_model(self.model_path, backend=self.backend)
+            probs = np.asarray(model.predict_on_batch(np.stack(inputs)))
+            for i, row in zip(positions, probs):
+                results[i] = {"probs": row.astype(float).tolist()}
+        return results
+
+
+# =========================
+# HTTP
+# =========================
+def _crop_rows(payload):
+    """Checked copy of payload["rows"]; ValueError names the first bad row."""
+    rows = payload.get("rows")
+    if not isinstance(rows, list) or not rows:
+        raise ValueError('"rows" must be a non-empty list')
+    checked = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"row {i} is not an object")
+        missing = [c for c in FEATURES if c not in row]
+        if missing:
+            raise ValueError(f"row {i} is missing {', '.join(missing)}")
+        try:
+            checked.append({c: str(row[c]) if c in CATEGORICAL_FEATURES else float(row[c]) for c in FEATURES})
+        except (TypeError, ValueError):
+            raise ValueError(f"row {i} has a non-numeric reading") from None
+    return checked
+
+
+def _soil_paths(payload):
+    paths = payload.get("paths")
+    if not isinstance(paths, list) or not paths or not all(isinstance(p, str) for p in paths):
+        raise ValueError('"paths" must be a non-empty list of strings')
+    return paths
+
+
+class _Handler(BaseHTTPRequestHandler):
+    crop = None
+    crop_service = None
+    soil = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": "not found"})
+            return
+        stats = {name: batcher.stats() for name, batcher in (("crop", self.crop), ("soil", self.soil)) if batcher}
+        self._send(200, {"ok": True, "stats": stats})
+
+    def do_POST(self):
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+            # Requests are validated before batching, so a malformed one is
+            # rejected on its own instead of failing the whole batch.
+            if self.path == "/crop" and self.crop is not None:
+                crops = self.crop.submit(_crop_rows(payload))
+                self._send(200, {"crops": crops, "model_version": self.crop_service.version})
+            elif self.path == "/soil" and self.soil is not None:
+                self._send(200, {"results": self.soil.submit(_soil_paths(payload))})
+            else:
+                self._send(404, {"error": f"{self.path} is not served"})
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": f"bad request: {e}"})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=DAEMON_HOST, port=DAEMON_PORT, crop=True, soil=True, soil_backend="keras",
+          max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    if crop:
+        _Handler.crop_service = CropService()
+        _Handler.crop = MicroBatcher(_Handler.crop_service.predict, max_batch, max_wait_ms, name="crop-batcher")
+    if soil:
+        soil_path = SOIL_TFLITE_PATH if soil_backend == "tflite" else SOIL_MODEL_PATH
+        _Handler.soil = MicroBatcher(SoilService(soil_path, soil_backend).predict, max_batch, max_wait_ms,
+                                     name="soil-batcher")
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    print(f"Prediction daemon listening on http://{host}:{port} (crop={crop}, soil={soil})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local crop/soil prediction daemon")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--soil-backend", choices=["keras", "tflite"], default="keras")
+    parser.add_argument("--no-crop", action="store_true")
+    parser.add_argument("--no-soil", action="store_true")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+    serve(args.host, args.port, crop=not args.no_crop, soil=not args.no_soil, soil_backend=args.soil_backend,
+          max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
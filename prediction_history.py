@@ -0,0 +1,322 @@
+"""Prediction history in one SQLite database instead of a .txt file per report.
+
+Every crop and soil prediction is a row with its inputs, outputs, model
+version and timing. Rows are queued and written in batches by a
+background thread (WAL mode, so queries can run at the same time), and
+district/crop/soil/date are indexed. The text reports are rendered from
+a row whenever someone asks for them.
+
+Usage:
+    python prediction_history.py query --district Jalna --crop cotton [--since 2026-06-01] [--until ...]
+    python prediction_history.py report <id> [--output report.txt]
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from reference_data import CROP_GUIDE, SOIL_GUIDE
+
+HISTORY_DB_PATH = "reports/prediction_history.sqlite"
+BATCH_SIZE = 200
+FLUSH_INTERVAL_SECONDS = 1.0
+# Seconds SQLite waits for another writer (the other GUI, the CLI) before "database is locked".
+BUSY_TIMEOUT_SECONDS = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    state TEXT,
+    district TEXT,
+    taluka TEXT,
+    soil TEXT,
+    crop TEXT,
+    inputs TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    model_version TEXT,
+    source TEXT,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_district_day ON predictions(district, day);
+CREATE INDEX IF NOT EXISTS idx_predictions_crop_day ON predictions(crop, day);
+CREATE INDEX IF NOT EXISTS idx_predictions_soil_day ON predictions(soil, day);
+CREATE INDEX IF NOT EXISTS idx_predictions_day ON predictions(day);
+"""
+_COLUMNS = ("id", "created_at", "day", "kind", "state", "district", "taluka", "soil", "crop",
+            "inputs", "outputs", "model_version", "source", "latency_ms")
+
+
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class HistoryWriter:
+    """Queue records from any thread; one thread inserts them in batches.
+
+    A batch that cannot be written (locked database, full disk) is reported
+    on stderr and counted in `dropped`; the writer keeps running.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, kind, inputs, outputs, state=None, district=None, taluka=None, soil=None, crop=None,
+               model_version=None, source=None, latency_ms=None):
+        """Queue one prediction; returns its id (usable for report rendering once flushed)."""
+        now = datetime.now()
+        record_id = uuid.uuid4().hex[:12]
+        self._queue.put((
+            record_id, now.isoformat(timespec="seconds"), now.strftime("%Y-%m-%d"), kind,
+            state, district, taluka, soil, crop,
+            json.dumps(inputs, ensure_ascii=False), json.dumps(outputs, ensure_ascii=False),
+            model_version, source, None if latency_ms is None else round(float(latency_ms), 3),
+        ))
+        return record_id
+
+    def _run(self):
+        try:
+            conn = _connect(self.db_path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Prediction history disabled: cannot open {self.db_path} ({e})", file=sys.stderr)
+            conn = None
+        stop = False
+        while not stop:
+            rows = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                rows.append(item)
+                while len(rows) < self.batch_size:
+                    rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = any(r is None for r in rows)
+            rows = [r for r in rows if r is not None]
+            try:
+                if rows and conn is None:
+                    self.dropped += len(rows)
+                elif rows:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT OR REPLACE INTO predictions ({', '.join(_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                            rows,
+                        )
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                print(f"Prediction history: {len(rows)} record(s) not saved ({e})", file=sys.stderr)
+            finally:
+                for _ in range(len(rows) + (1 if stop else 0)):
+                    self._queue.task_done()
+        if conn is not None:
+            conn.close()
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is handled; False if timeout ran out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_WRITER = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_history_writer(db_path=HISTORY_DB_PATH):
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = HistoryWriter(db_path)
+        return _WRITER
+
+
+# =========================
+# Queries
+# =========================
+def _row_to_dict(row):
+    record = dict(zip(_COLUMNS, row))
+    record["inputs"] = json.loads(record["inputs"])
+    record["outputs"] = json.loads(record["outputs"])
+    return record
+
+
+def query(district=None, crop=None, soil=None, since=None, until=None, kind=None, limit=None,
+          db_path=HISTORY_DB_PATH):
+    """Records matching every given filter, newest first; since/until are YYYY-MM-DD (inclusive)."""
+    if not os.path.exists(db_path):
+        return []
+    where, params = [], []
+    for column, value in (("district", district), ("crop", crop), ("soil", soil), ("kind", kind)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        where.append("day >= ?")
+        params.append(since)
+    if until:
+        where.append("day <= ?")
+        params.append(until)
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM predictions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    with sqlite3.connect(db_path) as conn:
+        return [_row_to_dict(row) for row in conn.execute(sql, params)]
+
+
+def get_record(record_id, db_path=HISTORY_DB_PATH):
+    if not os.path.exists(db_path):
+        return None
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM predictions WHERE id = ?", (record_id,)).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+# =========================
+# Report rendering
+# =========================
+def render_crop_report(record):
+    inputs, outputs = record["inputs"], record["outputs"]
+    crop_en, crop_mr = outputs["crop_en"], outputs["crop_mr"]
+    soil_info = SOIL_GUIDE.get(inputs["soil_en"], {
+        "details": "या मातीसाठी सामान्य शेती पद्धती लागू करा.",
+        "steps": ["माती परीक्षण करा.", "सेंद्रिय खत वाढवा.", "सिंचन/निचरा योग्य ठेवा."]
+    })
+    crop_steps = CROP_GUIDE.get(crop_en, [
+        "माती परीक्षण करून स्थानिक शिफारशीनुसार खत व्यवस्थापन करा.",
+        "योग्य बियाणे/रोपे निवडा.",
+        "सिंचन, तण नियंत्रण, कीड/रोग निरीक्षण नियमित करा."
+    ])
+    generated = datetime.fromisoformat(record["created_at"]).strftime("%d-%m-%Y %H:%M:%S")
+    soil_steps_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(soil_info["steps"])])
+    crop_steps_txt = "\n".join([f"{i+1}. {s}" for i, s in enumerate(crop_steps)])
+
+    return f"""
+===================== CROP RECOMMENDATION REPORT =====================
+Generated On: {generated}
+
+INPUTS:
+- State (Marathi): {inputs['state_mr']}
+- State (English): {inputs['state_en']}
+- District (Marathi): {inputs['district_mr']}
+- District (English): {inputs['district_en']}
+- Taluka: {inputs['taluka']}
+- Soil Type (Marathi): {inputs['soil_mr']}
+- Soil Type (English): {inputs['soil_en']}
+
+- N (Nitrogen): {inputs['N_SOIL']}
+- P (Phosphorus): {inputs['P_SOIL']}
+- K (Potassium): {inputs['K_SOIL']}
+- Temperature (°C): {inputs['TEMPERATURE']}
+- Humidity (%): {inputs['HUMIDITY']}
+- pH: {inputs['ph']}
+- Rainfall (mm): {inputs['RAINFALL']}
+
+RECOMMENDED CROP:
+- English: {crop_en}
+- Marathi: {crop_mr}
+
+SOIL DETAILS:
+{soil_info['details']}
+
+STEP-BY-STEP (Soil Work Plan):
+{soil_steps_txt}
+
+STEP-BY-STEP (Crop Work Plan):
+{crop_steps_txt}
+
+NOTES:
+- हा रिपोर्ट general guidance आहे.
+- अचूक बियाणे प्रमाण, खत डोस, आणि फवारणीसाठी स्थानिक कृषी विभाग/तज्ज्ञ सल्ला घ्या.
+======================================================================
+""".strip()
+
+
+def render_soil_report(record):
+    outputs = record["outputs"]
+    generated = datetime.fromisoformat(record["created_at"]).strftime("%d-%m-%Y %H:%M:%S")
+    crops_str = ", ".join(outputs["crops"])
+    steps_str = "\n".join([f"{i+1}. {s}" for i, s in enumerate(outputs["steps"])])
+    return (f"Report Generated: {generated}\nSoil: {outputs['soil_en']}\nConfidence: {outputs['confidence']:.2f}%\n"
+            f"Crops: {crops_str}\nSteps:\n{steps_str}")
+
+
+REPORT_RENDERERS = {"crop": render_crop_report, "soil": render_soil_report}
+
+
+def render_report(record):
+    return REPORT_RENDERERS[record["kind"]](record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction history")
+    sub = parser.add_subparsers(dest="command", required=True)
+    q = sub.add_parser("query")
+    q.add_argument("--district")
+    q.add_argument("--crop")
+    q.add_argument("--soil")
+    q.add_argument("--kind", choices=list(REPORT_RENDERERS))
+    q.add_argument("--since", help="YYYY-MM-DD")
+    q.add_argument("--until", help="YYYY-MM-DD")
+    q.add_argument("--limit", type=int, default=None)
+    r = sub.add_parser("report")
+    r.add_argument("id")
+    r.add_argument("--output", default=None)
+    for subparser in (q, r):
+        subparser.add_argument("--db", default=HISTORY_DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "query":
+        for record in query(args.district, args.crop, args.soil, args.since, args.until, args.kind, args.limit,
+                            db_path=args.db):
+            print(json.dumps(record, ensure_ascii=False))
+        return
+    record = get_record(args.id, args.db)
+    if record is None:
+        raise SystemExit(f"No prediction with id {args.id}")
+    text = render_report(record)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        print(f"Report written: {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
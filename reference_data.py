@@ -0,0 +1,341 @@
+"""Static lookup tables shared by the crop GUI and the headless tools.
+
+Crop name translations (crop_marathi_map.json), state/soil/district maps,
+the offline Maharashtra taluka list, district annual rainfall and the
+soil/crop guidance used in crop reports.
+"""
+import json
+import os
+
+# =========================
+# JSON FILE (Crop Map)
+# =========================
+CROP_MAP_JSON_PATH = "crop_marathi_map.json"
+
+DEFAULT_CROP_MARATHI_MAP = {
+    "amaranthus": "तांदुळजा",
+    "green banana": "कच्ची केळी",
+    "banana": "केळी",
+    "ladies finger": "भेंडी",
+    "bitter gourd": "कारले",
+    "bottle gourd": "दुधी भोपळा",
+    "brinjal": "वांगी",
+    "cabbage": "कोबी",
+    "carrot": "गाजर",
+    "cauliflower": "फुलकोबी",
+    "cluster beans": "गवार",
+    "cowpea": "चवळी",
+    "cucumber": "काकडी",
+    "drumstick": "शेवगा",
+    "ginger": "आले",
+    "green chilli": "हिरवी मिरची",
+    "garlic": "लसूण",
+    "onion": "कांदा",
+    "potato": "बटाटा",
+    "tomato": "टोमॅटो",
+    "pumpkin": "भोपळा",
+    "raddish": "मुळा",
+    "ridge gourd": "दोडका",
+    "sponge gourd": "घोसाळे",
+    "snakeguard": "पडवळ",
+    "tinda": "टिंडा",
+    "sweet potato": "रताळे",
+    "spinach": "पालक",
+    "methi leaves": "मेथी",
+    "coriander": "कोथिंबीर",
+    "peas": "वाटाणे",
+    "peas cod": "वाटाणा शेंग",
+    "beans": "शेंग",
+    "french beans": "फ्रेंच बीन्स",
+    "capsicum": "ढोबळी मिरची",
+
+    # Fruits
+    "apple": "सफरचंद",
+    "orange": "संत्रे",
+    "grapes": "द्राक्षे",
+    "papaya": "पपई",
+    "pomegranate": "डाळिंब",
+    "guava": "पेरू",
+    "lemon": "लिंबू",
+    "water melon": "टरबूज",
+    "sweet lime": "मोसंबी",
+    "pineapple": "अननस",
+    "sapota": "चिकू",
+    "mango": "आंबा",
+    "zizyphus": "बोर",
+
+    # Cereals & Pulses
+    "paddy": "भात",
+    "rice": "तांदूळ",
+    "wheat": "गहू",
+    "wheat atta": "गव्हाचे पीठ",
+    "maize": "मका",
+    "jowar": "ज्वारी",
+    "bajra": "बाजरी",
+    "ragi": "नाचणी",
+    "barley": "जव",
+    "lentil": "मसूर",
+    "masur dal": "मसूर डाळ",
+    "bengal gram": "हरभरा",
+    "black gram": "उडीद",
+    "green gram": "मूग",
+    "red gram": "तूर",
+    "chana dal": "चना डाळ",
+    "tur dal": "तूर डाळ",
+    "urd dal": "उडीद डाळ",
+
+    # Oil & Commercial Crops
+    "groundnut": "भुईमूग",
+    "soyabean": "सोयाबीन",
+    "mustard": "मोहरी",
+    "sesamum": "तीळ",
+    "cotton": "कापूस",
+    "jute": "ताग",
+    "castor seed": "एरंड",
+    "tobacco": "तंबाखू",
+
+    # Plantation
+    "coconut": "नारळ",
+    "copra": "खोबरे",
+    "arecanut": "सुपारी",
+    "cashewnuts": "काजू",
+    "rubber": "रबर",
+
+    # Others
+    "turmeric": "हळद",
+    "jaggery": "गूळ",
+    "sugar": "साखर",
+    "fish": "मासे",
+    "wood": "लाकूड",
+    "leafy vegetable": "पालेभाजी"
+}
+
+def ensure_crop_map_json():
+    """Create crop_marathi_map.json if not exists."""
+    if not os.path.exists(CROP_MAP_JSON_PATH):
+        with open(CROP_MAP_JSON_PATH, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_CROP_MARATHI_MAP, f, ensure_ascii=False, indent=2)
+
+def load_crop_map():
+    """crop_marathi_map.json if present (users may edit it), else the built-in map."""
+    if not os.path.exists(CROP_MAP_JSON_PATH):
+        return dict(DEFAULT_CROP_MARATHI_MAP)
+    with open(CROP_MAP_JSON_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# =========================
+# State & Soil Lists / Maps
+# =========================
+state_marathi_list = [
+    "अंदमान आणि निकोबार","आंध्र प्रदेश","आसाम","छत्तीसगड","गोवा","गुजरात","हरियाणा",
+    "हिमाचल प्रदेश","जम्मू आणि काश्मीर","कर्नाटक","केरळ","मध्य प्रदेश","महाराष्ट्र",
+    "मणिपूर","मेघालय","नागालँड","ओडिशा","पाँडिचेरी","पंजाब","राजस्थान","तामिळनाडू",
+    "तेलंगणा","त्रिपुरा","उत्तर प्रदेश","उत्तराखंड","पश्चिम बंगाल"
+]
+
+STATE_ENGLISH_MAP = {
+    "अंदमान आणि निकोबार": "Andaman and Nicobar",
+    "आंध्र प्रदेश": "Andhra Pradesh",
+    "आसाम": "Assam",
+    "छत्तीसगड": "Chattisgarh",
+    "गोवा": "Goa",
+    "गुजरात": "Gujarat",
+    "हरियाणा": "Haryana",
+    "हिमाचल प्रदेश": "Himachal Pradesh",
+    "जम्मू आणि काश्मीर": "Jammu and Kashmir",
+    "कर्नाटक": "Karnataka",
+    "केरळ": "Kerala",
+    "मध्य प्रदेश": "Madhya Pradesh",
+    "महाराष्ट्र": "Maharashtra",
+    "मणिपूर": "Manipur",
+    "मेघालय": "Meghalaya",
+    "नागालँड": "Nagaland",
+    "ओडिशा": "Odisha",
+    "पाँडिचेरी": "Pondicherry",
+    "पंजाब": "Punjab",
+    "राजस्थान": "Rajasthan",
+    "तामिळनाडू": "Tamil Nadu",
+    "तेलंगणा": "Telangana",
+    "त्रिपुरा": "Tripura",
+    "उत्तर प्रदेश": "Uttar Pradesh",
+    "उत्तराखंड": "Uttrakhand",
+    "पश्चिम बंगाल": "West Bengal"
+}
+
+SOIL_MARATHI_LIST = [
+    "वालुकामय माती","लाल माती","लेटराइट माती","चिकणमाती","वाळवंटी माती",
+    "वालुकामय दोमट माती","गाळाची माती","वालुकामय चिकणमाती","काळी माती",
+    "रेगूर माती","इनसेप्टिसोल माती","दुमट माती","डेल्टा गाळाची माती","डोंगराळ माती"
+]
+
+SOIL_ENGLISH_MAP = {
+    "वालुकामय माती": "Sandy soil",
+    "लाल माती": "Red soil",
+    "लेटराइट माती": "Laterite soil",
+    "चिकणमाती": "Clayey soils",
+    "वाळवंटी माती": "Desert soil",
+    "वालुकामय दोमट माती": "Sandy loam",
+    "गाळाची माती": "Alluvial soil",
+    "वालुकामय चिकणमाती": "Sandy Clay loam",
+    "काळी माती": "Black soil",
+    "रेगूर माती": "Regur soil",
+    "इनसेप्टिसोल माती": "Inceptisols",
+    "दुमट माती": "Loamy soil",
+    "डेल्टा गाळाची माती": "Delta alluvium",
+    "डोंगराळ माती": "Mountain soil"
+}
+
+# महाराष्ट्रातील सर्व जिल्हे (तालुके API मधून)
+MAHARASHTRA_DISTRICTS = [
+    "Ahmednagar", "Akola", "Amravati", "Beed", "Bhandara", "Buldhana", "Chandrapur",
+    "Chhatrapati Sambhajinagar", "Dhule", "Gadchiroli", "Gondia", "Hingoli", "Jalgaon",
+    "Jalna", "Kolhapur", "Latur", "Mumbai City", "Mumbai Suburban", "Nagpur", "Nanded",
+    "Nandurbar", "Nashik", "Osmanabad", "Palghar", "Parbhani", "Pune", "Raigad",
+    "Ratnagiri", "Sangli", "Satara", "Sindhudurg", "Solapur", "Thane", "Wardha",
+    "Washim", "Yavatmal"
+]
+
+DISTRICT_ENGLISH_MAP = {
+    "अहमदनगर": "Ahmednagar", "अकोला": "Akola", "अमरावती": "Amravati", "बीड": "Beed",
+    "भंडारा": "Bhandara", "बुलढाणा": "Buldhana", "चंद्रपूर": "Chandrapur",
+    "छत्रपती संभाजीनगर": "Chhatrapati Sambhajinagar", "धुळे": "Dhule", "गडचिरोली": "Gadchiroli",
+    "गोंदिया": "Gondia", "हिंगोली": "Hingoli", "जळगाव": "Jalgaon", "जालना": "Jalna",
+    "कोल्हापूर": "Kolhapur", "लातूर": "Latur", "मुंबई शहर": "Mumbai City",
+    "मुंबई उपनगर": "Mumbai Suburban", "नागपूर": "Nagpur", "नांदेड": "Nanded",
+    "नंदुरबार": "Nandurbar", "नाशिक": "Nashik", "उस्मानाबाद": "Osmanabad", "पालघर": "Palghar",
+    "परभणी": "Parbhani", "पुणे": "Pune", "रायगड": "Raigad", "रत्नागिरी": "Ratnagiri",
+    "सांगली": "Sangli", "सातारा": "Satara", "सिंधुदुर्ग": "Sindhudurg", "सोलापूर": "Solapur",
+    "ठाणे": "Thane", "वर्धा": "Wardha", "वाशीम": "Washim", "यवतमाळ": "Yavatmal"
+}
+
+DISTRICT_MARATHI_MAP = {v: k for k, v in DISTRICT_ENGLISH_MAP.items()}
+
+# Offline fallback taluka map (works without external taluka API)
+MAHARASHTRA_TALUKAS = {
+    "Ahmednagar": ["Akole", "Jamkhed", "Karjat", "Kopargaon", "Nagar", "Nevasa", "Parner", "Pathardi", "Rahata", "Rahuri", "Sangamner", "Shevgaon", "Shrigonda", "Shrirampur"],
+    "Akola": ["Akola", "Akot", "Balapur", "Barshitakli", "Murtizapur", "Patur", "Telhara"],
+    "Amravati": ["Achalpur", "Amravati", "Anjangaon Surji", "Bhatkuli", "Chandur Bazar", "Chandur Railway", "Daryapur", "Dhamangaon Railway", "Morshi", "Nandgaon Khandeshwar", "Teosa", "Warud"],
+    "Beed": ["Ambejogai", "Ashti", "Beed", "Dharur", "Georai", "Kaij", "Majalgaon", "Parli", "Patoda", "Shirur Kasar", "Wadwani"],
+    "Bhandara": ["Bhandara", "Lakhandur", "Lakhani", "Mohadi", "Pauni", "Sakoli", "Tumsar"],
+    "Buldhana": ["Buldhana", "Chikhli", "Deulgaon Raja", "Jalgaon Jamod", "Khamgaon", "Lonar", "Malkapur", "Mehkar", "Motala", "Nandura", "Sangrampur", "Shegaon", "Sindkhed Raja"],
+    "Chandrapur": ["Ballarpur", "Bhadravati", "Brahmapuri", "Chandrapur", "Chimur", "Gondpipri", "Jiwati", "Korpana", "Mul", "Nagbhid", "Pombhurna", "Rajura", "Sawali", "Sindewahi", "Warora"],
+    "Chhatrapati Sambhajinagar": ["Aurangabad", "Gangapur", "Kannad", "Khuldabad", "Paithan", "Phulambri", "Sillod", "Soegaon", "Vaijapur"],
+    "Dhule": ["Dhule", "Sakri", "Shirpur", "Sindkhede"],
+    "Gadchiroli": ["Aheri", "Armori", "Bhamragad", "Chamorshi", "Dhanora", "Etapalli", "Gadchiroli", "Korchi", "Kurkheda", "Mulchera", "Sironcha"],
+    "Gondia": ["Amgaon", "Arjuni Morgaon", "Deori", "Gondia", "Goregaon", "Sadak Arjuni", "Salekasa", "Tirora"],
+    "Hingoli": ["Aundha Nagnath", "Basmath", "Hingoli", "Kalamnuri", "Sengaon"],
+    "Jalgaon": ["Amalner", "Bhadgaon", "Bhusawal", "Bodwad", "Chalisgaon", "Chopda", "Dharangaon", "Erandol", "Jalgaon", "Jamner", "Muktainagar", "Pachora", "Parola", "Raver", "Yawal"],
+    "Jalna": ["Ambad", "Badnapur", "Bhokardan", "Ghansawangi", "Jafferabad", "Jalna", "Mantha", "Partur"],
+    "Kolhapur": ["Ajra", "Bavda", "Bhudargad", "Chandgad", "Gadhinglaj", "Hatkanangale", "Kagal", "Karvir", "Panhala", "Radhanagari", "Shahuwadi", "Shirol"],
+    "Latur": ["Ahmadpur", "Ausa", "Chakur", "Deoni", "Jalkot", "Latur", "Nilanga", "Renapur", "Shirur Anantpal", "Udgir"],
+    "Mumbai City": ["Mumbai"],
+    "Mumbai Suburban": ["Andheri", "Borivali", "Kurla"],
+    "Nagpur": ["Bhiwapur", "Hingna", "Kalameshwar", "Kamptee", "Katol", "Kuhi", "Mauda", "Nagpur Rural", "Narkhed", "Parseoni", "Ramtek", "Saoner", "Umred"],
+    "Nanded": ["Ardhapur", "Bhokar", "Biloli", "Deglur", "Dharmabad", "Hadgaon", "Himayatnagar", "Kandhar", "Kinwat", "Loha", "Mahur", "Mudkhed", "Mukhed", "Naigaon", "Nanded", "Umri"],
+    "Nandurbar": ["Akkalkuwa", "Akrani", "Nandurbar", "Nawapur", "Shahada", "Taloda"],
+    "Nashik": ["Baglan", "Chandwad", "Deola", "Dindori", "Igatpuri", "Kalwan", "Malegaon", "Nandgaon", "Nashik", "Niphad", "Peth", "Sinnar", "Surgana", "Trimbakeshwar", "Yeola"],
+    "Osmanabad": ["Bhoom", "Kalamb", "Lohara", "Osmanabad", "Paranda", "Tuljapur", "Umarga", "Washi"],
+    "Palghar": ["Dahanu", "Jawhar", "Mokhada", "Palghar", "Talasari", "Vasai", "Vikramgad", "Wada"],
+    "Parbhani": ["Gangakhed", "Jintur", "Manwath", "Palam", "Parbhani", "Pathri", "Purna", "Sailu", "Sonpeth"],
+    "Pune": ["Ambegaon", "Baramati", "Bhor", "Daund", "Haveli", "Indapur", "Junnar", "Khed", "Mawal", "Mulshi", "Purandar", "Shirur", "Velhe"],
+    "Raigad": ["Alibag", "Karjat", "Khalapur", "Mahad", "Mangaon", "Mhasla", "Murud", "Panvel", "Pen", "Poladpur", "Roha", "Shrivardhan", "Sudhagad", "Tala", "Uran"],
+    "Ratnagiri": ["Chiplun", "Dapoli", "Guhagar", "Khed", "Lanja", "Mandangad", "Rajapur", "Ratnagiri", "Sangameshwar"],
+    "Sangli": ["Atpadi", "Jat", "Kadegaon", "Kavathemahankal", "Khanapur", "Miraj", "Palus", "Shirala", "Tasgaon", "Walwa"],
+    "Satara": ["Jaoli", "Karad", "Khandala", "Khatav", "Koregaon", "Mahabaleshwar", "Man", "Patan", "Phaltan", "Satara", "Wai"],
+    "Sindhudurg": ["Devgad", "Dodamarg", "Kankavli", "Kudal", "Malvan", "Sawantwadi", "Vaibhavwadi", "Vengurla"],
+    "Solapur": ["Akkalkot", "Barshi", "Karmala", "Madha", "Malshiras", "Mangalvedhe", "Mohol", "North Solapur", "Pandharpur", "Sangola", "South Solapur"],
+    "Thane": ["Ambarnath", "Bhiwandi", "Kalyan", "Murbad", "Shahapur", "Thane"],
+    "Wardha": ["Arvi", "Ashti", "Deoli", "Hinganghat", "Karanja", "Samudrapur", "Seloo", "Wardha"],
+    "Washim": ["Karanja", "Malegaon", "Mangrulpir", "Manora", "Risod", "Washim"],
+    "Yavatmal": ["Arni", "Babulgaon", "Darwha", "Digras", "Ghatanji", "Kalamb", "Kelapur", "Mahagaon", "Maregaon", "Ner", "Pusad", "Ralegaon", "Umarkhed", "Wani", "Yavatmal", "Zari Jamani"]
+}
+
+
+# वार्षिक सरासरी पर्जन्यमान (mm) - जिल्हानुसार अंदाजित मूल्ये
+MAHARASHTRA_ANNUAL_RAINFALL_MM = {
+    "Ahmednagar": 575, "Akola": 900, "Amravati": 950, "Beed": 700, "Bhandara": 1300,
+    "Buldhana": 850, "Chandrapur": 1200, "Chhatrapati Sambhajinagar": 730, "Dhule": 680,
+    "Gadchiroli": 1450, "Gondia": 1350, "Hingoli": 820, "Jalgaon": 720, "Jalna": 700,
+    "Kolhapur": 1750, "Latur": 780, "Mumbai City": 2400, "Mumbai Suburban": 2300,
+    "Nagpur": 1100, "Nanded": 930, "Nandurbar": 900, "Nashik": 1000, "Osmanabad": 760,
+    "Palghar": 2200, "Parbhani": 820, "Pune": 850, "Raigad": 3200, "Ratnagiri": 3200,
+    "Sangli": 650, "Satara": 1050, "Sindhudurg": 3000, "Solapur": 560, "Thane": 2100,
+    "Wardha": 1050, "Washim": 880, "Yavatmal": 980
+}
+
+
+# =========================
+# Soil Details + Steps (Report)
+# =========================
+SOIL_GUIDE = {
+    "Sandy soil": {
+        "details": "पाणी लवकर निचरा होते, पोषकद्रव्य धरून ठेवण्याची क्षमता कमी. सेंद्रिय पदार्थ आणि मल्चिंग गरजेचे.",
+        "steps": [
+            "कंपोस्ट/शेणखत भरपूर मिसळा (ओलावा टिकवण्यासाठी).",
+            "ड्रिप/वारंवार हलके सिंचन करा.",
+            "खते विभागून द्या (split application).",
+            "मल्चिंग करा (तण कमी + ओलावा टिकतो)."
+        ]
+    },
+    "Black soil": {
+        "details": "चिकणमाती जास्त; पाणी धरून ठेवते पण पाणी साचू शकते. निचरा महत्त्वाचा.",
+        "steps": [
+            "निचरा चांगला ठेवा (पाणी साचू देऊ नका).",
+            "सेंद्रिय खत मिसळून माती भुसभुशीत करा.",
+            "पेरणीपूर्वी माती परीक्षण करून pH/NPK तपासा."
+        ]
+    },
+    "Alluvial soil": {
+        "details": "सुपीक माती; पाणी धरणे/निचरा मध्यम. संतुलित NPK व्यवस्थापन केल्यास उत्पादन वाढते.",
+        "steps": [
+            "माती परीक्षण करा आणि NPK शिफारशीनुसार द्या.",
+            "सिंचन नियोजन: अति सिंचन टाळा.",
+            "तण/कीड नियंत्रण नियमित करा."
+        ]
+    },
+    "Red soil": {
+        "details": "सेंद्रिय पदार्थ कमी असू शकतो; सेंद्रिय खत आणि संतुलित खत व्यवस्थापन आवश्यक.",
+        "steps": [
+            "कंपोस्ट/वर्मी-कंपोस्ट वाढवा.",
+            "नत्र (N) व्यवस्थापन split doses मध्ये करा.",
+            "ओलावा टिकवण्यासाठी मल्चिंग करा."
+        ]
+    },
+    "Laterite soil": {
+        "details": "आम्लीय (acidic) असू शकते; पोषकद्रव्य कमी. सेंद्रिय पदार्थ + गरजेनुसार चुना (तज्ज्ञ सल्ल्याने).",
+        "steps": [
+            "pH तपासा; खूप आम्लीय असेल तर liming (तज्ज्ञ सल्ल्याने).",
+            "कंपोस्ट/वर्मी-कंपोस्ट वापरा.",
+            "सूक्ष्मअन्नद्रव्य गरजेप्रमाणे द्या."
+        ]
+    }
+}
+
+# Crop specific quick tips
+CROP_GUIDE = {
+    "tomato": [
+        "रोपे लावताना योग्य अंतर ठेवा; स्टेकिंग/सपोर्ट द्या.",
+        "फुलोऱ्यावर बुरशी/किडीचे निरीक्षण करा.",
+        "पाणी नियमित द्या पण पाणी साचू देऊ नका."
+    ],
+    "potato": [
+        "सरी-वरंबा पद्धत उपयुक्त; माती चढवणे (earthing up) करा.",
+        "जास्त पाणी टाळा; रोग (ब्लाइट) निरीक्षण करा."
+    ],
+    "paddy": [
+        "पाण्याचे नियोजन करा; रोप लावणी/थेट पेरणी योग्य पद्धतीने करा.",
+        "तण नियंत्रण सुरुवातीच्या टप्प्यात महत्वाचे."
+    ],
+    "wheat": [
+        "वेळेवर पेरणी करा; टॉप ड्रेसिंग योग्य वेळी द्या.",
+        "अति पाणी टाळा; मध्यम सिंचन ठेवा."
+    ],
+    "soyabean": [
+        "पाणी साचू देऊ नका; बीजप्रक्रिया (Rhizobium/PSB) फायदेशीर.",
+        "सुरुवातीचे 30-45 दिवस तणमुक्त ठेवा."
+    ],
+    "cotton": [
+        "सुरुवातीच्या अवस्थेत तण नियंत्रण आणि कीड निरीक्षण (बोलवर्म/मावा) करा.",
+        "संतुलित खत व्यवस्थापन ठेवा."
+    ]
+}
@@ -0,0 +1,165 @@
+"""Headless batch classification of a folder of soil photos.
+
+Usage:
+    python soil_batch_classify.py <image_dir> --output results.csv [--batch-size 64]
+
+Uses the same preprocessing and non-soil rules as the dashboard's
+"CNN Prediction" button and writes one CSV/JSONL row per image.
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from soil_inference import DEFAULT_NON_SOIL_THRESHOLD, evaluate_prediction, load_model_input
+from soil_model_registry import get_registry
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+RESULT_FIELDS = ["path", "class_id", "class_name", "confidence", "is_soil", "reason", "error"]
+_DONE = object()
+
+
+def iter_image_paths(root_dir):
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+def _decode(path):
+    try:
+        return path, load_model_input(path), ""
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _produce_batches(paths, batch_size, workers, out_queue):
+    """Decode images on a thread pool and hand ready batches to the consumer.
+
+    The bounded queue keeps at most a few decoded batches in memory while the
+    model works on the current one.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk in _chunked(paths, batch_size):
+                out_queue.put(list(pool.map(_decode, chunk)))
+    finally:
+        out_queue.put(_DONE)
+
+
+class _ResultWriter:
+    def __init__(self, output_path):
+        self.jsonl = output_path.lower().endswith((".jsonl", ".json"))
+        self.fp = open(output_path, "w", encoding="utf-8", newline="")
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.fp, fieldnames=RESULT_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self.writer.writerow(row)
+
+    def close(self):
+        self.fp.close()
+
+
+def classify_directory(image_dir, output_path, model_path="dataset/soil_model_cnn.h5",
+                       class_index_path="dataset/class_indices.json", batch_size=64,
+                       workers=4, prefetch_batches=2,
+                       non_soil_threshold=DEFAULT_NON_SOIL_THRESHOLD, backend="keras"):
+    """Stream every image under image_dir through the CNN and write one results file."""
+    registry = get_registry()
+    model = registry.get_model(model_path, backend=backend)
+    class_map = registry.get_class_mapping(class_index_path)
+
+    batches = queue.Queue(maxsize=max(1, prefetch_batches))
+    producer = threading.Thread(
+        target=_produce_batches,
+        args=(iter_image_paths(image_dir), batch_size, workers, batches),
+        daemon=True,
+    )
+
+    summary = {"images": 0, "soil": 0, "non_soil": 0, "errors": 0}
+    start = time.perf_counter()
+    writer = _ResultWriter(output_path)
+    producer.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                break
+
+            decoded = [(path, arr) for path, arr, err in batch if arr is not None]
+            for path, _, err in batch:
+                if err:
+                    summary["errors"] += 1
+                    writer.write({"path": path, "error": err})
+
+            if not decoded:
+                continue
+            probs = model.predict_on_batch(np.stack([arr for _, arr in decoded]))
+            for (path, _), row in zip(decoded, np.asarray(probs)):
+                verdict = evaluate_prediction(
+                    row, class_map, image_path=path, non_soil_threshold=non_soil_threshold
+                )
+                verdict["confidence"] = round(verdict["confidence"], 2)
+                writer.write({"path": path, "error": "", **verdict})
+                summary["images"] += 1
+                summary["soil" if verdict["is_soil"] else "non_soil"] += 1
+    finally:
+        writer.close()
+        producer.join(timeout=1)
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 2)
+    summary["images_per_sec"] = round(summary["images"] / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch soil image classification")
+    parser.add_argument("image_dir")
+    parser.add_argument("--output", default="soil_batch_results.csv", help=".csv or .jsonl")
+    parser.add_argument("--model", default="dataset/soil_model_cnn.h5")
+    parser.add_argument("--backend", choices=["keras", "tflite"], default="keras")
+    parser.add_argument("--class-index", default="dataset/class_indices.json")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4, help="decode threads")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_NON_SOIL_THRESHOLD)
+    args = parser.parse_args()
+
+    summary = classify_directory(
+        args.image_dir,
+        args.output,
+        model_path=args.model,
+        class_index_path=args.class_index,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        non_soil_threshold=args.threshold,
+        backend=args.backend,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
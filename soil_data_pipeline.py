@@ -0,0 +1,200 @@
+"""tf.data input pipeline for the soil CNN.
+
+Drop-in alternative to ImageDataGenerator.flow_from_directory: same
+dataset/<split>/<class>/ layout, same class_indices (sorted folder names),
+same 100x100 RGB /255 inputs and the same augmentation ranges, but decoding
+runs in parallel, decoded tensors are cached and batches are prefetched.
+
+Usage:
+    python soil_data_pipeline.py --bench [--steps 50] [--cache memory|<file>]
+"""
+import argparse
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+IMAGE_SIZE = (100, 100)
+BATCH_SIZE = 32
+# Extensions accepted by flow_from_directory.
+WHITE_LIST_FORMATS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+# tf.io.decode_image handles BMP/GIF/JPEG/PNG only; these go through PIL instead.
+PIL_DECODE_FORMATS = (".ppm", ".tif", ".tiff")
+
+# Same ranges as CNNModel's ImageDataGenerator.
+ROTATION_RANGE = 15.0    # degrees
+ZOOM_RANGE = 0.2         # zoom factor drawn from [0.8, 1.2] per axis
+SHEAR_RANGE = 0.2        # degrees, as in ImageDataGenerator
+HORIZONTAL_FLIP = True
+
+
+def list_class_files(directory):
+    """Return (paths, labels, class_indices) in flow_from_directory order."""
+    directory = Path(directory)
+    classes = sorted(p.name for p in directory.iterdir() if p.is_dir())
+    class_indices = {name: i for i, name in enumerate(classes)}
+    paths, labels = [], []
+    for name in classes:
+        for dirpath, dirnames, filenames in os.walk(directory / name):
+            dirnames.sort()
+            for fname in sorted(filenames):
+                if fname.lower().endswith(WHITE_LIST_FORMATS):
+                    paths.append(os.path.join(dirpath, fname))
+                    labels.append(class_indices[name])
+    return paths, labels, class_indices
+
+
+def _pil_decode(path):
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path.decode("utf-8")) as img:
+        return np.asarray(img.convert("RGB"), dtype=np.uint8)
+
+
+def _decode(path, image_size):
+    import tensorflow as tf
+
+    def decode_with_pil():
+        img = tf.numpy_function(_pil_decode, [path], tf.uint8)
+        img.set_shape((None, None, 3))
+        return img
+
+    def decode_with_tf():
+        return tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+
+    pattern = r".*\.(" + "|".join(ext.lstrip(".") for ext in PIL_DECODE_FORMATS) + ")"
+    img = tf.cond(tf.strings.regex_full_match(tf.strings.lower(path), pattern), decode_with_pil, decode_with_tf)
+    # flow_from_directory resizes with nearest-neighbour by default.
+    img = tf.image.resize(img, image_size, method="nearest")
+    img.set_shape((*image_size, 3))
+    return tf.cast(img, tf.float32) / 255.0
+
+
+def _random_affine(images):
+    """Flip, rotation, zoom and shear for a whole batch in one transform op."""
+    import tensorflow as tf
+
+    batch = tf.shape(images)[0]
+    height = tf.cast(tf.shape(images)[1], tf.float32)
+    width = tf.cast(tf.shape(images)[2], tf.float32)
+
+    if HORIZONTAL_FLIP:
+        flip = tf.random.uniform((batch, 1, 1, 1)) < 0.5
+        images = tf.where(flip, tf.image.flip_left_right(images), images)
+
+    theta = tf.random.uniform((batch,), -ROTATION_RANGE, ROTATION_RANGE) * math.pi / 180.0
+    shear = tf.random.uniform((batch,), -SHEAR_RANGE, SHEAR_RANGE) * math.pi / 180.0
+    zx = tf.random.uniform((batch,), 1.0 - ZOOM_RANGE, 1.0 + ZOOM_RANGE)
+    zy = tf.random.uniform((batch,), 1.0 - ZOOM_RANGE, 1.0 + ZOOM_RANGE)
+
+    # Output->input mapping: rotation @ shear @ zoom, about the image centre.
+    a0 = tf.cos(theta) * zx
+    a1 = (-tf.sin(theta + shear)) * zy
+    b0 = tf.sin(theta) * zx
+    b1 = tf.cos(theta + shear) * zy
+    cx = (width - 1.0) / 2.0
+    cy = (height - 1.0) / 2.0
+    a2 = cx - a0 * cx - a1 * cy
+    b2 = cy - b0 * cx - b1 * cy
+    zeros = tf.zeros_like(a0)
+    transforms = tf.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.shape(images)[1:3],
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="NEAREST",
+    )
+
+
+def build_dataset(directory, augment=False, cache=None, batch_size=BATCH_SIZE,
+                  image_size=IMAGE_SIZE, shuffle=True, seed=None):
+    """Return (dataset, class_indices, sample_count).
+
+    cache: None (no cache), "memory", or a file path prefix for an on-disk cache.
+    Decoded images are cached before augmentation, so each epoch still gets
+    fresh random transforms.
+    """
+    import tensorflow as tf
+
+    paths, labels, class_indices = list_class_files(directory)
+    num_classes = len(class_indices)
+    AUTOTUNE = tf.data.AUTOTUNE
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    ds = ds.map(
+        lambda p, y: (_decode(p, image_size), tf.one_hot(y, num_classes)),
+        num_parallel_calls=AUTOTUNE,
+        deterministic=False,
+    )
+    if cache == "memory":
+        ds = ds.cache()
+    elif cache:
+        Path(cache).parent.mkdir(parents=True, exist_ok=True)
+        ds = ds.cache(str(cache))
+    if shuffle:
+        ds = ds.shuffle(min(len(paths), 4096) or 1, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    if augment:
+        ds = ds.map(lambda x, y: (_random_affine(x), y), num_parallel_calls=AUTOTUNE)
+    ds = ds.prefetch(AUTOTUNE)
+    return ds, class_indices, len(paths)
+
+
+def measure_throughput(batches, steps=None):
+    """Images/sec over `steps` batches of an iterable (generator or dataset).
+
+    steps=None consumes one full pass (needed to fill a tf.data cache).
+    """
+    it = iter(batches)
+    start = time.perf_counter()
+    images = 0
+    for i, (x, _) in enumerate(it):
+        images += int(x.shape[0])
+        if steps is not None and i + 1 >= steps:
+            break
+    return images / (time.perf_counter() - start)
+
+
+def benchmark(train_dir="dataset/train", steps=50, cache="memory"):
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+    generator = ImageDataGenerator(
+        rescale=1.0 / 255,
+        shear_range=SHEAR_RANGE,
+        zoom_range=ZOOM_RANGE,
+        horizontal_flip=HORIZONTAL_FLIP,
+        rotation_range=ROTATION_RANGE,
+    ).flow_from_directory(str(train_dir), target_size=IMAGE_SIZE, batch_size=BATCH_SIZE, class_mode="categorical")
+
+    ds, _, samples = build_dataset(train_dir, augment=True, cache=cache)
+    return {
+        "samples": samples,
+        "batch_size": BATCH_SIZE,
+        "image_data_generator_images_per_sec": round(measure_throughput(generator, steps), 1),
+        # First epoch decodes and fills the cache, the second reads from it.
+        "tf_data_first_epoch_images_per_sec": round(measure_throughput(ds), 1),
+        "tf_data_cached_epoch_images_per_sec": round(measure_throughput(ds), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tf.data soil image pipeline")
+    parser.add_argument("--bench", action="store_true", help="compare images/sec with ImageDataGenerator")
+    parser.add_argument("--train-dir", default="dataset/train")
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--cache", default="memory", help='"memory", "" for none, or a cache file path')
+    args = parser.parse_args()
+
+    if args.bench:
+        print(json.dumps(benchmark(args.train_dir, args.steps, args.cache or None), indent=2))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import threading
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# =========================================================
+# SHARED SOIL CNN INFERENCE RULES
+# (used by the dashboard and the headless batch classifier)
+# =========================================================
+MODEL_INPUT_SIZE = (100, 100)
+DEFAULT_NON_SOIL_THRESHOLD = 65.0
+# Class ids with a recommendation entry (CropPredictionApp.SOIL_RECO keys).
+DEFAULT_SOIL_CLASS_IDS = frozenset({0, 1, 2, 3, 4})
+
+
+# JPEG photos are decoded at a reduced DCT scale (1/2, 1/4, 1/8) that still
+# leaves at least this multiple of the target size for the final resize.
+DRAFT_OVERSAMPLE = 2
+# Largest difference (inputs are in [0, 1]) allowed between a draft-decoded
+# model input and one from a full decode, per pixel and on average.
+# Checked by tests/test_draft_decode.py and benchmark_decode.py.
+DRAFT_MAX_ABS_DIFF = 0.10
+DRAFT_MAX_MEAN_ABS_DIFF = 0.01
+
+
+def draft_reduce(pil_img, target_size):
+    """Ask the JPEG decoder for the smallest scale that is still >= target_size.
+
+    No-op for other formats and for images that are already loaded.
+    """
+    if pil_img.format == "JPEG":
+        pil_img.draft("RGB", tuple(int(v) for v in target_size))
+    return pil_img
+
+
+def preprocess_image(pil_img):
+    """100x100 RGB float32 array scaled to [0, 1], as used during training."""
+    draft_reduce(pil_img, (MODEL_INPUT_SIZE[0] * DRAFT_OVERSAMPLE, MODEL_INPUT_SIZE[1] * DRAFT_OVERSAMPLE))
+    img = pil_img.convert("RGB").resize(MODEL_INPUT_SIZE)
+    return np.asarray(img, dtype="float32") / 255.0
+
+
+def load_model_input(image_path):
+    with Image.open(image_path) as img:
+        return preprocess_image(img)
+
+
+def is_non_soil_class(class_name):
+    if not class_name:
+        return False
+
+    key = class_name.lower().replace("-", "_").replace(" ", "_")
+    non_soil_tokens = (
+        "non_soil", "nonsoil", "not_soil", "human", "person", "face", "body"
+    )
+    return any(token in key for token in non_soil_tokens)
+
+
+def is_known_soil_class(class_name):
+    """Check whether predicted class label maps to one of the supported soil types."""
+    if not class_name:
+        return False
+
+    normalized = class_name.lower().replace("-", " ").replace("_", " ").strip()
+    known_aliases = {
+        "black soil", "black", "kali mati",
+        "alluvial soil", "alluvial", "gaalachi mati",
+        "laterite soil", "laterite",
+        "yellow soil", "yellow",
+        "sandy soil", "sandy",
+    }
+    return normalized in known_aliases
+
+
+# Face detection runs on a copy whose longest side is at most this many pixels.
+# Verdicts match full-resolution detection for faces that are at least
+# HEURISTIC_MIN_FACE_SIZE pixels tall in the downscaled copy, i.e. roughly
+# min_face_size * original_side / max_side pixels in the photo itself (about
+# 250 px on a 4000 px camera image). Smaller faces may flip between the two modes.
+HEURISTIC_MAX_SIDE = 640
+HEURISTIC_MIN_FACE_SIZE = 40
+# Laplacian variance depends on scale (shrinking a photo sharpens its edges
+# per pixel and raises the variance everywhere), so the low-texture check
+# keeps running on the full-resolution photo, where this cut-off was set.
+TEXTURE_MIN_VARIANCE = 18.0
+
+_cascade_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_cascade(filename):
+    """Load OpenCV haar cascade safely (parsed once per process)."""
+    try:
+        path = cv2.data.haarcascades + filename
+        cascade = cv2.CascadeClassifier(path)
+        return cascade if not cascade.empty() else None
+    except Exception:
+        return None
+
+
+def texture_variance(gray):
+    """Laplacian variance of a grayscale image (compare at full resolution only)."""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def downscale_gray(gray, max_side=HEURISTIC_MAX_SIDE):
+    """Shrink a grayscale image until its longest side fits max_side (0 = keep as is)."""
+    h, w = gray.shape[:2]
+    longest = max(h, w)
+    if not max_side or longest <= max_side:
+        return gray
+    # Halve with pyrDown while well above the bound, finish with an area resize.
+    while longest >= 2 * max_side:
+        gray = cv2.pyrDown(gray)
+        longest = max(gray.shape[:2])
+    scale = max_side / float(longest)
+    h, w = gray.shape[:2]
+    return cv2.resize(gray, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def heuristic_non_soil_check(image_path, max_side=HEURISTIC_MAX_SIDE,
+                             min_face_size=HEURISTIC_MIN_FACE_SIZE, gray=None):
+    """Human-feature based non-soil detector to avoid soil-color false positives.
+
+    `gray` is the full-resolution grayscale photo when the caller already has it.
+    """
+    if gray is None:
+        img = cv2.imread(image_path)
+        if img is None:
+            return False, ""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    texture_gray = gray
+    gray = downscale_gray(gray, max_side)
+
+    # 1) Face detection (primary human indicator).
+    face_cascade = load_cascade("haarcascade_frontalface_default.xml")
+    if face_cascade is not None:
+        with _cascade_lock:
+            faces = face_cascade.detectMultiScale(
+                gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_face_size, min_face_size)
+            )
+        if len(faces) > 0:
+            # 2) Validate face with eyes/smile when possible (reduces false positives).
+            eye_cascade = load_cascade("haarcascade_eye.xml")
+            smile_cascade = load_cascade("haarcascade_smile.xml")
+            for (x, y, w, h) in faces:
+                roi = gray[y:y + h, x:x + w]
+                eye_hits = 0
+                smile_hits = 0
+                with _cascade_lock:
+                    if eye_cascade is not None:
+                        eyes = eye_cascade.detectMultiScale(roi, scaleFactor=1.1, minNeighbors=5, minSize=(12, 12))
+                        eye_hits = len(eyes)
+                    if smile_cascade is not None:
+                        smiles = smile_cascade.detectMultiScale(roi, scaleFactor=1.7, minNeighbors=20, minSize=(20, 20))
+                        smile_hits = len(smiles)
+
+                # Strong human evidence.
+                if eye_hits >= 1 or smile_hits >= 1:
+                    return True, "human facial features detected"
+
+            # If validation cascades are unavailable, still trust face detection.
+            if eye_cascade is None and smile_cascade is None:
+                return True, "face-like object detected"
+
+    # 3) Keep only conservative low-texture rejection for obviously plain/non-soil images.
+    if texture_variance(texture_gray) < TEXTURE_MIN_VARIANCE:
+        return True, "very low texture image"
+
+    return False, ""
+
+
+def evaluate_prediction(probs, class_map, image_path=None,
+                        soil_class_ids=DEFAULT_SOIL_CLASS_IDS,
+                        non_soil_threshold=DEFAULT_NON_SOIL_THRESHOLD,
+                        heuristic_check=heuristic_non_soil_check):
+    """Apply the non-soil rules to one softmax row.
+
+    Returns a dict with class_id, class_name, confidence (%), is_soil and reason.
+    """
+    class_id = int(np.argmax(probs))
+    conf = float(np.max(probs)) * 100.0
+    class_name = class_map.get(class_id, "")
+    result = {
+        "class_id": class_id,
+        "class_name": class_name,
+        "confidence": conf,
+        "is_soil": False,
+        "reason": "",
+    }
+
+    # Run heuristic guard only when model mapping is unavailable.
+    # This prevents false blocking on valid soil photos.
+    if not class_map and image_path is not None and heuristic_check is not None:
+        is_non_soil, reason = heuristic_check(image_path)
+        if is_non_soil:
+            result["reason"] = reason
+            return result
+
+    # Block prediction for explicit non-soil/human class labels.
+    if is_non_soil_class(class_name):
+        result["reason"] = "non-soil class label"
+        return result
+
+    # If model mapping exists and class is not recognized as soil, treat as non-soil.
+    if class_name and not is_known_soil_class(class_name):
+        result["reason"] = "unrecognized class label"
+        return result
+
+    # Safety fallback for unsupported classes or weak confidence.
+    if class_id not in soil_class_ids:
+        result["reason"] = "unsupported class"
+        return result
+    if conf < non_soil_threshold:
+        result["reason"] = "low confidence"
+        return result
+
+    result["is_soil"] = True
+    return result
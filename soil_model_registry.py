@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+# =========================================================
+# FILE FINGERPRINTS
+# =========================================================
+def _file_signature(path):
+    """Cheap change check: modification time + size."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# =========================================================
+# LOADERS
+# =========================================================
+def _load_keras_model(path):
+    from tensorflow.keras.models import load_model
+    return load_model(path, compile=False)
+
+
+def _load_tflite_model(path):
+    from soil_tflite import TFLiteSoilModel
+    return TFLiteSoilModel(path)
+
+
+MODEL_BACKENDS = {
+    "keras": _load_keras_model,
+    "tflite": _load_tflite_model,
+}
+
+
+def _load_class_mapping(path):
+    """Return index->class_name mapping saved during training."""
+    with open(path, "r", encoding="utf-8") as fp:
+        raw = json.load(fp)
+    return {int(v): k for k, v in raw.items()}
+
+
+# =========================================================
+# REGISTRY
+# =========================================================
+class SoilModelRegistry:
+    """Process-wide cache for the soil CNN and its class index map.
+
+    Entries stay warm until the file on disk changes. The mtime/size pair is
+    checked on every lookup; when it moves, the file is hashed and only a
+    different digest triggers a reload (a plain `touch` keeps the entry).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+
+    def _get(self, kind, path, loader):
+        path = os.path.abspath(path)
+        key = (kind, path)
+        with self._lock:
+            signature = _file_signature(path)
+            entry = self._entries.get(key)
+            digest = None
+            if entry is not None:
+                if entry["signature"] == signature:
+                    self._hits += 1
+                    return entry["value"]
+                digest = _file_digest(path)
+                if digest == entry["digest"]:
+                    entry["signature"] = signature
+                    self._hits += 1
+                    return entry["value"]
+                self._reloads += 1
+
+            self._misses += 1
+            if digest is None:
+                digest = _file_digest(path)
+            start = time.perf_counter()
+            value = loader(path)
+            self._entries[key] = {
+                "value": value,
+                "signature": signature,
+                "digest": digest,
+                "load_seconds": time.perf_counter() - start,
+                "loaded_at": time.time(),
+            }
+            return value
+
+    def get_model(self, path, backend="keras"):
+        """Return a model exposing predict()/predict_on_batch() for the given backend."""
+        if backend not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown soil model backend: {backend}")
+        return self._get(backend, path, MODEL_BACKENDS[backend])
+
+    def get_class_mapping(self, path):
+        if not os.path.exists(path):
+            return {}
+        return self._get("class_map", path, _load_class_mapping)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "entries": {
+                    f"{kind}:{path}": {
+                        "load_seconds": round(entry["load_seconds"], 4),
+                        "loaded_at": entry["loaded_at"],
+                        "sha256": entry["digest"],
+                    }
+                    for (kind, path), entry in self._entries.items()
+                },
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_REGISTRY = SoilModelRegistry()
+
+
+def get_registry():
+    return _REGISTRY
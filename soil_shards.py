@@ -0,0 +1,215 @@
+"""Pre-decoded, memory-mapped soil image shards.
+
+Usage:
+    python soil_shards.py pack [--dataset dataset] [--out dataset/packed]
+
+`pack` resizes every image of dataset/train and dataset/test to the model
+input size once and stores them as uint8 .npy shards plus a manifest with
+the label index and a content hash per file. Running it again only decodes
+files whose content changed; unchanged rows are copied from the old shards.
+CNNModel.main(pipeline="shards") trains straight from the memory maps.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from soil_data_pipeline import BATCH_SIZE, IMAGE_SIZE, list_class_files
+from soil_inference import draft_reduce
+
+SHARD_SIZE = 4096
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_sha1(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _decode_uint8(path, image_size):
+    with Image.open(path) as img:
+        draft_reduce(img, (image_size[0] * 2, image_size[1] * 2))
+        # Nearest-neighbour, like flow_from_directory.
+        return np.asarray(img.convert("RGB").resize(image_size, Image.NEAREST), dtype=np.uint8)
+
+
+def load_manifest(out_dir):
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def _open_shards(out_dir, manifest):
+    return [np.load(Path(out_dir) / shard["images"], mmap_mode="r") for shard in manifest["shards"]]
+
+
+def _close_shards(shards):
+    """Release the file mappings now; Windows refuses to delete a mapped file."""
+    for shard in shards:
+        mm = getattr(shard, "_mmap", None)
+        if mm is not None:
+            mm.close()
+    shards.clear()
+
+
+def pack_split(split_dir, out_dir, image_size=IMAGE_SIZE, shard_size=SHARD_SIZE, workers=8):
+    """Pack one split (e.g. dataset/train) into out_dir; return a summary dict."""
+    split_dir, out_dir = Path(split_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths, labels, class_indices = list_class_files(split_dir)
+
+    old = load_manifest(out_dir)
+    if old is not None and tuple(old["image_size"]) != tuple(image_size):
+        old = None
+    old_files = old["files"] if old else {}
+    old_shards = _open_shards(out_dir, old) if old else []
+
+    # mtime/size unchanged -> trust the stored hash; otherwise hash the bytes.
+    entries = []
+    for path, label in zip(paths, labels):
+        rel = os.path.relpath(path, split_dir)
+        st = os.stat(path)
+        prev = old_files.get(rel)
+        if prev and prev["mtime_ns"] == st.st_mtime_ns and prev["size"] == st.st_size:
+            sha1 = prev["sha1"]
+        else:
+            sha1 = _file_sha1(path)
+        reuse = prev if prev and prev["sha1"] == sha1 else None
+        entries.append({"rel": rel, "path": path, "label": label, "sha1": sha1,
+                        "mtime_ns": st.st_mtime_ns, "size": st.st_size, "reuse": reuse})
+
+    files, shards = {}, []
+    decoded_count = 0
+    generation = (old["generation"] + 1) if old else 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for shard_idx, start in enumerate(range(0, len(entries), shard_size)):
+            chunk = entries[start:start + shard_size]
+            # Decode only this shard's new/changed files, keeping memory bounded.
+            fresh = [e for e in chunk if e["reuse"] is None]
+            decoded = dict(zip((e["rel"] for e in fresh),
+                               pool.map(lambda e: _decode_uint8(e["path"], image_size), fresh)))
+            decoded_count += len(fresh)
+
+            images_name = f"images_g{generation}_{shard_idx:04d}.npy"
+            labels_name = f"labels_g{generation}_{shard_idx:04d}.npy"
+            images = np.lib.format.open_memmap(
+                out_dir / images_name, mode="w+", dtype=np.uint8, shape=(len(chunk), *image_size, 3)
+            )
+            for row, e in enumerate(chunk):
+                if e["reuse"] is not None:
+                    images[row] = old_shards[e["reuse"]["shard"]][e["reuse"]["row"]]
+                else:
+                    images[row] = decoded[e["rel"]]
+                files[e["rel"]] = {"label": e["label"], "sha1": e["sha1"], "mtime_ns": e["mtime_ns"],
+                                   "size": e["size"], "shard": shard_idx, "row": row}
+            images.flush()
+            del images
+            np.save(out_dir / labels_name, np.asarray([e["label"] for e in chunk], dtype=np.int16))
+            shards.append({"images": images_name, "labels": labels_name, "count": len(chunk)})
+
+    manifest = {
+        "generation": generation,
+        "image_size": list(image_size),
+        "class_indices": class_indices,
+        "samples": len(entries),
+        "shards": shards,
+        "files": files,
+    }
+    tmp = out_dir / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(manifest, fp)
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+
+    # Old generation shards are no longer referenced.
+    _close_shards(old_shards)
+    keep = {s["images"] for s in shards} | {s["labels"] for s in shards}
+    for stale in out_dir.glob("*_g*.npy"):
+        if stale.name not in keep:
+            try:
+                stale.unlink()
+            except PermissionError:
+                # Still mapped by another process (e.g. a running training job) on
+                # Windows; the next pack removes it.
+                pass
+
+    return {"split": str(split_dir), "samples": len(entries), "decoded": decoded_count,
+            "reused": len(entries) - decoded_count, "shards": len(shards)}
+
+
+def pack(dataset_dir="dataset", out_dir="dataset/packed", **kwargs):
+    return [pack_split(Path(dataset_dir) / split, Path(out_dir) / split, **kwargs) for split in ("train", "test")]
+
+
+def load_split(out_dir):
+    """Return (image memmaps per shard, labels, class_indices) for a packed split."""
+    manifest = load_manifest(out_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No packed shards in {out_dir}; run `python soil_shards.py pack` first.")
+    images = _open_shards(out_dir, manifest)
+    labels = np.concatenate([np.load(Path(out_dir) / s["labels"]) for s in manifest["shards"]]) \
+        if manifest["shards"] else np.zeros(0, dtype=np.int16)
+    return images, labels, manifest["class_indices"]
+
+
+def build_shard_dataset(out_dir, augment=False, batch_size=BATCH_SIZE, shuffle=True, seed=None):
+    """tf.data pipeline over the memory-mapped shards; returns (dataset, class_indices, count)."""
+    import tensorflow as tf
+    from soil_data_pipeline import _random_affine
+
+    shard_images, labels, class_indices = load_split(out_dir)
+    num_classes = len(class_indices)
+    offsets = np.cumsum([0] + [len(s) for s in shard_images])
+    count = int(offsets[-1])
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        order = rng.permutation(count) if shuffle else np.arange(count)
+        for start in range(0, count, batch_size):
+            # Sorted within the batch for sequential page access.
+            idx = np.sort(order[start:start + batch_size])
+            shard_of = np.searchsorted(offsets, idx, side="right") - 1
+            x = np.stack([shard_images[s][i - offsets[s]] for s, i in zip(shard_of, idx)])
+            yield x, labels[idx]
+
+    ds = tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec((None, *shard_images[0].shape[1:]) if shard_images else (None, *IMAGE_SIZE, 3), tf.uint8),
+            tf.TensorSpec((None,), tf.int16),
+        ),
+    )
+    # from_generator has unknown cardinality; without it, fit() with explicit
+    # steps_per_epoch never restarts the generator and stops after one epoch.
+    ds = ds.apply(tf.data.experimental.assert_cardinality(math.ceil(count / batch_size)))
+    ds = ds.map(
+        lambda x, y: (tf.cast(x, tf.float32) / 255.0, tf.one_hot(tf.cast(y, tf.int32), num_classes)),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+    if augment:
+        ds = ds.map(lambda x, y: (_random_affine(x), y), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE), class_indices, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack soil images into memory-mapped shards")
+    parser.add_argument("command", choices=["pack"])
+    parser.add_argument("--dataset", default="dataset")
+    parser.add_argument("--out", default="dataset/packed")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(pack(args.dataset, args.out, shard_size=args.shard_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
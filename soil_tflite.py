@@ -0,0 +1,210 @@
+"""TFLite export and CPU inference backend for the soil CNN.
+
+Usage:
+    python soil_tflite.py export [--model dataset/soil_model_cnn.h5] [--calibration-samples 200] [--no-report]
+    python soil_tflite.py report [--model dataset/soil_model_cnn.h5]
+
+`export` writes float16 and int8 post-training-quantized models next to
+the keras model (<name>_f16.tflite, <name>_int8.tflite) and then the
+report. `report` compares accuracy, file size and per-image latency of the
+keras / float16 / int8 variants on dataset/test and writes
+<name>_tflite_report.json.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from soil_batch_classify import iter_image_paths
+from soil_inference import load_model_input
+
+BASEPATH = Path("dataset")
+KERAS_MODEL_PATH = BASEPATH / "soil_model_cnn.h5"
+VARIANT_SUFFIXES = {"float16": "_f16.tflite", "int8": "_int8.tflite"}
+
+
+def tflite_paths(model_path=KERAS_MODEL_PATH):
+    """{variant: path} of the TFLite exports that belong to one keras model."""
+    model_path = Path(model_path)
+    return {name: model_path.with_name(model_path.stem + suffix) for name, suffix in VARIANT_SUFFIXES.items()}
+
+
+def report_path(model_path=KERAS_MODEL_PATH):
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + "_tflite_report.json")
+
+
+TFLITE_VARIANTS = tflite_paths(KERAS_MODEL_PATH)
+
+
+def _make_interpreter(model_path, num_threads=None):
+    # The slim tflite-runtime wheel is enough on inference boxes; fall back to full TF.
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+    return Interpreter(model_path=str(model_path), num_threads=num_threads)
+
+
+class TFLiteSoilModel:
+    """Keras-compatible predict()/predict_on_batch() over a .tflite file."""
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = str(model_path)
+        self._interpreter = _make_interpreter(model_path, num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        self._lock = threading.Lock()
+
+    def _quantize(self, x):
+        if self._input["dtype"] == np.float32:
+            return x.astype(np.float32, copy=False)
+        scale, zero_point = self._input["quantization"]
+        q = np.round(x / scale + zero_point)
+        info = np.iinfo(self._input["dtype"])
+        return np.clip(q, info.min, info.max).astype(self._input["dtype"])
+
+    def _dequantize(self, y):
+        if self._output["dtype"] == np.float32:
+            return y
+        scale, zero_point = self._output["quantization"]
+        return (y.astype(np.float32) - zero_point) * scale
+
+    def predict_on_batch(self, x):
+        x = np.asarray(x)
+        with self._lock:
+            if x.shape[0] != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input["index"], list(x.shape))
+                self._interpreter.allocate_tensors()
+                self._input = self._interpreter.get_input_details()[0]
+                self._output = self._interpreter.get_output_details()[0]
+                self._batch_size = x.shape[0]
+            self._interpreter.set_tensor(self._input["index"], self._quantize(x))
+            self._interpreter.invoke()
+            return self._dequantize(self._interpreter.get_tensor(self._output["index"]).copy())
+
+    def predict(self, x, verbose=0):
+        return self.predict_on_batch(x)
+
+
+# =========================================================
+# EXPORT
+# =========================================================
+def _calibration_inputs(train_dir, samples, seed=42):
+    paths = list(iter_image_paths(train_dir))
+    random.Random(seed).shuffle(paths)
+    for path in paths[:samples]:
+        try:
+            yield load_model_input(path)[np.newaxis]
+        except Exception:
+            continue
+
+
+def export_tflite(model_path=KERAS_MODEL_PATH, train_dir=BASEPATH / "train", calibration_samples=200,
+                  report=True, test_dir=BASEPATH / "test", class_index_path=BASEPATH / "class_indices.json"):
+    """Write float16 and int8 (float I/O) TFLite models next to model_path; return {variant: path}.
+
+    With report=True (and a test set on disk) the comparison report is written as well.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(model_path), compile=False)
+    outputs = tflite_paths(model_path)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    outputs["float16"].write_bytes(converter.convert())
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([x] for x in _calibration_inputs(train_dir, calibration_samples))
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    outputs["int8"].write_bytes(converter.convert())
+
+    written = {name: str(path) for name, path in outputs.items()}
+    if report and os.path.isdir(test_dir) and os.path.exists(class_index_path):
+        build_report(model_path, test_dir, class_index_path)
+        written["report"] = str(report_path(model_path))
+    return written
+
+
+# =========================================================
+# REPORT
+# =========================================================
+def _load_test_set(test_dir, class_index_path):
+    with open(class_index_path, "r", encoding="utf-8") as fp:
+        class_indices = json.load(fp)
+    inputs, labels = [], []
+    for class_name, idx in class_indices.items():
+        for path in iter_image_paths(os.path.join(test_dir, class_name)):
+            inputs.append(load_model_input(path))
+            labels.append(idx)
+    return np.stack(inputs), np.asarray(labels)
+
+
+def _measure(model, x, y, latency_samples=100):
+    probs = np.concatenate([model.predict_on_batch(x[i:i + 64]) for i in range(0, len(x), 64)])
+    accuracy = float(np.mean(np.argmax(probs, axis=1) == y))
+
+    timings = []
+    for i in range(min(latency_samples, len(x))):
+        start = time.perf_counter()
+        model.predict_on_batch(x[i:i + 1])
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return accuracy, float(np.median(timings))
+
+
+def build_report(model_path=KERAS_MODEL_PATH, test_dir=BASEPATH / "test",
+                 class_index_path=BASEPATH / "class_indices.json"):
+    from tensorflow.keras.models import load_model
+
+    x, y = _load_test_set(test_dir, class_index_path)
+    variants = {"keras": (load_model(str(model_path), compile=False), model_path)}
+    for name, path in tflite_paths(model_path).items():
+        if path.exists():
+            variants[name] = (TFLiteSoilModel(path), path)
+
+    report = {"test_images": int(len(y)), "variants": {}}
+    baseline = None
+    for name, (model, path) in variants.items():
+        accuracy, latency_ms = _measure(model, x, y)
+        if baseline is None:
+            baseline = accuracy
+        report["variants"][name] = {
+            "path": str(path),
+            "size_kb": round(os.path.getsize(path) / 1024.0, 1),
+            "accuracy": round(accuracy, 4),
+            "accuracy_delta": round(accuracy - baseline, 4),
+            "latency_ms_per_image": round(latency_ms, 3),
+        }
+
+    with open(report_path(model_path), "w", encoding="utf-8") as fp:
+        json.dump(report, fp, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soil CNN TFLite export / report")
+    parser.add_argument("command", choices=["export", "report"])
+    parser.add_argument("--model", default=str(KERAS_MODEL_PATH), help="keras model to export / compare")
+    parser.add_argument("--calibration-samples", type=int, default=200)
+    parser.add_argument("--no-report", action="store_true", help="export only, skip the comparison report")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(json.dumps(export_tflite(args.model, calibration_samples=args.calibration_samples,
+                                       report=not args.no_report), indent=2))
+    else:
+        print(json.dumps(build_report(args.model), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Keras callbacks for resumable soil CNN training (imported by CNNModel.main)."""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from tensorflow.keras.callbacks import Callback
+
+STATE_NAME = "state.json"
+LAST_CHECKPOINT_NAME = "last.h5"
+BEST_CHECKPOINT_NAME = "best.h5"
+
+
+def current_rss_mb():
+    """Resident set size of this process right now in MB, or None if unavailable."""
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024.0 * 1024.0), 1)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as fp:
+            pages = int(fp.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size over the whole process lifetime in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes.
+        return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024.0 * 1024.0), 1)
+    except ImportError:
+        return None
+
+
+def load_resume_state(checkpoint_dir, class_indices):
+    """Return the saved state if an unfinished run with the same classes can be resumed."""
+    path = Path(checkpoint_dir) / STATE_NAME
+    if not path.exists() or not (Path(checkpoint_dir) / LAST_CHECKPOINT_NAME).exists():
+        return None
+    with open(path, "r", encoding="utf-8") as fp:
+        state = json.load(fp)
+    if state.get("completed") or state.get("class_indices") != class_indices:
+        return None
+    return state
+
+
+def mark_completed(checkpoint_dir):
+    path = Path(checkpoint_dir) / STATE_NAME
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as fp:
+        state = json.load(fp)
+    state["completed"] = True
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(state, fp, indent=2)
+
+
+class ResumeState(Callback):
+    """Record the last finished epoch next to the per-epoch checkpoint.
+
+    Must come after the ModelCheckpoint callbacks so the state never points at
+    a checkpoint that has not been written yet.
+    """
+
+    def __init__(self, checkpoint_dir, class_indices, best_val_loss=None):
+        super().__init__()
+        self.path = Path(checkpoint_dir) / STATE_NAME
+        self.class_indices = class_indices
+        self.best_val_loss = best_val_loss
+
+    def on_epoch_end(self, epoch, logs=None):
+        val_loss = (logs or {}).get("val_loss")
+        if val_loss is not None and (self.best_val_loss is None or val_loss < self.best_val_loss):
+            self.best_val_loss = float(val_loss)
+        state = {
+            "epoch": epoch + 1,
+            "best_val_loss": self.best_val_loss,
+            "class_indices": self.class_indices,
+            "completed": False,
+        }
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(state, fp, indent=2)
+        os.replace(tmp, self.path)
+
+
+class EpochTelemetry(Callback):
+    """Append one JSON line per epoch: duration, samples/sec, memory and metrics.
+
+    epoch_peak_rss_mb is the highest current RSS sampled during the epoch
+    (every `rss_sample_every` batches and at the epoch end);
+    process_peak_rss_mb is the lifetime high-water mark of the process.
+    """
+
+    def __init__(self, log_path, samples_per_epoch, rss_sample_every=20):
+        super().__init__()
+        self.log_path = Path(log_path)
+        self.samples_per_epoch = samples_per_epoch
+        self.rss_sample_every = rss_sample_every
+        self._start = None
+        self._epoch_peak = None
+
+    def _sample_rss(self):
+        rss = current_rss_mb()
+        if rss is not None and (self._epoch_peak is None or rss > self._epoch_peak):
+            self._epoch_peak = rss
+        return rss
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+        self._epoch_peak = None
+        self._sample_rss()
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.rss_sample_every and batch % self.rss_sample_every == 0:
+            self._sample_rss()
+
+    def on_epoch_end(self, epoch, logs=None):
+        duration = time.perf_counter() - self._start
+        record = {
+            "epoch": epoch + 1,
+            "timestamp": time.time(),
+            "duration_sec": round(duration, 3),
+            "samples_per_sec": round(self.samples_per_epoch / duration, 1) if duration else None,
+            "rss_mb": self._sample_rss(),
+            "epoch_peak_rss_mb": self._epoch_peak,
+            "process_peak_rss_mb": peak_rss_mb(),
+        }
+        record.update({k: float(v) for k, v in (logs or {}).items()})
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as fp:
+            fp.write(json.dumps(record) + "\n")
@@ -0,0 +1,93 @@
+"""crop_cube.py hits are the model's answer for the rounded readings."""
+import os
+import tempfile
+import unittest
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+from crop_backends import FEATURES, build_crop_pipeline  # noqa: E402
+from crop_cube import build, load_crop_cube, round_reading  # noqa: E402
+from crop_model_loader import save_crop_model  # noqa: E402
+from reference_data import MAHARASHTRA_ANNUAL_RAINFALL_MM, MAHARASHTRA_DISTRICTS, SOIL_ENGLISH_MAP  # noqa: E402
+
+GRID = {
+    "N_SOIL": (0, 20, 2),
+    "P_SOIL": (5, 20, 2),
+    "K_SOIL": (5, 40, 2),
+    "ph": (5.5, 1.0, 2),
+    "TEMPERATURE": (15.0, 10.0, 2),
+    "HUMIDITY": (50, 20, 2),
+}
+
+
+def _training_rows(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "STATE": "Maharashtra",
+        "SOIL_TYPE": rng.choice(list(SOIL_ENGLISH_MAP.values()), rows),
+        "N_SOIL": rng.uniform(0, 40, rows),
+        "P_SOIL": rng.uniform(0, 40, rows),
+        "K_SOIL": rng.uniform(0, 60, rows),
+        "TEMPERATURE": rng.uniform(10, 30, rows),
+        "HUMIDITY": rng.uniform(40, 80, rows),
+        "ph": rng.uniform(5, 7, rows),
+        "RAINFALL": rng.uniform(500, 3000, rows),
+    })
+    score = df["N_SOIL"] / 10 + df["ph"] + df["RAINFALL"] / 1000 + rng.normal(0, 0.3, rows)
+    df["CROP"] = np.where(score < 9, "jowar", np.where(score < 11, "cotton", "rice"))
+    return df
+
+
+class CropCubeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        df = _training_rows()
+        cls.pipeline = build_crop_pipeline("random_forest", n_estimators=20, n_jobs=1)
+        cls.pipeline.fit(df[FEATURES], df["CROP"])
+        cls.model_path = save_crop_model(cls.pipeline, os.path.join(cls.tmp.name, "crop.pkl"))
+        cube_dir = os.path.join(cls.tmp.name, "cube")
+        build(cls.model_path, cube_dir, dims=GRID, top_k=2, workers=1)
+        cls.cube = load_crop_cube(cube_dir, source_path=cls.model_path)
+        cls.district = next(d for d in MAHARASHTRA_DISTRICTS if d in MAHARASHTRA_ANNUAL_RAINFALL_MM)
+        cls.soil = next(iter(SOIL_ENGLISH_MAP.values()))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _values(self, **overrides):
+        # Readings that round (at cache precision) to a grid point.
+        values = {"N_SOIL": 20.4, "P_SOIL": 24.6, "K_SOIL": 44.8, "ph": 6.54, "TEMPERATURE": 25.04,
+                  "HUMIDITY": 69.6, "RAINFALL": MAHARASHTRA_ANNUAL_RAINFALL_MM[self.district] + 0.3}
+        values.update(overrides)
+        return values
+
+    def test_hit_matches_model_on_rounded_inputs(self):
+        values = self._values()
+        top = self.cube.lookup("Maharashtra", self.district, self.soil, values)
+        self.assertIsNotNone(top)
+
+        rounded = {name: [round_reading(name, v)] for name, v in values.items()}
+        row = pd.DataFrame({"STATE": ["Maharashtra"], "SOIL_TYPE": [self.soil], **rounded})[FEATURES]
+        proba = self.pipeline.predict_proba(row)[0]
+        classes = [str(c) for c in self.pipeline.classes_]
+        crop, prob = top[0]
+        self.assertAlmostEqual(proba[classes.index(crop)], proba.max(), places=9)
+        self.assertAlmostEqual(prob, proba.max(), delta=1e-3)  # stored as float16
+
+    def test_off_grid_readings_miss(self):
+        self.assertIsNone(self.cube.lookup("Maharashtra", self.district, self.soil, self._values(N_SOIL=30)))
+        self.assertIsNone(self.cube.lookup("Maharashtra", self.district, self.soil, self._values(ph=6.44)))
+        rain = MAHARASHTRA_ANNUAL_RAINFALL_MM[self.district] + 5
+        self.assertIsNone(self.cube.lookup("Maharashtra", self.district, self.soil, self._values(RAINFALL=rain)))
+        self.assertIsNone(self.cube.lookup("Gujarat", self.district, self.soil, self._values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""crop_forest_compiled.py reproduces the sklearn Pipeline it was compiled from."""
+import unittest
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from crop_backends import FEATURES, build_crop_pipeline  # noqa: E402
+from crop_forest_compiled import compile_pipeline  # noqa: E402
+
+STATES = ["Maharashtra", "Karnataka", "Gujarat"]
+SOILS = ["Black", "Red", "Alluvial", "Laterite"]
+CROPS = ["cotton", "rice", "jowar", "sugarcane"]
+
+
+def _frame(rows, seed, states=STATES, soils=SOILS):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "STATE": rng.choice(states, rows),
+        "SOIL_TYPE": rng.choice(soils, rows),
+        "N_SOIL": rng.uniform(0, 140, rows).round(2),
+        "P_SOIL": rng.uniform(5, 145, rows).round(2),
+        "K_SOIL": rng.uniform(5, 205, rows).round(2),
+        "TEMPERATURE": rng.uniform(8, 44, rows).round(2),
+        "HUMIDITY": rng.uniform(14, 100, rows).round(2),
+        "ph": rng.uniform(3.5, 9.9, rows).round(2),
+        "RAINFALL": rng.uniform(20, 3000, rows).round(2),
+    })
+    # Labels that depend on both categorical and numeric columns, plus noise.
+    score = df["N_SOIL"] / 40 + (df["SOIL_TYPE"] == "Black") * 1.5 + df["RAINFALL"] / 1000
+    score += rng.normal(0, 0.5, rows)
+    df["CROP"] = [CROPS[int(v) % len(CROPS)] for v in score]
+    return df
+
+
+class CompiledForestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.train = _frame(600, seed=0)
+        held_out = _frame(200, seed=1)
+        unseen = _frame(40, seed=2, states=["Kerala", "Punjab"], soils=["Peaty", "Black"])
+        cls.test = pd.concat([held_out, unseen], ignore_index=True)[FEATURES]
+
+    def _check(self, backend):
+        pipeline = build_crop_pipeline(backend, n_estimators=25, n_jobs=1)
+        pipeline.fit(self.train[FEATURES], self.train["CROP"])
+        compiled = compile_pipeline(pipeline)
+        columns = {c: self.test[c].tolist() for c in FEATURES}
+
+        np.testing.assert_array_equal(compiled.predict(columns), pipeline.predict(self.test))
+        np.testing.assert_allclose(compiled.predict_proba(columns), pipeline.predict_proba(self.test),
+                                   rtol=0, atol=1e-12)
+
+    def test_random_forest_matches_pipeline(self):
+        self._check("random_forest")
+
+    def test_extra_trees_matches_pipeline(self):
+        self._check("extra_trees")
+
+
+if __name__ == "__main__":
+    unittest.main()
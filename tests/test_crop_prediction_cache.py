@@ -0,0 +1,59 @@
+"""crop_prediction_cache.py lookups are pure reads; counters are written in batches."""
+import os
+import tempfile
+import unittest
+
+from crop_prediction_cache import PredictionCache
+
+ROW = {"STATE": ["Maharashtra"], "SOIL_TYPE": ["Black"], "N_SOIL": [90.2], "P_SOIL": [42.0], "K_SOIL": [43.0],
+       "TEMPERATURE": [20.87], "HUMIDITY": [82.0], "ph": [6.5], "RAINFALL": [202.9]}
+
+
+class PredictionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "cache.sqlite")
+        self.model_path = os.path.join(self.tmp.name, "model.pkl")
+        with open(self.model_path, "wb") as fp:
+            fp.write(b"model v1")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self):
+        cache = PredictionCache(self.db_path, model_path=self.model_path)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_get_does_not_write(self):
+        cache = self._cache()
+        cache.put(ROW, "rice")
+        changes = cache.conn.total_changes
+        self.assertEqual(cache.get(ROW), "rice")
+        self.assertIsNone(cache.get({**ROW, "N_SOIL": [10.0]}))
+        self.assertEqual(cache.conn.total_changes, changes)
+        self.assertFalse(cache.conn.in_transaction)
+
+    def test_counters_survive_close(self):
+        cache = self._cache()
+        cache.put(ROW, "rice")
+        cache.get(ROW)
+        cache.get(ROW)
+        cache.get({**ROW, "STATE": ["Goa"]})
+        cache.close()
+        stats = self._cache().stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_model_change_misses_until_next_put(self):
+        cache = self._cache()
+        cache.put(ROW, "rice")
+        with open(self.model_path, "wb") as fp:
+            fp.write(b"model v2, retrained")
+        self.assertIsNone(cache.get(ROW))
+        cache.put({**ROW, "STATE": ["Goa"]}, "cashew")
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.stats()["invalidations"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
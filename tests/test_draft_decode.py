@@ -0,0 +1,62 @@
+"""JPEG draft-mode model inputs stay within the documented error of a full decode."""
+import os
+import tempfile
+import unittest
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("cv2")
+
+from soil_inference import DRAFT_MAX_ABS_DIFF, DRAFT_MAX_MEAN_ABS_DIFF, preprocess_image  # noqa: E402
+
+
+def _camera_like_jpeg(path, size=(2400, 1800)):
+    """Smooth colour fields with mild grain, roughly what a soil photo looks like."""
+    w, h = size
+    y, x = np.mgrid[0:h, 0:w].astype("float32")
+    rng = np.random.default_rng(0)
+    rgb = np.stack([
+        120 + 60 * np.sin(x / 97.0) * np.cos(y / 131.0),
+        90 + 40 * np.cos((x + y) / 173.0),
+        60 + 30 * np.sin(y / 59.0),
+    ], axis=-1) + rng.normal(0, 6, (h, w, 1))
+    Image.fromarray(np.clip(rgb, 0, 255).astype("uint8")).save(path, quality=90)
+
+
+class DraftDecodeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "soil.jpg")
+        _camera_like_jpeg(cls.path)
+        with Image.open(cls.path) as img:
+            img.load()  # loaded images ignore draft(), so this is the full decode
+            cls.full = preprocess_image(img)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _assert_close(self, candidate):
+        diff = np.abs(candidate - self.full)
+        self.assertLessEqual(float(diff.max()), DRAFT_MAX_ABS_DIFF)
+        self.assertLessEqual(float(diff.mean()), DRAFT_MAX_MEAN_ABS_DIFF)
+
+    def test_draft_path_is_used_and_stays_close(self):
+        with Image.open(self.path) as img:
+            draft = preprocess_image(img)
+            # 2400 px at a 1/8 DCT scale is 300 px, still above twice the target.
+            self.assertLess(img.size[0], 2400)
+        self.assertEqual(draft.shape, self.full.shape)
+        self._assert_close(draft)
+
+    def test_image_cache_input_stays_close(self):
+        from image_cache import ImageBufferCache
+
+        self._assert_close(ImageBufferCache().get(self.path).model_input())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""geocoding.py against a local stand-in for Nominatim."""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import geocoding
+
+TALUKAS = {"Pune": ["Haveli", "Mulshi"], "Nashik": ["Niphad", "Nowhere"]}
+COORDS = {"Haveli": (18.55, 73.95), "Mulshi": (18.5, 73.5), "Niphad": (20.08, 74.11)}
+
+
+class _FakeNominatim(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)["q"][0]
+        type(self).requests.append(query)
+        taluka_name = query.split(",")[0]
+        payload = [{"lat": str(COORDS[taluka_name][0]), "lon": str(COORDS[taluka_name][1])}] \
+            if taluka_name in COORDS else []
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeocodingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeNominatim)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/search"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FakeNominatim.requests = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.coords_path = os.path.join(self.tmp.name, "taluka_coords.json")
+        self.cache_path = os.path.join(self.tmp.name, "geocode_cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def geocoder(self):
+        return geocoding.TalukaGeocoder(self.coords_path, self.cache_path, self.base_url)
+
+    def test_lookup_is_cached_in_sqlite(self):
+        self.assertEqual(self.geocoder().lookup("Haveli", "Pune"), COORDS["Haveli"])
+        self.assertEqual(len(_FakeNominatim.requests), 1)
+        # A fresh geocoder (new process) answers from the SQLite cache.
+        self.assertEqual(self.geocoder().lookup("Haveli", "Pune"), COORDS["Haveli"])
+        self.assertEqual(len(_FakeNominatim.requests), 1)
+
+    def test_offline_lookup_never_requests(self):
+        with self.assertRaises(ValueError):
+            self.geocoder().lookup("Mulshi", "Pune", offline=True)
+        self.assertEqual(_FakeNominatim.requests, [])
+
+    def test_unknown_taluka_raises(self):
+        with self.assertRaises(ValueError):
+            self.geocoder().lookup("Nowhere", "Nashik")
+
+    def test_build_coords_file(self):
+        with mock.patch.object(geocoding, "MAHARASHTRA_TALUKAS", TALUKAS):
+            summary = geocoding.build_coords_file(self.coords_path, self.cache_path, self.base_url, delay=0)
+        self.assertEqual(summary["resolved"], 3)
+        self.assertEqual(len(summary["missing"]), 1)
+        self.assertTrue(summary["missing"][0].startswith("Nowhere, Nashik"))
+        with open(self.coords_path, "r", encoding="utf-8") as fp:
+            table = json.load(fp)
+        self.assertEqual(table["Pune"]["Haveli"], list(COORDS["Haveli"]))
+
+        # Known talukas now resolve from the file, offline and without HTTP.
+        requests_after_build = len(_FakeNominatim.requests)
+        self.assertEqual(self.geocoder().lookup("Niphad", "Nashik", offline=True), tuple(COORDS["Niphad"]))
+        self.assertEqual(len(_FakeNominatim.requests), requests_after_build)
+
+    def test_build_resumes_from_cache(self):
+        self.geocoder().lookup("Haveli", "Pune")
+        with mock.patch.object(geocoding, "MAHARASHTRA_TALUKAS", TALUKAS):
+            geocoding.build_coords_file(self.coords_path, self.cache_path, self.base_url, delay=0)
+        self.assertEqual(_FakeNominatim.requests.count("Haveli, Pune, Maharashtra, India"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""prediction_history.py writer failures and CLI arguments."""
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import prediction_history
+
+
+class HistoryWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "history.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _writer(self):
+        writer = prediction_history.HistoryWriter(self.db_path, flush_interval=0.05)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_records_are_written_and_flushed(self):
+        writer = self._writer()
+        record_id = writer.record("crop", {"N": 1}, {"crop_en": "rice"}, district="Jalna", crop="rice")
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(prediction_history.get_record(record_id, self.db_path)["district"], "Jalna")
+
+    def test_failed_batch_is_dropped_and_writer_keeps_running(self):
+        writer = self._writer()
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            writer._queue.put(("short row",))  # executemany raises sqlite3.ProgrammingError
+            self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(writer.dropped, 1)
+        self.assertIn("not saved", stderr.getvalue())
+        record_id = writer.record("crop", {}, {"crop_en": "rice"})
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertIsNotNone(prediction_history.get_record(record_id, self.db_path))
+
+    def test_flush_timeout_returns_false(self):
+        writer = self._writer()
+        writer.flush(timeout=5)
+        with writer._queue.mutex:
+            writer._queue.unfinished_tasks += 1  # a record the writer never finishes
+        try:
+            self.assertFalse(writer.flush(timeout=0.1))
+        finally:
+            with writer._queue.mutex:
+                writer._queue.unfinished_tasks -= 1
+
+
+class CliTest(unittest.TestCase):
+    def test_db_is_accepted_after_each_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "none.sqlite")
+            with mock.patch.object(sys, "argv", ["prediction_history.py", "query", "--db", db_path]), \
+                    redirect_stdout(io.StringIO()) as out:
+                prediction_history.main()
+            self.assertEqual(out.getvalue(), "")
+            with mock.patch.object(sys, "argv", ["prediction_history.py", "report", "abc", "--db", db_path]):
+                with self.assertRaises(SystemExit) as ctx:
+                    prediction_history.main()
+            self.assertIn("abc", str(ctx.exception.code))
+
+
+if __name__ == "__main__":
+    unittest.main()
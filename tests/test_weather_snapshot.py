@@ -0,0 +1,137 @@
+"""weather_snapshot.py bulk fetching against a local stand-in for open-meteo."""
+import asyncio
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import weather_snapshot
+from weather_client import WeatherHTTPError
+
+
+class _FakeOpenMeteo(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+    requests = []
+    failures = []  # statuses to answer with before succeeding
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        lats = [float(v) for v in query["latitude"][0].split(",")]
+        lons = [float(v) for v in query["longitude"][0].split(",")]
+        type(self).requests.append(len(lats))
+        if type(self).failures:
+            self._reply(type(self).failures.pop(0), {"error": True})
+            return
+        items = [{"latitude": lat, "longitude": lon,
+                  "current": {"temperature_2m": round(lat + lon, 2), "relative_humidity_2m": 50,
+                              "precipitation": 0.0}}
+                 for lat, lon in zip(lats, lons)]
+        # open-meteo answers a single location with an object, several with a list.
+        self._reply(200, items if len(items) > 1 else items[0])
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _locations(n):
+    return [("District", f"Taluka {i}", 18.0 + i / 100.0, 73.0 + i / 100.0) for i in range(n)]
+
+
+class BulkFetchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenMeteo)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1/forecast"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FakeOpenMeteo.requests = []
+        _FakeOpenMeteo.failures = []
+
+    def fetch(self, locations, per_request=5, concurrency=2, max_retries=3, backoff=0.0):
+        return asyncio.run(weather_snapshot._fetch_all(locations, self.base_url, per_request, concurrency,
+                                                       max_retries, backoff))
+
+    def test_batches_coordinates_per_request(self):
+        locations = _locations(12)
+        groups, results = self.fetch(locations, per_request=5)
+        self.assertEqual(sorted(_FakeOpenMeteo.requests), [2, 5, 5])
+        self.assertEqual([len(g) for g in groups], [5, 5, 2])
+        flat = [row for result in results for row in result]
+        for (_, _, lat, lon), row in zip(locations, flat):
+            self.assertAlmostEqual(row["temperature"], round(round(lat, 4) + round(lon, 4), 2))
+            self.assertEqual(row["humidity"], 50)
+
+    def test_single_location_object_payload(self):
+        groups, results = self.fetch(_locations(1))
+        self.assertEqual(_FakeOpenMeteo.requests, [1])
+        self.assertEqual(len(results[0]), 1)
+        self.assertAlmostEqual(results[0][0]["temperature"], 91.0)
+
+    def test_retries_429_and_5xx_with_exponential_backoff(self):
+        _FakeOpenMeteo.failures = [429, 503, 500]
+        delays = []
+
+        async def fake_sleep(seconds):
+            delays.append(seconds)
+
+        with mock.patch.object(weather_snapshot.asyncio, "sleep", fake_sleep), \
+                mock.patch.object(weather_snapshot.random, "random", return_value=0.5):
+            groups, results = self.fetch(_locations(3), per_request=5, max_retries=3, backoff=1.0)
+        self.assertEqual(len(_FakeOpenMeteo.requests), 4)
+        self.assertEqual(delays, [1.0, 2.0, 4.0])
+        self.assertEqual(len(results[0]), 3)
+
+    def test_gives_up_after_max_retries(self):
+        _FakeOpenMeteo.failures = [503] * 3
+        groups, results = self.fetch(_locations(2), max_retries=2)
+        self.assertIsInstance(results[0], WeatherHTTPError)
+        self.assertEqual(results[0].status, 503)
+        self.assertEqual(len(_FakeOpenMeteo.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        _FakeOpenMeteo.failures = [400]
+        groups, results = self.fetch(_locations(2), max_retries=3)
+        self.assertIsInstance(results[0], WeatherHTTPError)
+        self.assertEqual(len(_FakeOpenMeteo.requests), 1)
+
+    @unittest.skipUnless(importlib.util.find_spec("pandas") and importlib.util.find_spec("pyarrow"),
+                         "needs pandas + pyarrow")
+    def test_refresh_writes_snapshot(self):
+        class FakeGeocoder:
+            def lookup(self, taluka_name, district_en, offline=False):
+                if taluka_name.endswith("3"):
+                    raise ValueError("not cached")
+                return 18.5, 73.8
+
+        talukas = {"Pune": ["Taluka 1", "Taluka 2", "Taluka 3"]}
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(weather_snapshot, "MAHARASHTRA_TALUKAS", talukas):
+            summary = weather_snapshot.refresh(tmp, self.base_url, per_request=5, concurrency=1,
+                                               geocoder=FakeGeocoder())
+            self.assertEqual(summary["talukas"], 2)
+            self.assertEqual(summary["unresolved"], ["Taluka 3, Pune"])
+            self.assertTrue(os.path.exists(summary["path"]))
+            self.assertEqual(weather_snapshot.latest_weather("Pune", "Taluka 1", tmp)["humidity"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,41 +1,38 @@
 import pandas as pd
-import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import json
+import argparse
 
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 
+from crop_model_loader import save_crop_model
+from crop_forest_compiled import compile_pipeline
+from crop_dataset import load_crop_dataset
+from crop_backends import BACKENDS, BACKEND_LABELS, COMPILABLE_BACKENDS, build_crop_pipeline, measure_latency
+from crop_incremental import index_ranges, record_model_version
+
+parser = argparse.ArgumentParser(description="Train the crop recommendation model")
+parser.add_argument("--backend", choices=list(BACKENDS), default="random_forest")
+args = parser.parse_args()
+
 # =========================
 # 1. Create Output Folder
 # =========================
 os.makedirs("model_outputs", exist_ok=True)
 
 # =========================
-# 2. Load Dataset
-# =========================
-df = pd.read_csv("crop_data.csv")
-
-# =========================
-# 3. Data Cleaning
+# 2. Load Dataset + 3. Data Cleaning
 # =========================
-df = df.dropna()
-
-#  REMOVE RARE CROPS
-crop_counts = df["CROP"].value_counts()
-valid_crops = crop_counts[crop_counts >= 2].index
-df = df[df["CROP"].isin(valid_crops)]
+# Chunked read with category/float32 dtypes, dropna and rare-crop (< 2 rows)
+# removal; cached as model_outputs/cleaned_crop_data.parquet so re-training
+# skips CSV parsing until crop_data.csv changes.
+df = load_crop_dataset("crop_data.csv")
 
 print("Total crop classes after cleaning:", df["CROP"].nunique())
 
-# Save cleaned dataset
-df.to_csv("model_outputs/cleaned_crop_data.csv", index=False)
-
 # =========================
 # 4. Features & Target
 # =========================
@@ -43,33 +40,11 @@ X = df.drop(["CROP"], axis=1)
 y = df["CROP"]
 
 # =========================
-# 5. Column Types
-# =========================
-categorical_features = ["STATE", "SOIL_TYPE"]
-numerical_features = [
-    "N_SOIL", "P_SOIL", "K_SOIL",
-    "TEMPERATURE", "HUMIDITY", "ph", "RAINFALL"
-]
-
-# =========================
-# 6. Preprocessing
-# =========================
-preprocessor = ColumnTransformer([
-    ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-    ("num", "passthrough", numerical_features)
-])
-
-# =========================
-# 7. Model
+# 5. Column Types + 6. Preprocessing + 7. Model
 # =========================
-model = Pipeline([
-    ("preprocessor", preprocessor),
-    ("classifier", RandomForestClassifier(
-        n_estimators=300,
-        random_state=42,
-        n_jobs=-1
-    ))
-])
+# Shared one-hot/passthrough preprocessing + the selected classifier
+# (random_forest: 300 trees, as before). See crop_backends.py.
+model = build_crop_pipeline(args.backend)
 
 # =========================
 # 8. Train-Test Split
@@ -84,7 +59,7 @@ X_train, X_test, y_train, y_test = train_test_split(
 # =========================
 # 9. Train Model
 # =========================
-print("Training Crop Recommendation Model...")
+print(f"Training Crop Recommendation Model ({args.backend})...")
 model.fit(X_train, y_train)
 
 # =========================
@@ -98,6 +73,12 @@ report = classification_report(y_test, y_pred)
 print("\nAccuracy:", accuracy)
 print("\nClassification Report:\n", report)
 
+# Single-row and 10k-row batch predict latency
+latency = measure_latency(model, X_test)
+print("\nLatency:", latency)
+with open("model_outputs/training_metrics.json", "w", encoding="utf-8") as f:
+    json.dump({"backend": args.backend, "accuracy": round(float(accuracy), 4), **latency}, f, indent=2)
+
 a = report + f"Model Accuracy: {accuracy:.4f}"
 # 🔹 Save Accuracy to file
 # with open("model_outputs/accuracy.txt", "w") as f:
@@ -124,7 +105,7 @@ plt.show()
 # 12. Accuracy Graph
 # =========================
 plt.figure(figsize=(4, 4))
-plt.bar(["Random Forest"], [accuracy])
+plt.bar([BACKEND_LABELS[args.backend]], [accuracy])
 plt.ylim(0, 1)
 plt.ylabel("Accuracy")
 plt.title("Model Accuracy")
@@ -134,6 +115,16 @@ plt.show()
 # =========================
 # 13. Save Model
 # =========================
-joblib.dump(model, "model_outputs/crop_recommendation_model.pkl")
+# Uncompressed + atomic rename, so check_predict can open it with mmap_mode.
+save_crop_model(model, "model_outputs/crop_recommendation_model.pkl")
+
+# Flat-array copy for fast single-row prediction in check_predict.py
+# (tree ensembles only; other backends are served through the Pipeline)
+if args.backend in COMPILABLE_BACKENDS:
+    compile_pipeline(model, source_path="model_outputs/crop_recommendation_model.pkl").save()
+
+# Version log used by crop_incremental.py (which rows each model has seen:
+# the training split only; df has a fresh 0..n-1 index, so labels are positions)
+record_model_version("full", index_ranges(X_train.index), len(df), model, held_out_rows=len(X_test))
 
 print("\nTraining completed successfully.")
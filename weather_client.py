@@ -0,0 +1,155 @@
+"""Background weather client for check_predict (open-meteo current conditions).
+
+One request returns temperature, relative humidity and precipitation.
+Requests run as coroutines on a private asyncio loop in a daemon thread,
+so Tk callers only submit work and poll the returned future. HTTP goes
+through a small pool of keep-alive connections (standard library
+http.client, so no extra dependency), results are cached per rounded
+coordinate for ttl seconds, and concurrent requests for the same
+location share one fetch.
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlencode, urlsplit
+
+OPEN_METEO_URL = os.environ.get("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+CURRENT_FIELDS = {
+    "temperature": "temperature_2m",
+    "humidity": "relative_humidity_2m",
+    "precipitation": "precipitation",
+}
+WEATHER_TTL_SECONDS = 15 * 60
+USER_AGENT = "BE_PROJECT/1.0"
+
+
+class WeatherHTTPError(OSError):
+    def __init__(self, status, host):
+        super().__init__(f"HTTP {status} from {host}")
+        self.status = status
+
+
+class WeatherDataMissing(ValueError):
+    """The service answered, but without the requested reading."""
+
+
+class ConnectionPool:
+    """Reuses HTTP/1.1 keep-alive connections to one host."""
+
+    def __init__(self, base_url, size=4, timeout=10):
+        parts = urlsplit(base_url)
+        self.path = parts.path or "/"
+        self._factory = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        self._host = parts.netloc
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _send(self, conn, path):
+        conn.request("GET", path, headers={"User-Agent": USER_AGENT})
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+
+    def get_json(self, params):
+        path = f"{self.path}?{urlencode(params)}"
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._factory(self._host, timeout=self._timeout), False
+        try:
+            try:
+                status, body = self._send(conn, path)
+            except (ConnectionError, HTTPException):
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                conn.close()
+                conn = self._factory(self._host, timeout=self._timeout)
+                status, body = self._send(conn, path)
+        except Exception:
+            conn.close()
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        if status != 200:
+            raise WeatherHTTPError(status, self._host)
+        return json.loads(body.decode("utf-8"))
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class WeatherClient:
+    def __init__(self, base_url=OPEN_METEO_URL, ttl=WEATHER_TTL_SECONDS, pool_size=4, timeout=10):
+        self.ttl = ttl
+        self._pool = ConnectionPool(base_url, pool_size, timeout)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="weather")
+        self._cache = {}
+        self._inflight = {}
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="weather-loop", daemon=True).start()
+
+    @staticmethod
+    def _key(lat, lon):
+        return round(float(lat), 3), round(float(lon), 3)
+
+    def cached(self, lat, lon):
+        entry = self._cache.get(self._key(lat, lon))
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _fetch_current(self, lat, lon):
+        payload = self._pool.get_json({
+            "latitude": lat,
+            "longitude": lon,
+            "current": ",".join(CURRENT_FIELDS.values()),
+        })
+        current = payload.get("current", {})
+        weather = {name: current.get(field) for name, field in CURRENT_FIELDS.items()}
+        if weather["temperature"] is None:
+            raise WeatherDataMissing("Temperature not found")
+        return weather
+
+    async def fetch(self, lat, lon):
+        """{"temperature": °C, "humidity": %, "precipitation": mm} for a coordinate."""
+        key = self._key(lat, lon)
+        weather = self.cached(*key)
+        if weather is not None:
+            return weather
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._loop.run_in_executor(self._executor, self._fetch_current, *key)
+            self._inflight[key] = task
+        try:
+            weather = await task
+        finally:
+            self._inflight.pop(key, None)
+        self._cache[key] = (time.monotonic(), weather)
+        return weather
+
+    async def _locate_and_fetch(self, locate):
+        lat, lon = await self._loop.run_in_executor(self._executor, locate)
+        return {"lat": lat, "lon": lon, **await self.fetch(lat, lon)}
+
+    def prefetch(self, locate):
+        """Start locate() -> (lat, lon) + fetch in the background.
+
+        Returns a concurrent.futures.Future; safe to call from the Tk thread.
+        """
+        return asyncio.run_coroutine_threadsafe(self._locate_and_fetch(locate), self._loop)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+        self._pool.close()
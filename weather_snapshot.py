@@ -0,0 +1,192 @@
+"""Current weather for every Maharashtra taluka in one pass.
+
+Talukas are resolved from taluka_coords.json / the geocode cache (run
+`python geocoding.py build` first; unresolved talukas are listed and
+skipped). Coordinates are sent to open-meteo in multi-location requests
+(--per-request per call) with at most --concurrency requests in flight,
+and retries use exponential backoff on network errors, 429 and 5xx. The
+result is written as a timestamped Parquet snapshot.
+
+Usage:
+    python weather_snapshot.py refresh [--per-request 50] [--concurrency 4] [--base-url URL]
+    python weather_snapshot.py show
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from geocoding import TalukaGeocoder
+from reference_data import MAHARASHTRA_TALUKAS
+from weather_client import CURRENT_FIELDS, OPEN_METEO_URL, ConnectionPool, WeatherHTTPError
+
+SNAPSHOT_DIR = "model_outputs/weather_snapshots"
+PER_REQUEST = 50
+CONCURRENCY = 4
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+
+
+def taluka_coordinates(geocoder=None):
+    """[(district, taluka, lat, lon)] known locally, plus the talukas that are not."""
+    geocoder = geocoder or TalukaGeocoder()
+    found, missing = [], []
+    for district_en, talukas in MAHARASHTRA_TALUKAS.items():
+        for taluka_name in talukas:
+            try:
+                lat, lon = geocoder.lookup(taluka_name, district_en, offline=True)
+                found.append((district_en, taluka_name, lat, lon))
+            except ValueError:
+                missing.append(f"{taluka_name}, {district_en}")
+    return found, missing
+
+
+def _retryable(error):
+    if isinstance(error, WeatherHTTPError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (OSError, ValueError))
+
+
+async def _fetch_group(pool, executor, semaphore, group, max_retries, backoff):
+    params = {
+        "latitude": ",".join(f"{lat:.4f}" for _, _, lat, _ in group),
+        "longitude": ",".join(f"{lon:.4f}" for _, _, _, lon in group),
+        "current": ",".join(CURRENT_FIELDS.values()),
+    }
+    loop = asyncio.get_running_loop()
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                payload = await loop.run_in_executor(executor, pool.get_json, params)
+            break
+        except Exception as e:
+            if attempt == max_retries or not _retryable(e):
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+    # A single location comes back as an object, several as a list (same order as requested).
+    results = payload if isinstance(payload, list) else [payload]
+    if len(results) != len(group):
+        raise ValueError(f"Expected {len(group)} locations, got {len(results)}")
+    return [
+        {name: item.get("current", {}).get(field) for name, field in CURRENT_FIELDS.items()}
+        for item in results
+    ]
+
+
+async def _fetch_all(locations, base_url, per_request, concurrency, max_retries, backoff):
+    pool = ConnectionPool(base_url, size=concurrency, timeout=30)
+    semaphore = asyncio.Semaphore(concurrency)
+    groups = [locations[i:i + per_request] for i in range(0, len(locations), per_request)]
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="weather-bulk") as executor:
+        results = await asyncio.gather(
+            *(_fetch_group(pool, executor, semaphore, g, max_retries, backoff) for g in groups),
+            return_exceptions=True,
+        )
+    pool.close()
+    return groups, results
+
+
+def refresh(directory=SNAPSHOT_DIR, base_url=OPEN_METEO_URL, per_request=PER_REQUEST, concurrency=CONCURRENCY,
+            max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, geocoder=None):
+    import pandas as pd
+
+    locations, missing = taluka_coordinates(geocoder)
+    start = time.perf_counter()
+    fetched_at = datetime.now(timezone.utc)
+    groups, results = asyncio.run(_fetch_all(locations, base_url, per_request, concurrency, max_retries, backoff))
+
+    rows, failed = [], []
+    for group, result in zip(groups, results):
+        if isinstance(result, Exception):
+            failed.extend(f"{t}, {d}: {result}" for d, t, _, _ in group)
+            continue
+        for (district_en, taluka_name, lat, lon), weather in zip(group, result):
+            rows.append({"district": district_en, "taluka": taluka_name, "lat": lat, "lon": lon, **weather})
+
+    summary = {"talukas": len(rows), "requests": len(groups), "unresolved": missing, "failed": failed,
+               "seconds": round(time.perf_counter() - start, 2), "path": None}
+    if rows:
+        df = pd.DataFrame(rows)
+        for column in CURRENT_FIELDS:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float32")
+        df["fetched_at"] = pd.Timestamp(fetched_at)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"weather_{fetched_at:%Y%m%dT%H%M%SZ}.parquet")
+        df.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        summary["path"] = path
+    return summary
+
+
+# =========================
+# Readers
+# =========================
+def latest_snapshot_path(directory=SNAPSHOT_DIR):
+    paths = sorted(glob.glob(os.path.join(directory, "weather_*.parquet")))
+    return paths[-1] if paths else None
+
+
+_latest = {"path": None, "table": {}}
+
+
+def latest_weather(district_en, taluka_name, directory=SNAPSHOT_DIR):
+    """{"temperature", "humidity", "precipitation", "fetched_at"} from the newest snapshot, or None."""
+    path = latest_snapshot_path(directory)
+    if path is None:
+        return None
+    if path != _latest["path"]:
+        import pandas as pd
+        df = pd.read_parquet(path)
+        _latest["table"] = {
+            (r.district, r.taluka): {**{c: getattr(r, c) for c in CURRENT_FIELDS}, "fetched_at": str(r.fetched_at)}
+            for r in df.itertuples(index=False)
+        }
+        _latest["path"] = path
+    return _latest["table"].get((district_en, taluka_name))
+
+
+def fill_weather(df, directory=SNAPSHOT_DIR):
+    """Fill missing TEMPERATURE/HUMIDITY from the newest snapshot for rows with DISTRICT and TALUKA columns."""
+    path = latest_snapshot_path(directory)
+    if path is None or not {"DISTRICT", "TALUKA"} <= set(df.columns):
+        return df
+    import pandas as pd
+    snap = pd.read_parquet(path, columns=["district", "taluka", "temperature", "humidity"])
+    merged = df[["DISTRICT", "TALUKA"]].merge(
+        snap, how="left", left_on=["DISTRICT", "TALUKA"], right_on=["district", "taluka"]
+    )
+    df = df.copy()
+    for column, source in (("TEMPERATURE", "temperature"), ("HUMIDITY", "humidity")):
+        values = merged[source].to_numpy()
+        df[column] = df[column].fillna(pd.Series(values, index=df.index)) if column in df else values
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk weather snapshot for all talukas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ref = sub.add_parser("refresh")
+    ref.add_argument("--base-url", default=OPEN_METEO_URL)
+    ref.add_argument("--per-request", type=int, default=PER_REQUEST)
+    ref.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ref.add_argument("--retries", type=int, default=MAX_RETRIES)
+    ref.add_argument("--output-dir", default=SNAPSHOT_DIR)
+    sub.add_parser("show")
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        summary = refresh(args.output_dir, args.base_url, args.per_request, args.concurrency, args.retries)
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        import pandas as pd
+        path = latest_snapshot_path()
+        print(pd.read_parquet(path).to_string(index=False) if path else "No snapshot yet.")
+
+
+if __name__ == "__main__":
+    main()